@@ -0,0 +1,125 @@
+"""
+MSc Project
+Online adaptation of the parameters of the enhanced bees algorithm
+An AdaptiveController passed to EnhancedBA or VectorizedEnhancedBA
+(controller=...) is told about every site improvement, shrink and abandonment
+and about the global scouts which entered the selected sites. Every period
+iterations it adjusts the parameters within their bounds:
+  - nr follows the success rate of the local search (share of the searched
+    sites which improved), in the spirit of the 1/5th success rule of evolution
+    strategies: fewer recruits while the sites keep improving, more when they
+    stagnate or are abandoned
+  - nb follows the number of sites which improve per iteration
+  - ns - nb (the global scouts) grows while sites are abandoned or the scouts
+    find sites better than the current ones, and shrinks when none is selected
+  - stlim grows when a site improves just before its abandonment and shrinks
+    when sites are abandoned although no site needed half of stlim shrinks
+The initial parameters are the ones given to the constructor of the algorithm,
+initial_parameters is a lean starting point suited to the controller.
+Author: Heng Zhai
+"""
+
+import math
+
+# Lean starting point for a run with a controller: the controller adds recruits, sites and scouts when the search needs them
+initial_parameters = {'ns': 15, 'nb': 5, 'nr': 40, 'stlim': 10}
+
+class AdaptiveController(object):
+    # Bounds are (minimum, maximum), scout_bounds bounds the number of global scouts ns - nb
+    # step is the factor applied to nr and to the number of scouts at each adjustment,
+    # nr is kept above recruits_per_site recruits per site so that a larger nb does not starve the sites
+    def __init__(self, nr_bounds=(20, 320), nb_bounds=(4, 16), scout_bounds=(10, 40), stlim_bounds=(3, 20),
+                 period=5, target_success=0.2, step=1.25, recruits_per_site=8):
+        for name, bounds in [('nr', nr_bounds), ('nb', nb_bounds), ('scout', scout_bounds), ('stlim', stlim_bounds)]:
+            if bounds[0] > bounds[1]:
+                raise ValueError("The minimum of the " + name + " bounds should be less than or equal to the maximum")
+        if nb_bounds[0] < 2:
+            raise ValueError("The number of best sites should be greater than or equal to 2")
+        if scout_bounds[0] < 1:
+            raise ValueError("At least one global scout is needed so that the number of best sites can grow")
+        if period < 1:
+            raise ValueError("The period should be greater than or equal to 1")
+        if step <= 1:
+            raise ValueError("The step should be greater than 1")
+        self.nr_bounds = nr_bounds
+        self.nb_bounds = nb_bounds
+        self.scout_bounds = scout_bounds
+        self.stlim_bounds = stlim_bounds
+        self.period = period
+        self.target_success = target_success
+        self.step = step
+        self.recruits_per_site = recruits_per_site
+        # Parameters after each adjustment: (iteration, ns, nb, nr, stlim)
+        self.history = []
+        self.n_adjustments = 0
+        self.resetWindow()
+
+    def resetWindow(self):
+        self.n_iterations = 0
+        self.n_improvements = 0
+        self.n_shrinks = 0
+        self.n_abandonments = 0
+        self.n_scouts = 0
+        self.n_selected_scouts = 0
+        self.shrinksBeforeImprovement = []
+
+    # Events of the local search, reported by the algorithm for every site with recruits
+    def improved(self, shrinkTimes):
+        self.n_improvements += 1
+        self.shrinksBeforeImprovement.append(shrinkTimes)
+
+    def shrunk(self, count=1):
+        self.n_shrinks += count
+
+    def abandoned(self, count=1):
+        self.n_abandonments += count
+
+    # End of an iteration: n_scouts global scouts were evaluated and n_selected of them became current sites
+    def endIteration(self, ba, n_scouts, n_selected):
+        self.n_iterations += 1
+        self.n_scouts += n_scouts
+        self.n_selected_scouts += n_selected
+        if self.n_iterations >= self.period:
+            self.adjust(ba)
+            self.resetWindow()
+
+    def adjust(self, ba):
+        nr, nb, n_scouts, stlim = ba.nr, ba.nb, ba.ns - ba.nb, ba.stlim
+        n_searched = self.n_improvements + self.n_shrinks
+        if n_searched > 0:
+            success = self.n_improvements / n_searched
+            if self.n_abandonments > 0:
+                nr = nr * self.step
+            elif success > self.target_success:
+                nr = nr / self.step
+            elif success < self.target_success:
+                nr = nr * self.step
+            # One more site than the sites improving per iteration, moved by at most one site per adjustment
+            # (the selection can only fill one more site from the global scouts of a single iteration)
+            wanted = math.ceil(self.n_improvements / self.n_iterations) + 1
+            nb += (wanted > nb) - (wanted < nb)
+        if self.n_scouts > 0:
+            if self.n_abandonments > 0:
+                n_scouts = n_scouts * self.step
+            elif self.n_selected_scouts == 0:
+                n_scouts = n_scouts / self.step
+            elif self.n_selected_scouts / self.n_scouts > 1.0 / n_scouts:
+                n_scouts = n_scouts * self.step
+        # A site improving just before its abandonment means stlim is too short, abandoned sites which never
+        # needed more than half of stlim shrinks to improve mean it is too long
+        latest = max(self.shrinksBeforeImprovement) if len(self.shrinksBeforeImprovement) > 0 else 0
+        if latest >= stlim - 1:
+            stlim += 1
+        elif self.n_abandonments > 0 and 2 * latest < stlim:
+            stlim -= 1
+        nb = self.clip(nb, self.nb_bounds)
+        ba.setParameters(ns=nb + self.clip(n_scouts, self.scout_bounds), nb=nb,
+                         nr=max(self.clip(nr, self.nr_bounds), self.recruits_per_site * nb), stlim=self.clip(stlim, self.stlim_bounds))
+        self.n_adjustments += 1
+        self.history.append((len(ba.record), ba.ns, ba.nb, ba.nr, ba.stlim))
+
+    def clip(self, value, bounds):
+        return int(round(min(max(value, bounds[0]), bounds[1])))
+
+    def report(self):
+        return {'adjustments': self.n_adjustments, 'history': list(self.history)}
@@ -0,0 +1,178 @@
+"""
+MSc Project
+Asynchronous steady-state enhanced bees algorithm
+For objectives whose evaluation time varies from call to call (simulations),
+the generational loop of EnhancedBA waits for the slowest bee of every
+iteration while the other workers are idle. AsyncEnhancedBA keeps max_in_flight
+evaluations submitted to an executor at all times and handles every result as
+soon as it arrives:
+  - a recruit better than its site moves the site at once
+  - a site shrinks its patch when as many of its results as its round (the
+    recruits given to it by the last waggle dance) arrived in a row without
+    improvement, so a slow recruit never holds its site back
+  - a site at stlim sends its round as scouts, the best of the first round of
+    results replaces it
+  - a global scout (or a recruit of a site which is no longer selected)
+    replaces the worst current site when it is better
+A new waggle dance plans the next round of nr recruits and ns - nb scouts when
+the previous plan has been submitted, and the positions are only sampled when
+a worker is free, from the current state of the sites.
+An iteration (singleIteration, and so the record and the stopping criteria of
+stoppingCriterion and iterate) is the arrival of nr + ns - nb results, the
+evaluations still running at the end of an iteration continue into the next.
+The bees are submitted one by one to the evaluator (evaluators.SerialEvaluator
+.submit), so a fitness_cache.FitnessCache answers the points it holds at once.
+A checkpoint holds the sites, the best solution and the random stream but not
+the evaluations in flight, the planned bees and the rounds of the sites: a
+resumed run starts a new round and does not repeat the uninterrupted run exactly.
+Author: Heng Zhai
+"""
+
+import collections
+import concurrent.futures
+import os
+import enhancedBA
+import evaluators
+
+# Kinds of the submitted evaluations
+RECRUIT = 0
+ABANDON = 1
+SCOUT = 2
+
+class AsyncEnhancedBA(enhancedBA.EnhancedBA):
+    # executor is a concurrent.futures executor (a thread pool of n_workers threads by default, which suits objectives
+    # waiting for external programs) used by the default evaluators.PoolEvaluator, an evaluator given instead receives
+    # the submissions itself; max_in_flight is the number of evaluations kept submitted (n_workers by default)
+    # The surrogate, spatial index, archive, profiler and controller of EnhancedBA are bound to its generational
+    # iteration and are not supported, the recruits of n_perturbed are evaluated in full by the evaluator
+    def __init__(self, fitnessFunction, lowerBoundaries, upperBoundaries, ngh=None, ns=35, nb=8, nr=80, sf=.2, stlim=10, evaluator=None, initialise=True, allocation=None,
+                 surrogate=None, screening_ratio=0.25, spatial_index=None, archive=None, profiler=None, controller=None, n_perturbed=None,
+                 executor=None, n_workers=None, max_in_flight=None, seed=None):
+        for name, component in [('surrogate', surrogate), ('spatial_index', spatial_index), ('archive', archive), ('profiler', profiler), ('controller', controller)]:
+            if component != None:
+                raise ValueError("AsyncEnhancedBA does not support the " + name + " option")
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.n_workers
+        if self.max_in_flight < 1:
+            raise ValueError("At least one evaluation should be in flight")
+        # Submitted evaluations: future -> (kind, site, bee), and the planned ones: (kind, site)
+        self.inFlight = {}
+        self.planned = collections.deque()
+        # Round of every site which got recruits: site -> [round size, results without improvement, best scout]
+        self.rounds = {}
+        self.to_save_best_sites = []
+        self.to_save_recruits = []
+        # The initial scouts are evaluated as one batch by the same evaluator
+        self.ownExecutor = evaluator == None and executor == None
+        if evaluator == None:
+            if executor == None:
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.n_workers)
+            evaluator = evaluators.PoolEvaluator(executor)
+        self.executor = executor
+        super().__init__(fitnessFunction, lowerBoundaries, upperBoundaries, ngh=ngh, ns=ns, nb=nb, nr=nr, sf=sf, stlim=stlim, evaluator=evaluator,
+                         initialise=initialise, allocation=allocation, n_perturbed=n_perturbed, seed=seed)
+        # Every submitted bee is evaluated in full
+        self.incremental = False
+
+    # Plan the next round: the recruits of every site drawn by the waggle dance and the global scouts, in random order
+    def plan(self):
+        tasks = [(SCOUT, None)] * (self.ns - self.nb)
+        for site, n_recruits in zip(self.currentSites, self.waggle_dance()):
+            if n_recruits > 0:
+                tasks += [(ABANDON if site.shrinkTimes == self.stlim else RECRUIT, site)] * n_recruits
+                self.rounds.setdefault(site, [0, 0, None])[0] = n_recruits
+        self.stream.shuffle(tasks)
+        self.planned.extend(tasks)
+
+    # Keep max_in_flight evaluations running, the bees are sampled around the current position and patch of their site
+    def fill(self):
+        while len(self.inFlight) < self.max_in_flight:
+            if len(self.planned) == 0:
+                self.plan()
+            kind, site = self.planned.popleft()
+            if kind == RECRUIT:
+                bee = self.generate_recruit(site, evaluate=False)
+            else:
+                bee = self.generate_scout(evaluate=False)
+            hits = getattr(self.fitnessFunction, 'hits', 0)
+            self.inFlight[self.evaluator.submit(self.fitnessFunction, bee.position)] = (kind, site, bee)
+            self.n_cache_hits += getattr(self.fitnessFunction, 'hits', 0) - hits
+
+    def isCurrent(self, site):
+        return any(s is site for s in self.currentSites)
+
+    # Handle the result of one evaluation
+    def handle(self, kind, site, bee):
+        self.n_evaluations += 1
+        if kind == SCOUT or not self.isCurrent(site) or (kind == ABANDON and site.shrinkTimes != self.stlim):
+            # The bees of a site which is no longer selected (or which improved after it was planned for abandonment)
+            # compete like global scouts
+            self.compete(bee)
+        elif kind == RECRUIT:
+            siteRound = self.rounds[site]
+            if bee.fitness > site.fitness:
+                site.position = bee.position
+                site.fitness = bee.fitness
+                site.shrinkTimes = 0
+                siteRound[1] = 0
+                self.sortSites()
+            elif site.shrinkTimes < self.stlim:
+                siteRound[1] += 1
+                if siteRound[1] >= siteRound[0]:
+                    siteRound[1] = 0
+                    site.shrinkTimes += 1
+                    site.patchSize = [x * (1 - self.sf) for x in site.patchSize]
+        else:
+            siteRound = self.rounds[site]
+            if siteRound[2] == None or bee.fitness > siteRound[2].fitness:
+                siteRound[2] = bee
+            siteRound[1] += 1
+            if siteRound[1] >= siteRound[0]:
+                # Abandon this site, the best scout of its round takes its place
+                del self.rounds[site]
+                self.currentSites = [siteRound[2] if s is site else s for s in self.currentSites]
+                self.sortSites()
+        if self.currentSites[0].fitness > self.bestSolution.fitness:
+            self.bestSolution = self.currentSites[0].copy()
+
+    # A scout replaces the worst current site when it is better
+    def compete(self, bee):
+        if bee.fitness > self.currentSites[-1].fitness:
+            self.rounds.pop(self.currentSites[-1], None)
+            self.currentSites[-1] = bee
+            self.sortSites()
+
+    def sortSites(self):
+        self.currentSites.sort(reverse=True)
+
+    # One iteration is the arrival of nr + ns - nb results, whatever the bees they come from
+    def singleIteration(self):
+        target = self.nr + self.ns - self.nb
+        done = 0
+        if self.keep_bees_trace:
+            self.to_save_best_sites = [x.copy() for x in self.currentSites]
+        while done < target:
+            self.fill()
+            finished, _ = concurrent.futures.wait(list(self.inFlight), return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                kind, site, bee = self.inFlight.pop(future)
+                bee.fitness = self.evaluator.result(self.fitnessFunction, bee.position, future)
+                self.handle(kind, site, bee)
+                done += 1
+        self.record.append(self.bestSolution.fitness)
+
+    # Cancel the evaluations which have not started and shut the executor down when it was created by the instance
+    def close(self):
+        for future in self.inFlight:
+            future.cancel()
+        self.inFlight = {}
+        self.planned.clear()
+        self.rounds = {}
+        if self.ownExecutor:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
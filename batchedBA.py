@@ -0,0 +1,183 @@
+"""
+MSc Project
+Batched enhanced bees algorithm: many independent colonies in lockstep
+The independent runs of a benchmark are small problems whose cost is mostly
+interpreter overhead. BatchedEnhancedBA advances R colonies of the enhanced bees
+algorithm together: the sites of all the colonies are stored in (R, nb, ...)
+arrays and the recruits and scouts in (R, nr + ns - nb, ...) arrays (every
+colony sends exactly nr recruits per iteration), so that the waggle dance, the
+sampling, the evaluation (one batch for all the colonies) and the selection are
+done once per iteration for every colony. A colony which reaches max_fitness or
+max_iteration is masked out and costs nothing afterwards.
+Each colony follows the algorithm of VectorizedEnhancedBA, the colonies share
+one random_streams.RandomStream, seeded from the seed of the instance: the
+draws of all the colonies are batched in one call of its generator, so a colony
+does not draw the numbers of the same colony run alone (or with another number
+of colonies), the results are reproducible given the seed and n_colonies.
+Author: Heng Zhai
+"""
+
+import numpy as np
+import evaluators
+import recruitment
+import random_streams
+
+class BatchedEnhancedBA(object):
+    def __init__(self, fitnessFunction, lowerBoundaries, upperBoundaries, n_colonies=50, ngh=None, ns=35, nb=8, nr=80, sf=.2, stlim=10,
+                 evaluator=None, allocation=None, seed=None):
+        self.fitnessFunction = fitnessFunction
+        self.lowerBoundaries = lowerBoundaries
+        self.upperBoundaries = upperBoundaries
+        self.n_colonies = n_colonies
+        self.ns = ns
+        self.nb = nb
+        self.nr = nr
+        self.sf = sf
+        self.stlim = stlim
+        # seed is None, an int, a numpy SeedSequence or a RandomStream, as for EnhancedBA
+        if isinstance(seed, random_streams.RandomStream):
+            self.stream = seed
+        else:
+            self.stream = random_streams.RandomStream(seed)
+        self.rng = self.stream.generator
+        self.lowerArray = np.asarray(lowerBoundaries, dtype=float)
+        self.upperArray = np.asarray(upperBoundaries, dtype=float)
+        self.centreArray = (self.upperArray + self.lowerArray) / 2.0
+        self.middleArray = (self.upperArray - self.lowerArray) / 2.0
+        self.nghArray = np.ones(len(lowerBoundaries)) if ngh is None else np.asarray(ngh, dtype=float)
+        if evaluator == None:
+            self.evaluator = evaluators.SerialEvaluator()
+        else:
+            self.evaluator = evaluator
+        if allocation == None:
+            self.allocation = recruitment.TournamentAllocation()
+        else:
+            self.allocation = allocation
+        self.checkParameters()
+        # Number of iterations and of evaluations of each colony, and the colonies still running
+        self.iterations = np.zeros(n_colonies, dtype=int)
+        self.n_evaluations = np.zeros(n_colonies, dtype=int)
+        self.active = np.ones(n_colonies, dtype=bool)
+        # Best fitness of every colony after each lockstep iteration (the fitness of a stopped colony is repeated)
+        self.record = []
+        self.initialise_solution()
+
+    def checkParameters(self):
+        if len(self.lowerBoundaries) != len(self.upperBoundaries):
+            raise ValueError("The sizes of the lower and upper bounds don't match")
+        if self.nb < 2:
+            raise ValueError("The number of best sites should be greater than or equal to 2")
+        if self.ns < self.nb:
+            raise ValueError("The number of scout bees should be greater than or equal to the number of best sites")
+        if self.sf < 0 or self.sf > 1:
+            raise ValueError("The shrink factor should be greater than 0 and less than 1")
+        if self.n_colonies < 1:
+            raise ValueError("The number of colonies should be greater than or equal to 1")
+
+    # Sample one bee per row of centres (any leading shape) in the hyper box scaled by the patch sizes, clipped to the boundaries
+    def sample(self, centres, patchSizes):
+        positions = self.rng.uniform(-1.0, 1.0, size=centres.shape)
+        positions *= self.middleArray
+        positions *= patchSizes
+        positions += centres
+        return np.clip(positions, self.lowerArray, self.upperArray, out=positions)
+
+    # Evaluate an (..., n_dimensions) array of positions as one batch
+    def evaluate(self, positions):
+        flat = positions.reshape(-1, positions.shape[-1])
+        return np.asarray(self.evaluator.evaluate(self.fitnessFunction, flat), dtype=float).reshape(positions.shape[:-1])
+
+    def initialise_solution(self):
+        n_dimensions = len(self.centreArray)
+        positions = self.sample(np.broadcast_to(self.centreArray, (self.n_colonies, self.ns, n_dimensions)), 1.0)
+        fitness = self.evaluate(positions)
+        self.n_evaluations += self.ns
+        self.sitePositions, self.siteFitness = self.select(positions, fitness)
+        self.sitePatches = np.tile(self.nghArray, (self.n_colonies, self.nb, 1))
+        self.siteShrinks = np.zeros((self.n_colonies, self.nb), dtype=int)
+        self.bestPositions = self.sitePositions[:, 0].copy()
+        self.bestFitness = self.siteFitness[:, 0].copy()
+
+    # First nb candidates of every colony in descending fitness (stable, like list.sort), with their order
+    def select(self, positions, fitness, order=None):
+        if order is None:
+            order = np.argsort(-fitness, axis=1, kind='stable')[:, :self.nb]
+        return np.take_along_axis(positions, order[:, :, None], axis=1), np.take_along_axis(fitness, order, axis=1)
+
+    # Number of recruits of every site of the colonies (rows), nr per colony
+    def waggle_dance(self, fitness):
+        probabilities = np.array([self.allocation.probabilities(f) for f in fitness])
+        return self.rng.multinomial(self.nr, probabilities)
+
+    # One iteration of the colonies given by their indices
+    def step(self, colonies):
+        n_colonies = len(colonies)
+        n_dimensions = len(self.centreArray)
+        n_scouts = self.ns - self.nb
+        positions = self.sitePositions[colonies]
+        fitness = self.siteFitness[colonies]
+        patches = self.sitePatches[colonies]
+        shrinks = self.siteShrinks[colonies]
+        counts = self.waggle_dance(fitness)
+        abandoned = shrinks == self.stlim
+        # Abandoned sites send their recruits as scouts over the whole search space
+        centres = np.where(abandoned[:, :, None], self.centreArray, positions)
+        patchSizes = np.where(abandoned[:, :, None], 1.0, patches)
+        # Site of every recruit, as an index in the flattened (colony, site) arrays, nr recruits per colony
+        siteIds = np.repeat(np.arange(n_colonies * self.nb), counts.ravel())
+        bees = self.sample(np.concatenate((centres.reshape(-1, n_dimensions)[siteIds].reshape(n_colonies, self.nr, n_dimensions),
+                                           np.broadcast_to(self.centreArray, (n_colonies, n_scouts, n_dimensions))), axis=1),
+                           np.concatenate((patchSizes.reshape(-1, n_dimensions)[siteIds].reshape(n_colonies, self.nr, n_dimensions),
+                                           np.ones((n_colonies, n_scouts, n_dimensions))), axis=1))
+        beesFitness = self.evaluate(bees)
+        self.n_evaluations[colonies] += self.nr + n_scouts
+        # Best recruit of every (colony, site): order by site, then by descending fitness, and take the first of each segment
+        recruitFitness = beesFitness[:, :self.nr].ravel()
+        flatCounts = counts.ravel()
+        starts = np.cumsum(flatCounts) - flatCounts
+        order = np.lexsort((-recruitFitness, siteIds))
+        best = order[np.minimum(starts, len(order) - 1)].reshape(n_colonies, self.nb)
+        bestFitness = recruitFitness[best]
+        active = counts > 0
+        abandoned &= active
+        improved = active & ~abandoned & (bestFitness > fitness)
+        replaced = abandoned | improved
+        recruits = bees[:, :self.nr].reshape(-1, n_dimensions)
+        positions[replaced] = recruits[best[replaced]]
+        fitness[replaced] = bestFitness[replaced]
+        patches[abandoned] = self.nghArray
+        shrinks[replaced] = 0
+        shrunk = active & ~replaced
+        shrinks[shrunk] += 1
+        patches[shrunk] *= (1 - self.sf)
+        # Selection among the sites and the (ns - nb) global scouts of every colony
+        candidates = np.concatenate((positions, bees[:, self.nr:]), axis=1)
+        candidatesFitness = np.concatenate((fitness, beesFitness[:, self.nr:]), axis=1)
+        order = np.argsort(-candidatesFitness, axis=1, kind='stable')[:, :self.nb]
+        self.sitePositions[colonies], self.siteFitness[colonies] = self.select(candidates, candidatesFitness, order)
+        self.sitePatches[colonies] = np.take_along_axis(np.concatenate((patches, np.broadcast_to(self.nghArray, (n_colonies, n_scouts, n_dimensions))), axis=1),
+                                                        order[:, :, None], axis=1)
+        self.siteShrinks[colonies] = np.take_along_axis(np.concatenate((shrinks, np.zeros((n_colonies, n_scouts), dtype=int)), axis=1), order, axis=1)
+        improvedBest = self.siteFitness[colonies, 0] > self.bestFitness[colonies]
+        self.bestFitness[colonies[improvedBest]] = self.siteFitness[colonies[improvedBest], 0]
+        self.bestPositions[colonies[improvedBest]] = self.sitePositions[colonies[improvedBest], 0]
+        self.iterations[colonies] += 1
+
+    # Run every colony until it reaches max_fitness or max_iteration (checked before each of its iterations, like
+    # EnhancedBA.stoppingCriterion), returns the (iterations, best fitness) of each colony, as returned by stoppingCriterion
+    def stoppingCriterion(self, max_iteration=None, max_fitness=None):
+        if max_iteration == None and max_fitness == None:
+            raise ValueError("Please provide a stop criteria")
+        startIterations = self.iterations.copy()
+        while True:
+            self.active[:] = True
+            if max_iteration != None:
+                self.active &= self.iterations - startIterations < max_iteration
+            if max_fitness != None:
+                self.active &= self.bestFitness < max_fitness
+            colonies = np.flatnonzero(self.active)
+            if len(colonies) == 0:
+                break
+            self.step(colonies)
+            self.record.append(self.bestFitness.copy())
+        return [(int(i), float(f)) for i, f in zip(self.iterations - startIterations, self.bestFitness)]
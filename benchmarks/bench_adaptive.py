@@ -0,0 +1,66 @@
+"""
+Benchmark of the online parameter controller (adaptive.AdaptiveController)
+
+Every benchmark function of testing.py is optimised with the hand-tuned
+parameters of testing.py (the settings of test.csv) and with a controller
+starting from adaptive.initial_parameters, until the same acceptable fitness
+(optimum - 0.001) is reached. For each configuration the success rate, the mean
+iterations and calls of the objective function (objectiveCalls()) to reach the
+acceptable fitness, the calls relative to the fixed parameters and the
+parameters at the end of the last run are reported. Both configurations use the same seeds.
+
+Usage:
+  python benchmarks/bench_adaptive.py
+  python benchmarks/bench_adaptive.py --runs 50 --engine vectorized
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adaptive
+import enhancedBA
+import testing
+import vectorizedBA
+
+engines = {'enhanced': enhancedBA.EnhancedBA, 'vectorized': vectorizedBA.VectorizedEnhancedBA}
+
+def run(ba_class, test_function, lb, ub, bees_parameters, optimum_fitness, use_controller, args):
+    iterations = []
+    evaluations = []
+    successes = 0
+    start = time.perf_counter()
+    for seed in range(args.runs):
+        controller = adaptive.AdaptiveController(period=args.period) if use_controller else None
+        a = ba_class(test_function, lb, ub, controller=controller, seed=seed, **bees_parameters)
+        iteration, fitness = a.stoppingCriterion(max_iteration=args.max_iteration, max_fitness=optimum_fitness - 0.001)
+        iterations.append(iteration)
+        evaluations.append(a.objectiveCalls())
+        successes += fitness >= optimum_fitness - 0.001
+    return successes, np.mean(iterations), np.mean(evaluations), time.perf_counter() - start, (a.ns, a.nb, a.nr, a.stlim)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the online parameter controller against the parameters of testing.py")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-iteration", type=int, default=1000)
+    parser.add_argument("--period", type=int, default=5)
+    parser.add_argument("--engine", choices=sorted(engines), default='enhanced')
+    args = parser.parse_args()
+
+    ba_class = engines[args.engine]
+    print("Function\t\tParameters\tSuccess\tIterations\tCalls\t\tRelative\tWall (s)\tFinal (ns, nb, nr, stlim)")
+    for function_name, test_function, lb, ub, bees_parameters, optimum_fitness in testing.benchmark_list():
+        fixed = None
+        for use_controller in [False, True]:
+            parameters = adaptive.initial_parameters if use_controller else bees_parameters
+            successes, iterations, evaluations, wall_time, final = run(ba_class, test_function, lb, ub, parameters, optimum_fitness, use_controller, args)
+            if fixed == None:
+                fixed = evaluations
+            print(function_name[:22].ljust(22) + "\t" + ("adaptive" if use_controller else "fixed") + "\t\t" + str(successes) + "/" + str(args.runs) + "\t" +
+                  "%.1f" % iterations + "\t\t" + "%.0f" % evaluations + "\t\t" + "%.2f" % (evaluations / fixed) + "\t\t" + "%.2f" % wall_time + "\t\t" + str(final))
@@ -0,0 +1,78 @@
+"""
+Benchmark of the recruit allocation policies of the waggle dance
+
+1. Cost of one allocation: the previous loop (nr calls to random.sample, then
+   two list.count scans for each site) against the batched multinomial draw of
+   recruitment.TournamentAllocation, with the mean number of recruits of each
+   site to show that the two are the same tournament.
+2. Quality and cost of the policies in recruitment.policies on some benchmark
+   functions: success rate, mean iterations and mean evaluations to reach the
+   acceptable fitness used in testing.py.
+
+Usage:
+  python benchmarks/bench_allocation.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import recruitment
+import python_benchmark_functions.benchmark_functions as bf
+
+# The previous waggle dance, without the count carried over to the sites which were not chosen
+def legacy_tournament(nb, nr):
+    recruits_choices = []
+    for i in range(nr):
+        randIndex = random.sample(range(0, nb), 2)
+        if randIndex[0] < randIndex[1]:
+            recruits_choices.append(randIndex[0])
+        else:
+            recruits_choices.append(randIndex[1])
+    return [recruits_choices.count(j) for j in range(nb)]
+
+def compare_cost(nb, nr, n_draws=2000):
+    policy = recruitment.TournamentAllocation()
+    fitness = np.linspace(0.0, -1.0, nb)
+    rng = np.random.default_rng(0)
+    legacy_time = min(timeit.repeat(lambda: legacy_tournament(nb, nr), number=n_draws, repeat=3)) / n_draws
+    batched_time = min(timeit.repeat(lambda: policy.allocate(fitness, nr, rng), number=n_draws, repeat=3)) / n_draws
+    legacy_mean = np.mean([legacy_tournament(nb, nr) for _ in range(n_draws)], axis=0)
+    batched_mean = np.mean([policy.allocate(fitness, nr, rng) for _ in range(n_draws)], axis=0)
+    return legacy_time, batched_time, legacy_mean, batched_mean
+
+def compare_policies(function_name, test_function, bees_parameters, n_runs=10, max_iteration=1000):
+    lb, ub = test_function.getSuggestedBounds()
+    optimum_fitness = test_function.getMaximum()[0]
+    for name in sorted(recruitment.policies):
+        iterations = []
+        evaluations = []
+        successes = 0
+        for run in range(n_runs):
+            a = enhancedBA.EnhancedBA(test_function, lb, ub, allocation=recruitment.policies[name](), seed=run, **bees_parameters)
+            iteration, fitness = a.stoppingCriterion(max_iteration=max_iteration, max_fitness=optimum_fitness - 0.001)
+            iterations.append(iteration)
+            evaluations.append(a.n_evaluations)
+            successes += fitness >= optimum_fitness - 0.001
+        print(function_name + "\t" + name + "\t" + str(successes) + "/" + str(n_runs) + "\t\t" + "%.1f" % np.mean(iterations) + "\t\t" + "%.0f" % np.mean(evaluations))
+
+
+if __name__ == "__main__":
+    print("nb\tnr\tprevious (us)\tbatched (us)\tspeed-up")
+    for nb, nr in [(5, 100), (8, 80), (10, 80), (20, 100)]:
+        legacy_time, batched_time, legacy_mean, batched_mean = compare_cost(nb, nr)
+        print(str(nb) + "\t" + str(nr) + "\t" + "%.1f" % (legacy_time * 1e6) + "\t\t" + "%.1f" % (batched_time * 1e6) + "\t\t" + "%.1fx" % (legacy_time / batched_time))
+        print("\tmean recruits per site, previous: " + " ".join("%.1f" % x for x in legacy_mean))
+        print("\tmean recruits per site, batched:  " + " ".join("%.1f" % x for x in batched_mean))
+
+    print('')
+    print("Function\tPolicy\t\tSuccess\t\tIterations\tEvaluations")
+    compare_policies("Ackley(10D)", bf.Ackley(n_dimensions=10, opposite=True), {'ns':30, 'nb':8, 'nr':80, 'stlim':5})
+    compare_policies("Schwefel(2D)", bf.Schwefel(n_dimensions=2, opposite=True), {'ns':35, 'nb':8, 'nr':80, 'stlim':10})
+    compare_policies("Hypersphere(10D)", bf.Hypersphere(n_dimensions=10, opposite=True), {'ns':35, 'nb':10, 'nr':80, 'stlim':10})
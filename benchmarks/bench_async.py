@@ -0,0 +1,88 @@
+"""
+Benchmark of the asynchronous steady-state variant (asyncBA.AsyncEnhancedBA)
+
+A stand-in for an expensive simulation wraps a benchmark function of testing.py
+and sleeps before returning its value: most calls take --latency seconds, a
+fraction --slow-fraction of them take --slow-factor times longer. The
+generational EnhancedBA (every iteration evaluated as one batch on a thread
+pool, ThreadPoolEvaluator) and AsyncEnhancedBA (evaluations submitted
+continuously to a thread pool of the same size) get the same budget of
+evaluations. The throughput in evaluations per second, the busy share of the
+workers and the best fitness reached are reported.
+
+Usage:
+  python benchmarks/bench_async.py
+  python benchmarks/bench_async.py --workers 16 --evaluations 4000 --slow-fraction 0.05 --slow-factor 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncBA
+import enhancedBA
+import evaluators
+import python_benchmark_functions.benchmark_functions as bf
+
+# Objective with a skewed evaluation time, the sleeping time of all the calls is summed to measure the busy share of the workers
+class SleepObjective(object):
+    def __init__(self, function, latency, slow_fraction, slow_factor, seed=0):
+        self.function = function
+        self.latency = latency
+        self.slow_fraction = slow_fraction
+        self.slow_factor = slow_factor
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.busy = 0.0
+
+    def __call__(self, point):
+        with self.lock:
+            delay = self.latency * (self.slow_factor if self.rng.random() < self.slow_fraction else 1.0)
+            self.busy += delay
+        time.sleep(delay)
+        return self.function(point)
+
+def run(engine, function, lb, ub, args, seed):
+    objective = SleepObjective(function, args.latency, args.slow_fraction, args.slow_factor, seed)
+    parameters = {'ns': args.ns, 'nb': args.nb, 'nr': args.nr, 'stlim': args.stlim}
+    start = time.perf_counter()
+    if engine == 'generational':
+        with evaluators.ThreadPoolEvaluator(max_workers=args.workers) as evaluator:
+            a = enhancedBA.EnhancedBA(objective, lb, ub, evaluator=evaluator, seed=seed, **parameters)
+            a.stoppingCriterion(max_evaluations=args.evaluations)
+    else:
+        with asyncBA.AsyncEnhancedBA(objective, lb, ub, n_workers=args.workers, seed=seed, **parameters) as a:
+            a.stoppingCriterion(max_evaluations=args.evaluations)
+    wall_time = time.perf_counter() - start
+    return a.n_evaluations, wall_time, objective.busy / (wall_time * args.workers), a.bestSolution.fitness
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the asynchronous steady-state variant against the generational loop")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--evaluations", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--slow-fraction", type=float, default=0.1)
+    parser.add_argument("--slow-factor", type=float, default=20.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--ns", type=int, default=35)
+    parser.add_argument("--nb", type=int, default=8)
+    parser.add_argument("--nr", type=int, default=80)
+    parser.add_argument("--stlim", type=int, default=10)
+    args = parser.parse_args()
+
+    print("Function\t\tEngine\t\tEvaluations/s\tWorkers busy\tBest fitness")
+    for function_name, function in [("Hypersphere(10D)", bf.Hypersphere(n_dimensions=10, opposite=True)), ("Ackley(10D)", bf.Ackley(n_dimensions=10, opposite=True)),
+                                    ("Schwefel(2D)", bf.Schwefel(n_dimensions=2, opposite=True))]:
+        lb, ub = function.getSuggestedBounds()
+        for engine in ['generational', 'async']:
+            results = [run(engine, function, lb, ub, args, seed) for seed in range(args.runs)]
+            print(function_name.ljust(22) + "\t" + engine.ljust(12) + "\t" + "%.0f" % np.mean([n / wall for n, wall, _, _ in results]) + "\t\t" +
+                  "%.0f%%" % (100 * np.mean([busy for _, _, busy, _ in results])) + "\t\t" + "%.4g" % np.mean([fitness for _, _, _, fitness in results]))
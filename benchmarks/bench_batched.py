@@ -0,0 +1,58 @@
+"""
+Benchmark of the lockstep batched runner (batchedBA.BatchedEnhancedBA)
+
+The n_runs independent runs of every benchmark function of testing.py are done
+as a loop of testing.single_run with EnhancedBA and with VectorizedEnhancedBA,
+and as the colonies of one BatchedEnhancedBA. The wall time of the runs, the
+mean iterations to reach the acceptable fitness and the number of successful
+runs are reported for each runner.
+
+Usage:
+  python benchmarks/bench_batched.py
+  python benchmarks/bench_batched.py --runs 100 --max-iteration 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batchedBA
+import enhancedBA
+import testing
+import vectorizedBA
+
+def loop(ba_class, test_function, lb, ub, bees_parameters, optimum_fitness, args):
+    seeds = testing.run_seeds(0, "bench_batched", args.runs)
+    return [testing.single_run(test_function, lb, ub, bees_parameters, optimum_fitness, seed, ba_class, args.max_iteration) for seed in seeds]
+
+def batched(test_function, lb, ub, bees_parameters, optimum_fitness, args):
+    a = batchedBA.BatchedEnhancedBA(test_function, lb, ub, n_colonies=args.runs, seed=0, **bees_parameters)
+    return a.stoppingCriterion(max_iteration=args.max_iteration, max_fitness=optimum_fitness - 0.001)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the lockstep batched runner against the loop of independent runs")
+    parser.add_argument("--runs", type=int, default=testing.n_runs)
+    parser.add_argument("--max-iteration", type=int, default=5000)
+    args = parser.parse_args()
+
+    runners = [("EnhancedBA", lambda *benchmark: loop(enhancedBA.EnhancedBA, *benchmark, args)),
+               ("Vectorized", lambda *benchmark: loop(vectorizedBA.VectorizedEnhancedBA, *benchmark, args)),
+               ("Batched", lambda *benchmark: batched(*benchmark, args))]
+    print("Function\t\tRunner\t\tWall (s)\tSpeed-up\tIterations\tSuccess")
+    for function_name, test_function, lb, ub, bees_parameters, optimum_fitness in testing.benchmark_list():
+        reference = None
+        for runner_name, runner in runners:
+            start = time.perf_counter()
+            results = runner(test_function, lb, ub, bees_parameters, optimum_fitness)
+            wall_time = time.perf_counter() - start
+            if reference == None:
+                reference = wall_time
+            successes = sum(fitness >= optimum_fitness - 0.001 for _, fitness in results)
+            print(function_name[:22].ljust(22) + "\t" + runner_name.ljust(10) + "\t" + "%.2f" % wall_time + "\t\t" + "%.1fx" % (reference / wall_time) + "\t\t" +
+                  "%.1f" % np.mean([iteration for iteration, _ in results]) + "\t\t" + str(successes) + "/" + str(args.runs))
@@ -0,0 +1,76 @@
+"""
+Benchmark of the fast evaluation mode of the benchmark functions
+
+Every benchmark function is evaluated in 2D, 10D and 100D (the functions only
+defined in 2D are run in 2D) point by point and in batches, with the default
+mode (every point validated) and with the fast mode of setFastMode() using the
+numpy implementation and, when numba is installed, the compiled kernels. The
+number of evaluations per second of each mode is reported.
+
+Usage:
+  python benchmarks/bench_fast_functions.py
+  python benchmarks/bench_fast_functions.py --batch-size 1000 --dimensions 10 100
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python_benchmark_functions.benchmark_functions as bf
+from python_benchmark_functions import kernels
+
+# (name, constructor taking the number of dimensions, whether the function is defined for any number of dimensions)
+functions = [("Ackley", lambda n: bf.Ackley(n_dimensions=n, opposite=True), True),
+             ("Schaffer", lambda n: bf.Schaffer(opposite=True), False),
+             ("Schwefel", lambda n: bf.Schwefel(n_dimensions=n, opposite=True), True),
+             ("Easom", lambda n: bf.Easom(opposite=True), False),
+             ("GoldsteinAndPrice", lambda n: bf.GoldsteinAndPrice(opposite=True), False),
+             ("Rastrigin", lambda n: bf.Rastrigin(n_dimensions=n, opposite=True), True),
+             ("Hypersphere", lambda n: bf.Hypersphere(n_dimensions=n, opposite=True), True),
+             ("MartinGaddy", lambda n: bf.MartinGaddy(opposite=True), False)]
+
+# Evaluations per second of the best of 3 repeats, each evaluating the whole set of points n_loops times
+def rate(evaluate, n_points, n_loops):
+    return n_points * n_loops / min(timeit.repeat(evaluate, number=n_loops, repeat=3))
+
+def measure(test_function, batch_size, n_loops):
+    lb, ub = test_function.getSuggestedBounds()
+    points = np.random.default_rng(0).uniform(lb, ub, (batch_size, test_function.n_dimensions))
+    point_list = points.tolist()
+    rates = {}
+    for backend in [None, 'numpy'] + (['numba'] if kernels.available() else []):
+        test_function.setFastMode(backend)
+        # The first call compiles the numba kernel
+        test_function.evaluate_batch(points)
+        rates[(backend, 'point')] = rate(lambda: [test_function(p) for p in point_list], batch_size, max(1, n_loops // 10))
+        rates[(backend, 'batch')] = rate(lambda: test_function.evaluate_batch(points), batch_size, n_loops)
+    test_function.setFastMode(None)
+    return rates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the fast evaluation mode of the benchmark functions")
+    parser.add_argument("--dimensions", nargs="*", type=int, default=[2, 10, 100])
+    parser.add_argument("--batch-size", type=int, default=100, help="number of points per batch (EnhancedBA evaluates ns - nb + nr points per iteration)")
+    parser.add_argument("--loops", type=int, default=200)
+    args = parser.parse_args()
+
+    modes = [(None, 'point'), (None, 'batch'), ('numpy', 'point'), ('numpy', 'batch')]
+    if kernels.available():
+        modes += [('numba', 'point'), ('numba', 'batch')]
+    else:
+        print("numba is not installed, only the numpy fast mode is measured")
+    print("Configuration".ljust(24) + "".join(((backend or "default") + " " + kind).rjust(16) for backend, kind in modes) + "   (evaluations/s)")
+    done = []
+    for name, constructor, any_dimensions in functions:
+        for n in (args.dimensions if any_dimensions else [2]):
+            if (name, n) in done:
+                continue
+            done.append((name, n))
+            rates = measure(constructor(n), args.batch_size, args.loops)
+            print((name + "/" + str(n) + "D").ljust(24) + "".join(("%.0f" % rates[mode]).rjust(16) for mode in modes))
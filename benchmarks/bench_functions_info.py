@@ -0,0 +1,73 @@
+"""
+Benchmark of the loading of the benchmark functions metadata (functions_info.json)
+
+1. Import time of python_benchmark_functions.benchmark_functions in a fresh
+   interpreter (numpy is imported first, so that only the module itself is timed).
+2. Time of getMaximum() and getSuggestedBounds() calls: the first call (which
+   reads the json file) and the following calls.
+3. Start-up cost of worker processes: a pool of spawned processes which each
+   import testing and build the benchmark list (suggested bounds and optimum of
+   the 8 benchmark functions), as testing.test_on_functions_parallel does.
+
+Usage:
+  python benchmarks/bench_functions_info.py
+  python benchmarks/bench_functions_info.py --workers 8 --repeats 10
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+import_script = ("import time, numpy; start = time.perf_counter(); import python_benchmark_functions.benchmark_functions as bf; "
+                 "imported = time.perf_counter(); f = bf.Rastrigin(n_dimensions=10, opposite=True); f.getSuggestedBounds(); f.getMaximum(); "
+                 "print(imported - start, time.perf_counter() - imported)")
+
+def fresh_import(n_repeats):
+    import_times = []
+    first_call_times = []
+    for _ in range(n_repeats):
+        output = subprocess.run([sys.executable, "-c", import_script], cwd=root, capture_output=True, text=True, check=True).stdout.split()
+        import_times.append(float(output[0]))
+        first_call_times.append(float(output[1]))
+    return statistics.median(import_times), statistics.median(first_call_times)
+
+def worker_task(_):
+    import testing
+    return len(testing.benchmark_list())
+
+# Time to spawn n_workers processes which all import testing and build the benchmark list
+def worker_start_up(n_workers):
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        list(executor.map(worker_task, range(n_workers)))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the loading of the benchmark functions metadata")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    import_time, first_call_time = fresh_import(args.repeats)
+    print("Import of benchmark_functions: " + "%.2f" % (import_time * 1000.0) + " ms (median of " + str(args.repeats) + " fresh interpreters)")
+    print("First getSuggestedBounds() and getMaximum(): " + "%.2f" % (first_call_time * 1000.0) + " ms")
+
+    import python_benchmark_functions.benchmark_functions as bf
+    f = bf.Rastrigin(n_dimensions=10, opposite=True)
+    f.getMaximum()
+    n_calls = 10000
+    print("Following getMaximum(): " + "%.2f" % (min(timeit.repeat(f.getMaximum, number=n_calls, repeat=3)) / n_calls * 1e6) + " us, " +
+          "getSuggestedBounds(): " + "%.2f" % (min(timeit.repeat(f.getSuggestedBounds, number=n_calls, repeat=3)) / n_calls * 1e6) + " us")
+
+    print("Start-up of " + str(args.workers) + " spawned workers (import testing, build the benchmark list): " +
+          "%.3f" % min(worker_start_up(args.workers) for _ in range(3)) + " s")
@@ -0,0 +1,92 @@
+"""
+Benchmark of the high-dimensional mode (n_perturbed) across dimensions
+
+Hypersphere and Rastrigin are optimised in 10D to 1000D with the same budget of
+fitness evaluations per dimension (--evaluations-per-dimension) by:
+  - EnhancedBA, every recruit perturbing all the coordinates
+  - EnhancedBA with n_perturbed coordinates per recruit, with and without the
+    delta evaluation of the separable functions (evaluate_delta)
+  - VectorizedEnhancedBA, every recruit perturbing all the coordinates
+  - VectorizedEnhancedBA with n_perturbed coordinates per recruit and the
+    incremental evaluation of the separable functions (evaluate_changes)
+  - the same without the incremental evaluation
+The wall time, the evaluations per second and the best fitness reached are
+reported for each configuration.
+Both engines are first checked to resume a run of the high-dimensional mode
+from a checkpoint exactly where it stopped (the script exits with an error
+otherwise).
+
+Usage:
+  python benchmarks/bench_high_dimensions.py
+  python benchmarks/bench_high_dimensions.py --dimensions 100 1000 --n-perturbed 1 --evaluations-per-dimension 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import vectorizedBA
+import python_benchmark_functions.benchmark_functions as bf
+
+def run(ba_class, function, n_perturbed, incremental, max_evaluations):
+    lb, ub = function.getSuggestedBounds()
+    a = ba_class(function, lb, ub, n_perturbed=n_perturbed, seed=0)
+    if not incremental:
+        a.incremental = False
+    start = time.perf_counter()
+    a.stoppingCriterion(max_evaluations=max_evaluations)
+    wall_time = time.perf_counter() - start
+    return wall_time, a.n_evaluations / wall_time, a.bestSolution.fitness
+
+# The record of a run checkpointed after n_iterations iterations and resumed with fromCheckpoint should be
+# the record of the uninterrupted run
+def check_resume(ba_class, function, n_perturbed, n_iterations=20):
+    lb, ub = function.getSuggestedBounds()
+    uninterrupted = ba_class(function, lb, ub, n_perturbed=n_perturbed, seed=0)
+    uninterrupted.stoppingCriterion(max_iteration=2 * n_iterations)
+    a = ba_class(function, lb, ub, n_perturbed=n_perturbed, seed=0)
+    a.stoppingCriterion(max_iteration=n_iterations)
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "checkpoint.pkl")
+        a.saveCheckpoint(file_name)
+        resumed = ba_class.fromCheckpoint(file_name, function)
+    resumed.stoppingCriterion(max_iteration=n_iterations)
+    return resumed.n_perturbed == n_perturbed and resumed.record == uninterrupted.record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the high-dimensional mode across dimensions")
+    parser.add_argument("--dimensions", type=int, nargs='+', default=[10, 100, 300, 1000])
+    parser.add_argument("--n-perturbed", type=int, default=3)
+    parser.add_argument("--evaluations-per-dimension", type=int, default=100)
+    parser.add_argument("--skip-enhanced", action='store_true', help="skip the list-based EnhancedBA, the slowest in high dimensions")
+    args = parser.parse_args()
+
+    for ba_class in [enhancedBA.EnhancedBA, vectorizedBA.VectorizedEnhancedBA]:
+        if not check_resume(ba_class, bf.Rastrigin(n_dimensions=50, opposite=True), args.n_perturbed):
+            sys.exit(ba_class.__name__ + " did not resume the high-dimensional mode from its checkpoint")
+    print("Resume from a checkpoint with n_perturbed=" + str(args.n_perturbed) + ": identical runs")
+
+    print("Function\tDimensions\tEngine\t\t\t\tWall (s)\tEvaluations/s\tBest fitness")
+    for function_class in [bf.Hypersphere, bf.Rastrigin]:
+        for n_dimensions in args.dimensions:
+            function = function_class(n_dimensions=n_dimensions, opposite=True)
+            max_evaluations = args.evaluations_per_dimension * n_dimensions
+            subset = min(args.n_perturbed, n_dimensions)
+            configurations = [("EnhancedBA, full", enhancedBA.EnhancedBA, None, False),
+                              ("EnhancedBA, subset", enhancedBA.EnhancedBA, subset, False),
+                              ("EnhancedBA, subset, incremental", enhancedBA.EnhancedBA, subset, True),
+                              ("Vectorized, full", vectorizedBA.VectorizedEnhancedBA, None, False),
+                              ("Vectorized, subset", vectorizedBA.VectorizedEnhancedBA, subset, False),
+                              ("Vectorized, subset, incremental", vectorizedBA.VectorizedEnhancedBA, subset, True)]
+            if args.skip_enhanced:
+                configurations = configurations[3:]
+            for name, ba_class, n_perturbed, incremental in configurations:
+                wall_time, rate, fitness = run(ba_class, function, n_perturbed, incremental, max_evaluations)
+                print(function.name.ljust(12) + "\t" + str(n_dimensions) + "\t\t" + name.ljust(32) + "\t" + "%.2f" % wall_time + "\t\t" +
+                      "%.0f" % rate + "\t\t" + "%.4g" % fitness)
@@ -0,0 +1,153 @@
+"""
+Micro-benchmark of the local search hot path of EnhancedBA
+
+The current implementation (Bee objects with __slots__, sites updated in place,
+recruits sampled with precomputed half-widths) is compared with the previous one,
+which built every scout and recruit through the Bee constructor and deep-copied
+the winning bees and the best site.
+
+For each implementation the time per iteration, the peak traced memory during
+the run and the number of deep copies per iteration are reported.
+
+Usage:
+  python benchmarks/bench_hot_path.py
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import python_benchmark_functions.benchmark_functions as bf
+
+# The Bee class before the hot path was optimised
+class LegacyBee(object):
+    def __init__(self, lowerBoundaries, upperBoundaries, shrinkTimes, patchSize, isScout=True, centre=None):
+        self.lowerBoundaries = lowerBoundaries
+        self.upperBoundaries = upperBoundaries
+        self.position = []
+        self.shrinkTimes = shrinkTimes
+        self.patchSize = patchSize
+        self.fitness = None
+        if centre == None:
+            centre=[(upperBoundaries[i] + lowerBoundaries[i]) / 2.0 for i in range(len(lowerBoundaries))]
+        if isScout:
+            self.initialiseValues([1.0]*len(lowerBoundaries), centre=centre)
+        else:
+            self.initialiseValues(patchSize, centre=centre)
+
+    def initialiseValues(self, patchSize, centre):
+        self.position = [0.0] * len(self.lowerBoundaries)
+        for i in range(len(self.lowerBoundaries)):
+            middle = (self.upperBoundaries[i] - self.lowerBoundaries[i]) / 2.0
+            self.position[i] = random.uniform(-middle, middle) * patchSize[i] + centre[i]
+            self.position[i] = min(self.position[i], self.upperBoundaries[i])
+            self.position[i] = max(self.position[i], self.lowerBoundaries[i])
+
+    def generateRecruit(self):
+        return LegacyBee(self.lowerBoundaries,self.upperBoundaries,0,self.patchSize,isScout=False,centre=self.position)
+
+    def __lt__(self, other):
+        return self.fitness < other.fitness
+
+
+# EnhancedBA with the previous site updates, using deep copies
+class LegacyEnhancedBA(enhancedBA.EnhancedBA):
+    def initialise_solution(self):
+        self.currentSites = [self.generate_scout(evaluate=False) for _ in range(self.ns)]
+        self.evaluate_bees(self.currentSites)
+        self.currentSites.sort(reverse=True)
+        self.currentSites = self.currentSites[:self.nb]
+        self.bestSolution = self.currentSites[0]
+
+    def localSearchForSingleSite(self, index, n_recruits, bees=None):
+        if n_recruits == 0:
+            return
+        if self.currentSites[index].shrinkTimes == self.stlim:
+            scouts = bees
+            scouts.sort(reverse=True)
+            self.currentSites[index] = copy.deepcopy(scouts[0])
+        else:
+            recruits = bees
+            bestRecruit = self.argmax(recruits)
+            if bestRecruit.fitness > self.currentSites[index].fitness:
+                self.currentSites[index] = copy.deepcopy(bestRecruit)
+                self.currentSites[index].shrinkTimes = 0
+            else:
+                self.currentSites[index].shrinkTimes += 1
+                self.currentSites[index].patchSize = [x * (1 - self.sf) for x in self.currentSites[index].patchSize]
+
+    def singleIteration(self):
+        allocation = self.waggle_dance()
+        bees = [self.generate_site_bees(j, allocation[j]) for j in range(self.nb)]
+        scouts = [self.generate_scout(evaluate=False) for _ in range(self.ns - self.nb)]
+        self.evaluate_bees([bee for site_bees in bees for bee in site_bees] + scouts)
+        for j in range(self.nb):
+            self.localSearchForSingleSite(j, allocation[j], bees[j])
+        self.currentSites += scouts
+        self.currentSites.sort(reverse=True)
+        self.currentSites = self.currentSites[:self.nb]
+        if self.currentSites[0].fitness > self.bestSolution.fitness:
+            self.bestSolution = copy.deepcopy(self.currentSites[0])
+        self.record.append(self.bestSolution.fitness)
+
+    def generate_scout(self, evaluate=True):
+        return LegacyBee(self.lowerBoundaries, self.upperBoundaries, 0, self.ngh, isScout=True, centre=None)
+
+    def generate_recruit(self, site, evaluate=True):
+        return site.generateRecruit()
+
+
+def measure(ba_class, test_function, bees_parameters, n_iterations, seed, n_repeats=5):
+    lb, ub = test_function.getSuggestedBounds()
+    # Best of n_repeats identical runs, to reduce the noise of the timing
+    elapsed = None
+    for _ in range(n_repeats):
+        random.seed(seed)
+        a = ba_class(test_function, lb, ub, seed=seed, **bees_parameters)
+        start = time.perf_counter()
+        for _ in range(n_iterations):
+            a.singleIteration()
+        run_time = time.perf_counter() - start
+        if elapsed == None or run_time < elapsed:
+            elapsed = run_time
+
+    # Second run with the same seed to trace the memory and count the deep copies
+    deepcopy = copy.deepcopy
+    n_copies = [0]
+    def counting_deepcopy(x, memo=None, _nil=[]):
+        if memo is None:
+            n_copies[0] += 1
+        return deepcopy(x, memo, _nil)
+    random.seed(seed)
+    a = ba_class(test_function, lb, ub, seed=seed, **bees_parameters)
+    copy.deepcopy = counting_deepcopy
+    tracemalloc.start()
+    try:
+        for _ in range(n_iterations):
+            a.singleIteration()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        copy.deepcopy = deepcopy
+    return elapsed / n_iterations, peak, n_copies[0] / float(n_iterations)
+
+
+if __name__ == "__main__":
+    bees_parameters = {'ns':30, 'nb':10, 'nr':80, 'stlim':5}
+    n_iterations = 300
+    print("Function\tImplementation\tms/iteration\tpeak KiB\tdeep copies/iteration")
+    for function_name, test_function in [("Rastrigin(10D)", bf.Rastrigin(n_dimensions=10, opposite=True)),
+                                         ("Rastrigin(30D)", bf.Rastrigin(n_dimensions=30, opposite=True)),
+                                         ("Ackley(10D)", bf.Ackley(n_dimensions=10, opposite=True))]:
+        results = {}
+        for name, ba_class in [("previous", LegacyEnhancedBA), ("current", enhancedBA.EnhancedBA)]:
+            results[name] = measure(ba_class, test_function, bees_parameters, n_iterations, seed=1)
+            t, peak, n_copies = results[name]
+            print(function_name + "\t" + name + "\t" + "%.3f" % (t * 1000.0) + "\t" + "%.1f" % (peak / 1024.0) + "\t" + "%.2f" % n_copies)
+        print(function_name + "\tspeed-up\t" + "%.2fx" % (results["previous"][0] / results["current"][0]))
@@ -0,0 +1,67 @@
+"""
+Per-phase profile of the enhanced bees algorithm
+
+Runs an engine on a benchmark function with a profiling.PhaseProfiler, prints
+the summary table (time, calls and bees per phase) and writes the trace in the
+Chrome trace event format (open it in chrome://tracing, https://ui.perfetto.dev
+or https://www.speedscope.app). The same run without a profiler measures the
+overhead of the instrumentation.
+
+Usage:
+  python benchmarks/bench_profiling.py
+  python benchmarks/bench_profiling.py --engine vectorized --function Rastrigin --dimensions 30 --trace trace.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import vectorizedBA
+import profiling
+import python_benchmark_functions.benchmark_functions as bf
+
+engines = {'enhanced': enhancedBA.EnhancedBA, 'vectorized': vectorizedBA.VectorizedEnhancedBA}
+
+functions = {'Ackley': bf.Ackley, 'Rastrigin': bf.Rastrigin, 'Schwefel': bf.Schwefel, 'Hypersphere': bf.Hypersphere}
+
+def run(ba_class, test_function, n_iterations, seed, profiler):
+    lb, ub = test_function.getSuggestedBounds()
+    a = ba_class(test_function, lb, ub, ns=35, nb=8, nr=80, stlim=10, profiler=profiler, seed=seed)
+    start = time.perf_counter()
+    for _ in range(n_iterations):
+        a.singleIteration()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-phase profile of the enhanced bees algorithm")
+    parser.add_argument("--engine", choices=sorted(engines), default="enhanced")
+    parser.add_argument("--function", choices=sorted(functions), default="Rastrigin")
+    parser.add_argument("--dimensions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", default="trace.json")
+    args = parser.parse_args()
+
+    test_function = functions[args.function](n_dimensions=args.dimensions, opposite=True)
+    ba_class = engines[args.engine]
+    disabled = min(run(ba_class, test_function, args.iterations, args.seed, None) for _ in range(args.repeats))
+    enabled = None
+    for _ in range(args.repeats):
+        profiler = profiling.PhaseProfiler()
+        run_time = run(ba_class, test_function, args.iterations, args.seed, profiler)
+        if enabled == None or run_time < enabled:
+            enabled = run_time
+            best = profiler
+
+    print(best.summary_table())
+    print('')
+    print("Without profiler: " + "%.3f" % (disabled / args.iterations * 1000.0) + " ms/iteration, with profiler: " +
+          "%.3f" % (enabled / args.iterations * 1000.0) + " ms/iteration (" + "%+.1f%%" % ((enabled / disabled - 1.0) * 100.0) + ")")
+    best.write_trace(args.trace)
+    print("Trace written to " + args.trace)
@@ -0,0 +1,74 @@
+"""
+Benchmark of the duplicate-site suppression with spatial_index.SpatialIndex
+
+The benchmark functions of testing.py, and Ackley, Rastrigin and Hypersphere in
+30D, are optimised with and without a spatial index, with the parameters of
+testing.py and the same acceptable fitness (optimum - 0.001). For each
+configuration the success rate, the mean iterations and evaluations to reach the
+acceptable fitness and the wall time are reported, together with the number of
+sites merged into a better site and of global scouts rejected or discarded.
+
+Usage:
+  python benchmarks/bench_spatial_index.py
+  python benchmarks/bench_spatial_index.py --runs 20 --exploration-radius 0.02 --site-radius 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import spatial_index
+import testing
+import python_benchmark_functions.benchmark_functions as bf
+
+def benchmark_list():
+    benchmarks = testing.benchmark_list()
+    for function_name, b_func, bees_parameters in [("Ackley(30D)", bf.Ackley(n_dimensions=30, opposite=True), testing.Ackley_bees_parameters),
+                                                    ("Rastrigin(30D)", bf.Rastrigin(n_dimensions=30, opposite=True), testing.Rastrigin_bees_parameters),
+                                                    ("Hypersphere(30D)", bf.Hypersphere(n_dimensions=30, opposite=True), testing.Hypersphere_bees_parameters)]:
+        lb, ub = b_func.getSuggestedBounds()
+        benchmarks.append((function_name, b_func, lb, ub, bees_parameters, b_func.getMaximum()[0]))
+    return benchmarks
+
+def run(test_function, lb, ub, bees_parameters, optimum_fitness, use_index, args):
+    iterations = []
+    evaluations = []
+    successes = 0
+    totals = {'merged': 0, 'rejected': 0, 'discarded': 0}
+    start = time.perf_counter()
+    for seed in range(args.runs):
+        index = None
+        if use_index:
+            index = spatial_index.SpatialIndex(exploration_radius=args.exploration_radius, site_radius=args.site_radius)
+        a = enhancedBA.EnhancedBA(test_function, lb, ub, spatial_index=index, seed=seed, **bees_parameters)
+        iteration, fitness = a.stoppingCriterion(max_iteration=args.max_iteration, max_fitness=optimum_fitness - 0.001)
+        iterations.append(iteration)
+        evaluations.append(a.n_evaluations)
+        successes += fitness >= optimum_fitness - 0.001
+        if index != None:
+            for key in totals:
+                totals[key] += index.report()[key]
+    return successes, np.mean(iterations), np.mean(evaluations), time.perf_counter() - start, totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the duplicate-site suppression with a spatial index")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-iteration", type=int, default=1000)
+    parser.add_argument("--exploration-radius", type=float, default=0.01)
+    parser.add_argument("--site-radius", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print("Function\t\tIndex\tSuccess\tIterations\tEvaluations\tWall (s)\tMerged\tRejected\tDiscarded")
+    for function_name, test_function, lb, ub, bees_parameters, optimum_fitness in benchmark_list():
+        for use_index in [False, True]:
+            successes, iterations, evaluations, wall_time, totals = run(test_function, lb, ub, bees_parameters, optimum_fitness, use_index, args)
+            print(function_name[:22].ljust(22) + "\t" + ("on" if use_index else "off") + "\t" + str(successes) + "/" + str(args.runs) + "\t" +
+                  "%.1f" % iterations + "\t\t" + "%.0f" % evaluations + "\t\t" + "%.2f" % wall_time + "\t\t" +
+                  (str(totals['merged']) + "\t" + str(totals['rejected']) + "\t\t" + str(totals['discarded']) if use_index else "-\t-\t\t-"))
@@ -0,0 +1,181 @@
+"""
+Benchmark suite and regression harness for the enhanced bees algorithm
+
+Every benchmark function is optimised at several dimensionalities (2D, 10D, 30D
+and 100D, the functions only defined in 2D are run in 2D) for a fixed number of
+iterations and a fixed seed. For every configuration the wall time, the time per
+iteration, the bees evaluated per second (n_evaluations), the calls of the
+objective function (objectiveCalls(), lower when bees are found in a cache or
+evaluated incrementally) and the peak traced memory are recorded.
+
+The results can be stored as a JSON baseline file, and later runs are compared
+with it: a configuration is flagged as a regression when its time per iteration
+is slower than the baseline by more than the margin, and the script then exits
+with status 1. The baseline records the settings of its runs (iterations, seed,
+repeats and parameters of the bees), a run with other settings is not compared
+with it (exit status 2). Baselines are specific to a machine, so they should be
+regenerated (--update-baseline) on the machine running the comparison; the
+committed benchmarks/baseline.json is the reference of the default settings on
+the machine described in it.
+
+Usage:
+  python benchmarks/bench_suite.py --update-baseline
+  python benchmarks/bench_suite.py --margin 0.2
+  python benchmarks/bench_suite.py --engine vectorized --functions Rastrigin Hypersphere --dimensions 10 100
+
+Requirements:
+  - numpy
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import vectorizedBA
+import python_benchmark_functions.benchmark_functions as bf
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+bees_parameters = {'ns':35, 'nb':8, 'nr':80, 'stlim':10}
+
+engines = {'enhanced': enhancedBA.EnhancedBA, 'vectorized': vectorizedBA.VectorizedEnhancedBA}
+
+# (name, constructor taking the number of dimensions, whether the function is defined for any number of dimensions)
+functions = [("Ackley", lambda n: bf.Ackley(n_dimensions=n, opposite=True), True),
+             ("Schaffer", lambda n: bf.Schaffer(opposite=True), False),
+             ("Schwefel", lambda n: bf.Schwefel(n_dimensions=n, opposite=True), True),
+             ("Easom", lambda n: bf.Easom(opposite=True), False),
+             ("GoldsteinAndPrice", lambda n: bf.GoldsteinAndPrice(opposite=True), False),
+             ("Rastrigin", lambda n: bf.Rastrigin(n_dimensions=n, opposite=True), True),
+             ("Hypersphere", lambda n: bf.Hypersphere(n_dimensions=n, opposite=True), True),
+             ("MartinGaddy", lambda n: bf.MartinGaddy(opposite=True), False)]
+
+def configurations(function_names, dimensions):
+    ret = []
+    for name, constructor, any_dimensions in functions:
+        if function_names and name not in function_names:
+            continue
+        for n in (dimensions if any_dimensions else [2]):
+            if (name, n) not in [(c[0], c[2]) for c in ret]:
+                ret.append((name, constructor, n))
+    return ret
+
+def run_configuration(ba_class, test_function, n_iterations, seed):
+    lb, ub = test_function.getSuggestedBounds()
+    start = time.perf_counter()
+    a = ba_class(test_function, lb, ub, seed=seed, **bees_parameters)
+    for _ in range(n_iterations):
+        a.singleIteration()
+    return time.perf_counter() - start, a.n_evaluations, a.objectiveCalls()
+
+# Best time of n_repeats runs, then one more run under tracemalloc for the peak memory
+def measure(ba_class, test_function, n_iterations, seed, n_repeats):
+    wall_time = None
+    for _ in range(n_repeats):
+        run_time, n_evaluations, n_calls = run_configuration(ba_class, test_function, n_iterations, seed)
+        if wall_time == None or run_time < wall_time:
+            wall_time = run_time
+    tracemalloc.start()
+    try:
+        run_configuration(ba_class, test_function, n_iterations, seed)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'wall_time': wall_time,
+            'time_per_iteration': wall_time / n_iterations,
+            'evaluations': n_evaluations,
+            'evaluations_per_second': n_evaluations / wall_time,
+            'objective_calls': n_calls,
+            'peak_memory': peak}
+
+def run_suite(engine, function_names, dimensions, n_iterations, seed, n_repeats):
+    results = {}
+    print("Configuration\t\twall (s)\tms/iteration\tbees/s\t\tcalls\t\tpeak KiB")
+    for name, constructor, n in configurations(function_names, dimensions):
+        key = engine + "/" + name + "/" + str(n) + "D"
+        results[key] = measure(engines[engine], constructor(n), n_iterations, seed, n_repeats)
+        r = results[key]
+        print(key + "\t" + "%.3f" % r['wall_time'] + "\t\t" + "%.3f" % (r['time_per_iteration'] * 1000.0) + "\t\t" + "%.0f" % r['evaluations_per_second'] + "\t\t" + str(r['objective_calls']) + "\t\t" + "%.1f" % (r['peak_memory'] / 1024.0))
+    return results
+
+# Configurations whose time per iteration is slower than the baseline by more than margin, as (key, current, baseline)
+def find_regressions(results, baseline, margin):
+    regressions = []
+    for key, r in results.items():
+        if key in baseline['configurations']:
+            reference = baseline['configurations'][key]['time_per_iteration']
+            if r['time_per_iteration'] > reference * (1.0 + margin):
+                regressions.append((key, r['time_per_iteration'], reference))
+    return regressions
+
+def load_baseline(file_name):
+    with open(file_name) as f:
+        return json.load(f)
+
+# Names of the settings which differ between a run and a baseline
+def changed_settings(settings, baseline):
+    reference = baseline.get('settings', {})
+    return sorted(name for name in set(settings) | set(reference) if settings.get(name) != reference.get(name))
+
+# The baseline is written to a temporary file first and then renamed, so that an interrupted run never corrupts it
+# The configurations of a previous baseline with the same settings are kept, the other ones are replaced
+def save_baseline(file_name, results, settings):
+    baseline = {'settings': settings,
+                'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.processor()},
+                'configurations': results}
+    if os.path.exists(file_name):
+        previous = load_baseline(file_name)
+        if len(changed_settings(settings, previous)) == 0:
+            previous['configurations'].update(results)
+            baseline['configurations'] = previous['configurations']
+    with open(file_name + ".tmp", 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    os.replace(file_name + ".tmp", file_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite and regression harness for the enhanced bees algorithm")
+    parser.add_argument("--engine", choices=sorted(engines), default="enhanced")
+    parser.add_argument("--functions", nargs="*", default=None, help="names of the functions to run (default: all)")
+    parser.add_argument("--dimensions", nargs="*", type=int, default=[2, 10, 30, 100])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=default_baseline)
+    parser.add_argument("--update-baseline", action="store_true", help="store the results in the baseline file instead of comparing them")
+    parser.add_argument("--margin", type=float, default=0.2, help="tolerated slow-down before flagging a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    settings = {'iterations': args.iterations, 'seed': args.seed, 'repeats': args.repeats, 'bees_parameters': bees_parameters}
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+        changed = changed_settings(settings, baseline)
+        if len(changed) > 0:
+            print("The baseline " + args.baseline + " was recorded with other settings (" + ", ".join(changed) + "), run with --update-baseline to replace it")
+            sys.exit(2)
+    results = run_suite(args.engine, args.functions, args.dimensions, args.iterations, args.seed, args.repeats)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, settings)
+        print('')
+        print("Baseline written to " + args.baseline)
+    elif baseline != None:
+        regressions = find_regressions(results, baseline, args.margin)
+        print('')
+        if len(regressions) == 0:
+            print("No regression (margin " + str(args.margin) + ")")
+        for key, current, reference in regressions:
+            print("REGRESSION " + key + ": " + "%.3f" % (current * 1000.0) + " ms/iteration, baseline " + "%.3f" % (reference * 1000.0) + " ms/iteration")
+        if len(regressions) > 0:
+            sys.exit(1)
+    else:
+        print('')
+        print("No baseline found at " + args.baseline + ", run with --update-baseline to create it")
@@ -0,0 +1,72 @@
+"""
+Benchmark of the surrogate-assisted pre-screening of the recruits
+
+Every benchmark function of testing.py is optimised with and without a
+surrogate.KNNSurrogate, with the parameters of testing.py and the same
+acceptable fitness (optimum - 0.001). For each configuration the success rate,
+the mean iterations and the mean number of real fitness evaluations to reach the
+acceptable fitness are reported, together with the fraction of the screened
+recruits which were really evaluated and the accuracy of the surrogate (mean
+absolute error and rank correlation of its predictions on the evaluated points).
+
+Usage:
+  python benchmarks/bench_surrogate.py
+  python benchmarks/bench_surrogate.py --runs 20 --ratios 0.25 0.5 --engine vectorized
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import enhancedBA
+import vectorizedBA
+import surrogate
+import testing
+
+engines = {'enhanced': enhancedBA.EnhancedBA, 'vectorized': vectorizedBA.VectorizedEnhancedBA}
+
+def format_value(value, pattern):
+    return "-" if value == None else pattern % value
+
+def run(ba_class, test_function, lb, ub, bees_parameters, optimum_fitness, ratio, n_runs, max_iteration, k):
+    iterations = []
+    evaluations = []
+    successes = 0
+    reports = []
+    for seed in range(n_runs):
+        model = None if ratio == None else surrogate.KNNSurrogate(k=k)
+        a = ba_class(test_function, lb, ub, surrogate=model, screening_ratio=ratio or 1.0, seed=seed, **bees_parameters)
+        iteration, fitness = a.stoppingCriterion(max_iteration=max_iteration, max_fitness=optimum_fitness - 0.001)
+        iterations.append(iteration)
+        evaluations.append(a.n_evaluations)
+        successes += fitness >= optimum_fitness - 0.001
+        if model != None:
+            reports.append(model.report())
+    ratio_evaluated = np.mean([r['evaluation_ratio'] for r in reports]) if reports else None
+    errors = [r['mean_absolute_error'] for r in reports if r['mean_absolute_error'] != None]
+    correlations = [r['rank_correlation'] for r in reports if r['rank_correlation'] != None]
+    return (successes, np.mean(iterations), np.mean(evaluations), ratio_evaluated,
+            np.mean(errors) if errors else None, np.mean(correlations) if correlations else None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the surrogate-assisted pre-screening of the recruits")
+    parser.add_argument("--engine", choices=sorted(engines), default="enhanced")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-iteration", type=int, default=1000)
+    parser.add_argument("--ratios", nargs="*", type=float, default=[0.25, 0.5])
+    parser.add_argument("--k", type=int, default=5, help="number of neighbours of the surrogate")
+    args = parser.parse_args()
+
+    print("Function\t\tScreening\tSuccess\tIterations\tEvaluations\tEvaluated\tMAE\t\tRank corr.")
+    for function_name, test_function, lb, ub, bees_parameters, optimum_fitness in testing.benchmark_list():
+        for ratio in [None] + args.ratios:
+            successes, iterations, evaluations, evaluated, mae, correlation = run(engines[args.engine], test_function, lb, ub, bees_parameters, optimum_fitness,
+                                                                                  ratio, args.runs, args.max_iteration, args.k)
+            print(function_name[:22].ljust(22) + "\t" + ("off" if ratio == None else str(ratio)) + "\t\t" + str(successes) + "/" + str(args.runs) + "\t" +
+                  "%.1f" % iterations + "\t\t" + "%.0f" % evaluations + "\t\t" + format_value(evaluated, "%.2f") + "\t\t" +
+                  format_value(mae, "%.4g") + "\t\t" + format_value(correlation, "%.2f"))
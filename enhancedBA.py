@@ -5,10 +5,31 @@ Mainly focus on the reduction of parameters
 Author: Heng Zhai
 """
 
+import os
+import pickle
 import random
-import copy
+import time
+import evaluators
+import recruitment
+import spatial_index as spatial
+import run_archive
+import random_streams
+
+# Sample a position uniformly in the hyper box of half-widths middle * patchSize around centre, clipped to the boundaries
+# (-m + (m + m) * random()) is exactly what random.uniform(-m, m) computes, without the cost of the extra call
+# uniforms are the draws in [0, 1) of the coordinates (see random_streams.RandomStream), the global random module is used without them
+def samplePosition(lowerBoundaries, upperBoundaries, middle, patchSize, centre, uniforms=None):
+    if uniforms == None:
+        rand = random.random
+        uniforms = [rand() for _ in middle]
+    position = [(-m + (m + m) * u) * p + c for m, p, c, u in zip(middle, patchSize, centre, uniforms)]
+    return [l if x < l else (u if x > u else x) for x, l, u in zip(position, lowerBoundaries, upperBoundaries)]
 
 class Bee(object):
+    # terms caches the per-coordinate contributions to the fitness of a site, changes holds the changed coordinates of a
+    # recruit of the high-dimensional mode, both are only used with the delta evaluation of separable functions
+    __slots__ = ('lowerBoundaries', 'upperBoundaries', 'position', 'shrinkTimes', 'patchSize', 'fitness', 'terms', 'changes')
+
     def __init__(self, lowerBoundaries, upperBoundaries, shrinkTimes, patchSize, isScout=True, centre=None):
         self.lowerBoundaries = lowerBoundaries
         self.upperBoundaries = upperBoundaries
@@ -16,6 +37,8 @@ class Bee(object):
         self.shrinkTimes = shrinkTimes
         self.patchSize = patchSize
         self.fitness = None
+        self.terms = None
+        self.changes = None
         if centre == None:
             centre=[(upperBoundaries[i] + lowerBoundaries[i]) / 2.0 for i in range(len(lowerBoundaries))]
         if isScout:
@@ -25,16 +48,33 @@ class Bee(object):
 
     # Randomly initialize the position of the bee in the n-dimensional hyper box    
     def initialiseValues(self, patchSize, centre):
-        self.position = [0.0] * len(self.lowerBoundaries)
-        for i in range(len(self.lowerBoundaries)):
-            middle = (self.upperBoundaries[i] - self.lowerBoundaries[i]) / 2.0
-            self.position[i] = random.uniform(-middle, middle) * patchSize[i] + centre[i]
-            self.position[i] = min(self.position[i], self.upperBoundaries[i])
-            self.position[i] = max(self.position[i], self.lowerBoundaries[i])
+        middle = [(u - l) / 2.0 for l, u in zip(self.lowerBoundaries, self.upperBoundaries)]
+        self.position = samplePosition(self.lowerBoundaries, self.upperBoundaries, middle, patchSize, centre)
+
+    # Create a bee at a known position, without sampling it
+    @classmethod
+    def fromPosition(cls, position, lowerBoundaries, upperBoundaries, shrinkTimes, patchSize, fitness=None):
+        bee = cls.__new__(cls)
+        bee.lowerBoundaries = lowerBoundaries
+        bee.upperBoundaries = upperBoundaries
+        bee.position = position
+        bee.shrinkTimes = shrinkTimes
+        bee.patchSize = patchSize
+        bee.fitness = fitness
+        bee.terms = None
+        bee.changes = None
+        return bee
 
     # Generate single recruit in the neighbourhood range
     def generateRecruit(self):
-	    return Bee(self.lowerBoundaries,self.upperBoundaries,0,self.patchSize,isScout=False,centre=self.position)
+        recruit = Bee.fromPosition(self.position, self.lowerBoundaries, self.upperBoundaries, 0, self.patchSize)
+        recruit.initialiseValues(self.patchSize, centre=self.position)
+        return recruit
+
+    # Copy of the bee which shares its position and patch size lists:
+    # these lists are always replaced and never modified in place, so there is no need for a deep copy
+    def copy(self):
+        return Bee.fromPosition(self.position, self.lowerBoundaries, self.upperBoundaries, self.shrinkTimes, self.patchSize, self.fitness)
 
     # Use this method to complete the comparison between Bee objects
     def __lt__(self, other):
@@ -44,8 +84,30 @@ class Bee(object):
         return "Bee{" + "fitness: " + str(self.fitness)+", position: "+str(self.position) + "}"
         
 
+# Lightweight summary of an iteration, yielded by EnhancedBA.iterate
+# iteration counts all the iterations of the instance, elapsed is the time since the start of iterate,
+# sites and recruits are the positions of the current sites and of the recruits when they are requested (None otherwise),
+# with the recruits the sites are the ones which sent them, captured before the iteration as the visualization draws them
+class Snapshot(object):
+    __slots__ = ('iteration', 'fitness', 'position', 'improved', 'n_evaluations', 'elapsed', 'sites', 'recruits')
+
+    def __init__(self, iteration, fitness, position, improved, n_evaluations, elapsed, sites=None, recruits=None):
+        self.iteration = iteration
+        self.fitness = fitness
+        self.position = position
+        self.improved = improved
+        self.n_evaluations = n_evaluations
+        self.elapsed = elapsed
+        self.sites = sites
+        self.recruits = recruits
+
+    def __str__(self):
+        return "Snapshot{" + "iteration: " + str(self.iteration) + ", fitness: " + str(self.fitness) + ", evaluations: " + str(self.n_evaluations) + "}"
+
+
 class EnhancedBA(object):
-    def __init__(self, fitnessFunction, lowerBoundaries, upperBoundaries, ngh=None, ns=35, nb=8, nr=80, sf=.2, stlim=10):
+    def __init__(self, fitnessFunction, lowerBoundaries, upperBoundaries, ngh=None, ns=35, nb=8, nr=80, sf=.2, stlim=10, evaluator=None, initialise=True, allocation=None,
+                 surrogate=None, screening_ratio=0.25, spatial_index=None, archive=None, profiler=None, controller=None, n_perturbed=None, seed=None):
         self.ns = ns
         self.nb = nb
         self.nr = nr
@@ -58,12 +120,64 @@ class EnhancedBA(object):
             self.ngh = ngh
         self.stlim = stlim
         self.sf = sf
+        # Computed once so that scouts and recruits are sampled without rebuilding these lists
+        self.centre = [(u + l) / 2.0 for l, u in zip(lowerBoundaries, upperBoundaries)]
+        self.middle = [(u - l) / 2.0 for l, u in zip(lowerBoundaries, upperBoundaries)]
+        self.unitPatch = [1.0] * len(lowerBoundaries)
+        # Random numbers of the instance (see random_streams.py): seed is None, an int, a numpy SeedSequence or a RandomStream
+        # (a child stream of the islands or of a pool of workers), the run is reproducible given the seed
+        if isinstance(seed, random_streams.RandomStream):
+            self.stream = seed
+        else:
+            self.stream = random_streams.RandomStream(seed)
         self.currentSites = []
         self.keep_bees_trace = False
         self.bestSolution = None
         self.record = []
+        # Number of bees evaluated since the creation of the instance (the budget of max_evaluations), among which
+        # the n_cache_hits found in a fitness_cache.FitnessCache and the n_delta_evaluations evaluated incrementally
+        # (n_perturbed), objectiveCalls() gives the number of points really computed by the fitness function
+        self.n_evaluations = 0
+        self.n_cache_hits = 0
+        self.n_delta_evaluations = 0
+        # Number of iterations since the best fitness last improved (max_stagnation), and that best fitness
+        # They are kept on the instance and in the checkpoints, so a resumed run counts the iterations before the checkpoint
+        self.stagnation = 0
+        self.lastBestFitness = None
+        self.stoppingReason = None
+        # The bees of an iteration are evaluated as one batch by the evaluator (serial, thread pool, process pool or asyncio)
+        if evaluator == None:
+            self.evaluator = evaluators.SerialEvaluator()
+        else:
+            self.evaluator = evaluator
+        # Policy of the waggle dance, see recruitment.py
+        if allocation == None:
+            self.allocation = recruitment.TournamentAllocation()
+        else:
+            self.allocation = allocation
+        # Optional surrogate model (see surrogate.py): only the screening_ratio most promising recruits of each site
+        # are evaluated by the fitness function, the surrogate is trained on every evaluated point
+        self.surrogate = surrogate
+        self.screening_ratio = screening_ratio
+        # Optional spatial_index.SpatialIndex: duplicate sites are merged into better ones and the global scouts
+        # landing in explored regions are rejected before their evaluation
+        self.spatial_index = spatial_index
+        if spatial_index != None:
+            spatial_index.bind(self.lowerBoundaries, self.middle)
+        # Optional run_archive.RunArchiveWriter receiving every evaluated bee (iteration, site, role, position, fitness)
+        self.archive = archive
+        # Optional profiling.PhaseProfiler recording the time spent in each phase of an iteration
+        self.profiler = profiler
+        # Optional adaptive.AdaptiveController adjusting ns, nb, nr and stlim during the run
+        self.controller = controller
+        # High-dimensional mode: each recruit only moves n_perturbed coordinates of its site (all of them when None)
+        # and the recruits of separable functions are evaluated incrementally (BenchmarkFunction.evaluate_delta)
+        self.n_perturbed = n_perturbed
+        self.incremental = n_perturbed != None and getattr(fitnessFunction, 'separable', False)
         self.checkParameters()
-        self.initialise_solution()
+        # The initial solution is not needed when the state is restored from a checkpoint
+        if initialise:
+            self.initialise_solution()
 
     # Check whether the provided parameters are valid
     def checkParameters(self):
@@ -76,13 +190,43 @@ class EnhancedBA(object):
         # The value range of shrink factor should be [0, 1]
         if self.sf < 0 or self.sf > 1:
             raise ValueError("The shrink factor should be greater than 0 and less than 1")
+        # The value range of screening ratio should be (0, 1]
+        if self.screening_ratio <= 0 or self.screening_ratio > 1:
+            raise ValueError("The screening ratio should be greater than 0 and less than or equal to 1")
+        # The number of perturbed coordinates should be in [1, number of dimensions]
+        if self.n_perturbed != None and (self.n_perturbed < 1 or self.n_perturbed > len(self.lowerBoundaries)):
+            raise ValueError("The number of perturbed coordinates should be between 1 and the number of dimensions")
+
+    # Change the parameters between two iterations (used by adaptive.AdaptiveController)
+    # A change of nb takes effect at the next selection, the sites which already shrank more than the new stlim are abandoned next
+    def setParameters(self, ns=None, nb=None, nr=None, stlim=None):
+        previous = (self.ns, self.nb, self.nr, self.stlim)
+        self.ns = self.ns if ns == None else ns
+        self.nb = self.nb if nb == None else nb
+        self.nr = self.nr if nr == None else nr
+        self.stlim = self.stlim if stlim == None else stlim
+        try:
+            self.checkParameters()
+            if self.ns <= self.nb:
+                raise ValueError("The number of scout bees should be greater than the number of best sites")
+        except ValueError:
+            self.ns, self.nb, self.nr, self.stlim = previous
+            raise
+        self.clipShrinkTimes()
+
+    def clipShrinkTimes(self):
+        for site in self.currentSites:
+            site.shrinkTimes = min(site.shrinkTimes, self.stlim)
         
     # A number of ns scout bees are randomly scattered across the solution space in the initial stage
     def initialise_solution(self):
-        self.currentSites = [self.generate_scout() for _ in range(self.ns)]
+        self.currentSites = [self.generate_scout(evaluate=False) for _ in range(self.ns)]
+        self.evaluate_bees(self.currentSites)
+        if self.archive != None:
+            self.archive.append(0, -1, run_archive.SCOUT, [bee.position for bee in self.currentSites], [bee.fitness for bee in self.currentSites])
         self.currentSites.sort(reverse=True)
         self.currentSites = self.currentSites[:self.nb]
-        self.bestSolution = self.currentSites[0]
+        self.bestSolution = self.currentSites[0].copy()
         
     # Use tournament selection to allocate recruits to each selected site
     # The whole process of the waggle dance:
@@ -92,92 +236,423 @@ class EnhancedBA(object):
     # 2. Let each recruit evaluate the fitness of these two sites
     # 3. The recruit will choose the best one to follow (append the index of best one to recruits choices list)
     # 4. Count the total number of recruits for each selected site
+    # The counts of all the recruits are drawn at once by the allocation policy (recruitment.TournamentAllocation by default),
+    # the number of recruits of each selected site is returned and a site which is not chosen gets no recruit
     def waggle_dance(self):
-        n_recruits = 1
-        recruits_choices = []
-        for i in range(self.nr):
-            randIndex = random.sample(range(0, self.nb), 2)
-            if randIndex[0] < randIndex[1]:
-                recruits_choices.append(randIndex[0])
-            else:
-                recruits_choices.append(randIndex[1])
+        return self.allocation.allocate([site.fitness for site in self.currentSites], self.nr, self.stream.generator).tolist()
 
-        for j in range(self.nb):
-            if recruits_choices.count(j) > 0:
-                n_recruits = recruits_choices.count(j)
-            self.localSearchForSingleSite(j, n_recruits)
+    # Generate the bees of a single site without evaluating them:
+    # scouts if the site is going to be abandoned, recruits in its neighbourhood otherwise
+    # With a surrogate, the recruits are pre-screened and only the most promising ones are kept
+    def generate_site_bees(self, index, n_recruits):
+        profiler = self.profiler
+        if profiler != None:
+            start = profiler.start()
+        if self.currentSites[index].shrinkTimes == self.stlim:
+            scouts = [self.generate_scout(evaluate=False) for _ in range(n_recruits)]
+            if profiler != None:
+                profiler.stop('scout generation', start, n_recruits)
+            return scouts
+        recruits = [self.generate_recruit(self.currentSites[index], evaluate=False) for _ in range(n_recruits)]
+        if profiler != None:
+            start = profiler.stop('recruit generation', start, n_recruits)
+        if self.surrogate != None and len(recruits) > 0:
+            recruits = [recruits[i] for i in self.surrogate.screen([r.position for r in recruits], self.screening_ratio)]
+            if profiler != None:
+                profiler.stop('surrogate screening', start, n_recruits)
+        return recruits
     
     # Local search for single site
-    def localSearchForSingleSite(self, index, n_recruits):
-        if self.currentSites[index].shrinkTimes == self.stlim:
-            # Abandon this site
-            scouts = [self.generate_scout() for _ in range(n_recruits)]
-            scouts.sort(reverse=True)
-            self.currentSites[index] = copy.deepcopy(scouts[0])
+    # bees are the already evaluated bees of this site, they are generated and evaluated here when not provided
+    # A site without recruits is left unchanged
+    def localSearchForSingleSite(self, index, n_recruits, bees=None):
+        if n_recruits == 0:
+            return
+        if bees is None:
+            bees = self.generate_site_bees(index, n_recruits)
+            self.evaluate_bees(bees)
+        site = self.currentSites[index]
+        if site.shrinkTimes == self.stlim:
+            # Abandon this site, the best scout takes its place
+            self.currentSites[index] = self.argmax(bees)
+            if self.profiler != None:
+                self.profiler.count('abandonment')
+            if self.controller != None:
+                self.controller.abandoned()
         else:
             # Assign specific number of recruited bees for this site
-            recruits = [self.generate_recruit(self.currentSites[index]) for _ in range(n_recruits)]
+            recruits = bees
             if self.keep_bees_trace:
                 self.to_save_recruits += [recruits]
             # Get the best recruit
             bestRecruit = self.argmax(recruits)
-            if bestRecruit.fitness > self.currentSites[index].fitness:
+            if bestRecruit.fitness > site.fitness:
                 # If the solution can be improved continuously
-                # 1. The best recruit becomes the new scout bee of this site
+                # 1. The best recruit becomes the new scout bee of this site (the site is updated in place)
                 # 2. Reset the shrink times of this site to 0
-                self.currentSites[index] = copy.deepcopy(bestRecruit)
-                self.currentSites[index].shrinkTimes = 0
+                if self.controller != None:
+                    self.controller.improved(site.shrinkTimes)
+                # The cached contributions of the site follow the coordinates changed by the recruit
+                if site.terms != None and bestRecruit.changes != None:
+                    for i, term in zip(*bestRecruit.changes):
+                        site.terms[i] = term
+                else:
+                    site.terms = None
+                site.position = bestRecruit.position
+                site.fitness = bestRecruit.fitness
+                site.shrinkTimes = 0
             else:
                 # If no improvement can be obtained
                 # 1. Increase the shrink times of this site by 1
-                # 2. Adjust the size of the neighbourhood
-                self.currentSites[index].shrinkTimes += 1
-                self.currentSites[index].patchSize = [x * (1 - self.sf) for x in self.currentSites[index].patchSize]
+                # 2. Adjust the size of the neighbourhood (patch size lists are shared between bees, so a new list is created)
+                site.shrinkTimes += 1
+                site.patchSize = [x * (1 - self.sf) for x in site.patchSize]
+                if self.profiler != None:
+                    self.profiler.count('shrink')
+                if self.controller != None:
+                    self.controller.shrunk()
     
     def singleIteration(self):
         if self.keep_bees_trace:
-            self.to_save_best_sites = [copy.deepcopy(x) for x in self.currentSites]
+            self.to_save_best_sites = [x.copy() for x in self.currentSites]
             self.to_save_recruits= []
-        self.waggle_dance()
+        # Without a profiler, every phase only costs a test of self.profiler
+        profiler = self.profiler
+        if profiler != None:
+            iterationStart = start = profiler.start()
+        # The uniform draws of all the bees of the iteration are generated at once
+        self.stream.reserve((self.nr + self.ns - self.nb) * (len(self.lowerBoundaries) if self.n_perturbed == None else 2 * self.n_perturbed))
+        allocation = self.waggle_dance()
+        if profiler != None:
+            profiler.stop('waggle dance', start)
+        # The bees of all selected sites and the (ns - nb) global scouts are evaluated together in one batch
+        # The number of current sites is nb, except after nb was changed by setParameters
+        n_sites = len(self.currentSites)
+        bees = [self.generate_site_bees(j, allocation[j]) for j in range(n_sites)]
+        if profiler != None:
+            start = profiler.start()
+        scouts = self.generate_global_scouts(self.ns - self.nb)
+        if profiler != None:
+            profiler.stop('scout generation', start, len(scouts))
+        self.evaluate_bees([bee for site_bees in bees for bee in site_bees] + scouts)
+        if profiler != None:
+            start = profiler.start()
+        if self.archive != None:
+            self.archive_iteration(bees, scouts)
+            if profiler != None:
+                start = profiler.stop('archive', start, len(scouts) + sum(len(site_bees) for site_bees in bees))
+        for j in range(n_sites):
+            self.localSearchForSingleSite(j, allocation[j], bees[j])
+        if profiler != None:
+            start = profiler.stop('local search', start, n_sites)
         # Add (ns - nb) scouts to the search space
-        self.currentSites += [self.generate_scout() for _ in range(self.ns - self.nb)]
+        self.currentSites += scouts
         # Sort the current sites in descending order
         self.currentSites.sort(reverse=True)
+        # Sites inside the region of a better site are only kept when there are not enough distinct sites
+        if self.spatial_index != None:
+            self.currentSites = self.distinct_sites(self.currentSites)
         # The first nb sites become new current sites
         self.currentSites = self.currentSites[:self.nb]
         # Update best solution if the fitness of the first site in current sites is better
         if self.currentSites[0].fitness > self.bestSolution.fitness:
-            self.bestSolution = copy.deepcopy(self.currentSites[0])
+            self.bestSolution = self.currentSites[0].copy()
         self.record.append(self.bestSolution.fitness)
+        if profiler != None:
+            profiler.stop('selection', start, len(scouts) + n_sites)
+            profiler.stop('iteration', iterationStart)
+        if self.controller != None:
+            scoutIds = set(map(id, scouts))
+            self.controller.endIteration(self, len(scouts), sum(1 for site in self.currentSites if id(site) in scoutIds))
+
+    # Stream the bees evaluated in this iteration to the archive, before the sites are updated
+    def archive_iteration(self, bees, scouts):
+        iteration = len(self.record) + 1
+        for j, site_bees in enumerate(bees):
+            role = run_archive.SCOUT if self.currentSites[j].shrinkTimes == self.stlim else run_archive.RECRUIT
+            self.archive.append(iteration, j, role, [bee.position for bee in site_bees], [bee.fitness for bee in site_bees])
+        self.archive.append(iteration, -1, run_archive.SCOUT, [bee.position for bee in scouts], [bee.fitness for bee in scouts])
+
+    # Generate the global scouts without evaluating them
+    # With a spatial index, the scouts landing in an explored region are sampled again, and discarded after max_resamples tries
+    def generate_global_scouts(self, n_scouts):
+        scouts = [self.generate_scout(evaluate=False) for _ in range(n_scouts)]
+        if self.spatial_index == None:
+            return scouts
+        sitePositions = [site.position for site in self.currentSites]
+        sitePatches = [site.patchSize for site in self.currentSites]
+        for attempt in range(self.spatial_index.max_resamples + 1):
+            explored = self.spatial_index.explored([scout.position for scout in scouts], sitePositions, sitePatches).tolist()
+            n_explored = sum(explored)
+            if n_explored == 0:
+                break
+            self.spatial_index.rejected += n_explored
+            if attempt == self.spatial_index.max_resamples:
+                self.spatial_index.discarded += n_explored
+                return [scout for scout, e in zip(scouts, explored) if not e]
+            scouts = [self.generate_scout(evaluate=False) if e else scout for scout, e in zip(scouts, explored)]
+        return scouts
+
+    # Reorder the sites (sorted in descending order) so that the sites inside the region of a better site come last
+    def distinct_sites(self, sites):
+        order, n_duplicates = spatial.distinct([site.position for site in sites], self.spatial_index.siteHalfWidths([site.patchSize for site in sites]))
+        self.spatial_index.merged += max(0, n_duplicates - max(0, self.nb - (len(sites) - n_duplicates)))
+        return [sites[i] for i in order]
 
     # Determine whether the maximum number of iterations or the acceptable fitness is reached
-    def stoppingCriterion(self, max_iteration=None, max_fitness=None):
-        if max_iteration == None and max_fitness == None:
+    # The run can also be stopped by a budget of fitness evaluations (counted since the creation of the instance),
+    # by a wall-clock budget in seconds, or when the best solution has not improved for max_stagnation iterations
+    # The budgets are checked between iterations, so the last iteration may exceed them
+    # The criterion which stopped the run is stored in stoppingReason
+    # When checkpoint_file is given, a checkpoint is written every checkpoint_iterations iterations and/or
+    # every checkpoint_seconds seconds, and once more at the end of the run
+    # The callbacks are called with the snapshots of the iterations selected by every and only_improvements (see iterate)
+    def stoppingCriterion(self, max_iteration=None, max_fitness=None, max_evaluations=None, max_seconds=None, max_stagnation=None,
+                          checkpoint_file=None, checkpoint_iterations=None, checkpoint_seconds=None,
+                          callbacks=None, every=1, only_improvements=False):
+        if max_iteration == None and max_fitness == None and max_evaluations == None and max_seconds == None and max_stagnation == None:
             raise ValueError("Please provide a stop criteria")
+        startIteration = len(self.record)
+        for _ in self.iterate(max_iteration, max_fitness, max_evaluations, max_seconds, max_stagnation,
+                              checkpoint_file, checkpoint_iterations, checkpoint_seconds,
+                              callbacks=callbacks, every=every if callbacks else None, only_improvements=only_improvements):
+            pass
+        return len(self.record) - startIteration, self.bestSolution.fitness
+
+    # Iterate the search and yield a lightweight Snapshot every `every` iterations (only the iterations which improved
+    # the best solution when only_improvements is set; never when every is None), after calling the callbacks with it
+    # The stopping criteria and checkpoints are the ones of stoppingCriterion; without any criterion the generator never ends
+    # The positions of the current sites and of the recruits are only added to the snapshots on request
+    def iterate(self, max_iteration=None, max_fitness=None, max_evaluations=None, max_seconds=None, max_stagnation=None,
+                checkpoint_file=None, checkpoint_iterations=None, checkpoint_seconds=None,
+                callbacks=None, every=1, only_improvements=False, include_sites=False, include_recruits=False):
         if max_iteration != None and max_iteration < 0:
             raise ValueError("The maximum number of iterations should be positive")
+        if max_evaluations != None and max_evaluations < 0:
+            raise ValueError("The maximum number of evaluations should be positive")
+        if max_seconds != None and max_seconds < 0:
+            raise ValueError("The maximum number of seconds should be positive")
+        if max_stagnation != None and max_stagnation < 1:
+            raise ValueError("The number of stagnation iterations should be greater than or equal to 1")
+        if every != None and every < 1:
+            raise ValueError("Snapshots can be taken at most once per iteration")
+        return self._iterate(max_iteration, max_fitness, max_evaluations, max_seconds, max_stagnation,
+                             checkpoint_file, checkpoint_iterations, checkpoint_seconds,
+                             callbacks or [], every, only_improvements, include_sites, include_recruits)
+
+    def _iterate(self, max_iteration, max_fitness, max_evaluations, max_seconds, max_stagnation,
+                 checkpoint_file, checkpoint_iterations, checkpoint_seconds,
+                 callbacks, every, only_improvements, include_sites, include_recruits):
         iteration = 0
-        while(max_iteration == None or iteration < max_iteration) and (max_fitness == None or self.bestSolution.fitness < max_fitness):
-            self.singleIteration()
-            iteration += 1
-        return iteration, self.bestSolution.fitness
+        if self.lastBestFitness == None:
+            self.lastBestFitness = self.bestSolution.fitness
+        start = time.perf_counter()
+        lastCheckpoint = start
+        keep_bees_trace = self.keep_bees_trace
+        if include_recruits:
+            self.keep_bees_trace = True
+        try:
+            while True:
+                self.stoppingReason = self.reachedCriterion(iteration, self.stagnation, start, max_iteration, max_fitness, max_evaluations, max_seconds, max_stagnation)
+                if self.stoppingReason != None:
+                    break
+                self.singleIteration()
+                iteration += 1
+                improved = self.bestSolution.fitness > self.lastBestFitness
+                if improved:
+                    self.stagnation = 0
+                    self.lastBestFitness = self.bestSolution.fitness
+                else:
+                    self.stagnation += 1
+                if checkpoint_file != None:
+                    if (checkpoint_iterations != None and iteration % checkpoint_iterations == 0) or \
+                       (checkpoint_seconds != None and time.perf_counter() - lastCheckpoint >= checkpoint_seconds):
+                        self.saveCheckpoint(checkpoint_file)
+                        lastCheckpoint = time.perf_counter()
+                if every != None and iteration % every == 0 and (improved or not only_improvements):
+                    snapshot = self.snapshot(improved, time.perf_counter() - start, include_sites, include_recruits)
+                    for callback in callbacks:
+                        callback(snapshot)
+                    yield snapshot
+            if checkpoint_file != None:
+                self.saveCheckpoint(checkpoint_file)
+        finally:
+            self.keep_bees_trace = keep_bees_trace
+            if self.archive != None:
+                self.archive.flush()
+
+    def snapshot(self, improved, elapsed, include_sites=False, include_recruits=False):
+        sites = None
+        recruits = None
+        if include_sites:
+            # With the recruits, the sites are the ones which sent them, as they were before the iteration
+            if include_recruits:
+                sites = [site.position for site in self.to_save_best_sites]
+            else:
+                sites = [site.position for site in self.currentSites]
+        if include_recruits:
+            recruits = [[recruit.position for recruit in site_recruits] for site_recruits in self.to_save_recruits]
+        return Snapshot(len(self.record), self.bestSolution.fitness, self.bestSolution.position, improved, self.n_evaluations, elapsed, sites, recruits)
+
+    # Name of the first stopping criterion which is met, None if the search should continue
+    def reachedCriterion(self, iteration, stagnation, start, max_iteration, max_fitness, max_evaluations, max_seconds, max_stagnation):
+        if max_iteration != None and iteration >= max_iteration:
+            return 'max_iteration'
+        if max_fitness != None and self.bestSolution.fitness >= max_fitness:
+            return 'max_fitness'
+        if max_evaluations != None and self.n_evaluations >= max_evaluations:
+            return 'max_evaluations'
+        if max_seconds != None and time.perf_counter() - start >= max_seconds:
+            return 'max_seconds'
+        if max_stagnation != None and stagnation >= max_stagnation:
+            return 'max_stagnation'
+        return None
 
     # Generate single scout bees in the search space
-    def generate_scout(self):
-        scout = Bee(self.lowerBoundaries, self.upperBoundaries, 0, self.ngh, isScout=True, centre=None)
-        scout.fitness = self.fitnessFunction(scout.position)
+    def generate_scout(self, evaluate=True):
+        position = samplePosition(self.lowerBoundaries, self.upperBoundaries, self.middle, self.unitPatch, self.centre, self.stream.uniforms(len(self.middle)))
+        scout = Bee.fromPosition(position, self.lowerBoundaries, self.upperBoundaries, 0, self.ngh)
+        if evaluate:
+            scout.fitness = self.fitnessFunction(scout.position)
+            self.n_evaluations += 1
         return scout
 
     # Generate single recruit for specific selected site
-    def generate_recruit(self, site):
-        recruit = site.generateRecruit()
-        recruit.fitness = self.fitnessFunction(recruit.position)
+    def generate_recruit(self, site, evaluate=True):
+        if self.n_perturbed == None:
+            position = samplePosition(self.lowerBoundaries, self.upperBoundaries, self.middle, site.patchSize, site.position, self.stream.uniforms(len(self.middle)))
+            recruit = Bee.fromPosition(position, self.lowerBoundaries, self.upperBoundaries, 0, site.patchSize)
+        else:
+            position, indices = self.perturbSubset(site)
+            recruit = Bee.fromPosition(position, self.lowerBoundaries, self.upperBoundaries, 0, site.patchSize)
+            if self.incremental and not evaluate:
+                recruit.changes = (site, indices, [position[i] for i in indices])
+        if evaluate:
+            recruit.fitness = self.fitnessFunction(recruit.position)
+            self.n_evaluations += 1
         return recruit
 
+    # High-dimensional mode: a copy of the position of the site where n_perturbed coordinates, drawn at random, are
+    # sampled in the patch of the site (clipped to the boundaries), the others are left unchanged
+    # Returns the position and the indices of the changed coordinates
+    def perturbSubset(self, site):
+        position = list(site.position)
+        indices = self.stream.sample(len(position), self.n_perturbed)
+        for i, u in zip(indices, self.stream.uniforms(self.n_perturbed)):
+            m = self.middle[i]
+            x = (-m + (m + m) * u) * site.patchSize[i] + position[i]
+            position[i] = self.lowerBoundaries[i] if x < self.lowerBoundaries[i] else (self.upperBoundaries[i] if x > self.upperBoundaries[i] else x)
+        return position, indices
+
+    # Evaluate a group of bees as one batch with the evaluator
+    def evaluate_bees(self, bees):
+        if len(bees) == 0:
+            return
+        profiler = self.profiler
+        if profiler != None:
+            start = profiler.start()
+        # Recruits with changes are evaluated from the value and the cached contributions of their site,
+        # their changes become the indices and the contributions of the changed coordinates
+        full = bees
+        if self.incremental:
+            full = []
+            for bee in bees:
+                if bee.changes == None:
+                    full.append(bee)
+                else:
+                    site, indices, values = bee.changes
+                    if site.terms == None:
+                        site.terms = self.fitnessFunction.terms(site.position)
+                    bee.fitness, terms = self.fitnessFunction.evaluate_delta(site.fitness, site.terms, indices, values)
+                    bee.changes = (indices, terms)
+        if len(full) > 0:
+            for bee, value in zip(full, self.evaluatePositions([bee.position for bee in full])):
+                bee.fitness = value
+        self.n_evaluations += len(bees)
+        self.n_delta_evaluations += len(bees) - len(full)
+        fitness = [bee.fitness for bee in bees]
+        if profiler != None:
+            start = profiler.stop('evaluation', start, len(bees))
+        if self.surrogate != None:
+            self.surrogate.observe([bee.position for bee in bees], fitness)
+            if profiler != None:
+                start = profiler.stop('surrogate update', start, len(bees))
+        if self.spatial_index != None:
+            self.spatial_index.insert([bee.position for bee in bees])
+            if profiler != None:
+                profiler.stop('spatial index', start, len(bees))
+
+    # Evaluate positions with the evaluator, the points found in a fitness_cache.FitnessCache are counted in n_cache_hits
+    def evaluatePositions(self, positions):
+        hits = getattr(self.fitnessFunction, 'hits', 0)
+        fitness = self.evaluator.evaluate(self.fitnessFunction, positions)
+        self.n_cache_hits += getattr(self.fitnessFunction, 'hits', 0) - hits
+        return fitness
+
+    # Number of points really computed by the fitness function
+    def objectiveCalls(self):
+        return self.n_evaluations - self.n_cache_hits - self.n_delta_evaluations
+
     # Get the best solution
     def argmax(self, solutions):
         bestSolution = None
         for solution in solutions:
             if bestSolution == None or solution.fitness > bestSolution.fitness:
                 bestSolution = solution
-        return bestSolution
\ No newline at end of file
+        return bestSolution
+
+    # State of the search: everything needed to continue the run bit-identically (the allocation policy included),
+    # except the fitness function, the evaluator and the optional components which are provided again when resuming
+    # The number of iterations already performed is len(record)
+    def getState(self):
+        return {'engine': type(self).__name__,
+                'parameters': {'lowerBoundaries': list(self.lowerBoundaries), 'upperBoundaries': list(self.upperBoundaries), 'ngh': list(self.ngh),
+                               'ns': self.ns, 'nb': self.nb, 'nr': self.nr, 'sf': self.sf, 'stlim': self.stlim, 'screening_ratio': self.screening_ratio,
+                               'n_perturbed': self.n_perturbed},
+                'allocation': self.allocation,
+                'currentSites': [(s.position, s.fitness, s.shrinkTimes, s.patchSize) for s in self.currentSites],
+                'bestSolution': (self.bestSolution.position, self.bestSolution.fitness, self.bestSolution.shrinkTimes, self.bestSolution.patchSize),
+                'record': self.record,
+                'n_evaluations': (self.n_evaluations, self.n_cache_hits, self.n_delta_evaluations),
+                'stagnation': (self.stagnation, self.lastBestFitness),
+                'randomStream': self.stream.getState()}
+
+    def setState(self, state):
+        self.currentSites = [Bee.fromPosition(position, self.lowerBoundaries, self.upperBoundaries, shrinkTimes, patchSize, fitness)
+                             for position, fitness, shrinkTimes, patchSize in state['currentSites']]
+        position, fitness, shrinkTimes, patchSize = state['bestSolution']
+        self.bestSolution = Bee.fromPosition(position, self.lowerBoundaries, self.upperBoundaries, shrinkTimes, patchSize, fitness)
+        self.record = list(state['record'])
+        self.n_evaluations, self.n_cache_hits, self.n_delta_evaluations = state['n_evaluations']
+        self.stagnation, self.lastBestFitness = state['stagnation']
+        self.stream.setState(state['randomStream'])
+
+    # Write the state to a binary checkpoint file
+    # It is written to a temporary file which then replaces the checkpoint, so an interruption never leaves a partial checkpoint
+    # The archive is flushed first, so that it holds at least all the iterations of the checkpoint
+    def saveCheckpoint(self, file_name):
+        if self.archive != None:
+            self.archive.flush()
+        with open(file_name + ".tmp", 'wb') as f:
+            pickle.dump(self.getState(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file_name + ".tmp", file_name)
+
+    # Create an instance from a checkpoint file, the search continues exactly where the checkpoint was written
+    # The allocation policy and n_perturbed are restored from the checkpoint (unless other ones are given), the other optional
+    # components of the constructor are passed again as keyword arguments and start without the state they had gathered
+    @classmethod
+    def fromCheckpoint(cls, file_name, fitnessFunction, evaluator=None, **options):
+        with open(file_name, 'rb') as f:
+            state = pickle.load(f)
+        if state['engine'] != cls.__name__:
+            raise ValueError("The checkpoint was written by " + state['engine'] + ", it can't be restored as " + cls.__name__)
+        p = state['parameters']
+        options.setdefault('allocation', state['allocation'])
+        if p['n_perturbed'] != None:
+            options.setdefault('n_perturbed', p['n_perturbed'])
+        if options.get('surrogate') != None:
+            options.setdefault('screening_ratio', p['screening_ratio'])
+        ba = cls(fitnessFunction, p['lowerBoundaries'], p['upperBoundaries'], ngh=p['ngh'], ns=p['ns'], nb=p['nb'], nr=p['nr'], sf=p['sf'], stlim=p['stlim'],
+                 evaluator=evaluator, initialise=False, **options)
+        ba.setState(state)
+        return ba
@@ -0,0 +1,137 @@
+"""
+MSc Project
+Fitness evaluation backends for the enhanced bees algorithm
+EnhancedBA sends all the bees of an iteration (the recruits of every selected site
+and the global scouts) to its evaluator as a single batch, so that expensive
+objectives can be evaluated concurrently
+Author: Heng Zhai
+"""
+
+import asyncio
+import concurrent.futures
+import os
+
+# Positions may be given as a list of lists or as a 2-D numpy array, the fitness function is always called on lists
+def _as_points(positions):
+    if hasattr(positions, 'tolist'):
+        return positions.tolist()
+    return positions
+
+# Evaluate the positions one after another in the calling thread
+# The whole batch is sent in one call to fitness functions providing evaluate_batch (e.g. the benchmark functions)
+# Subclasses only override _evaluate, the lookups of a fitness_cache.FitnessCache always happen in the calling process
+# and only the points missing from the cache are evaluated
+class SerialEvaluator(object):
+    def evaluate(self, function, positions):
+        if hasattr(function, 'evaluate_many'):
+            return function.evaluate_many(positions, lambda points: self.evaluate(function.function, points))
+        return self._evaluate(function, positions)
+
+    def _evaluate(self, function, positions):
+        if hasattr(function, 'evaluate_batch'):
+            return function.evaluate_batch(positions).tolist()
+        return [function(p) for p in _as_points(positions)]
+
+    # Evaluation of single positions for asyncBA.AsyncEnhancedBA: submit returns a concurrent.futures.Future of the fitness,
+    # result gives the fitness of a finished future in the calling thread
+    # A point found in a fitness_cache.FitnessCache is returned as a finished future, the fitness of the other points is
+    # stored in the cache by result, so the cache is only used by the calling thread
+    def submit(self, function, position):
+        if hasattr(function, 'lookup'):
+            found, value = function.lookup(position)
+            if found:
+                future = concurrent.futures.Future()
+                future.set_result(value)
+                return future
+            return self._submit(function.function, position)
+        return self._submit(function, position)
+
+    def result(self, function, position, future):
+        value = future.result()
+        if hasattr(function, 'lookup'):
+            function.add(position, value)
+        return value
+
+    # A submitted position is evaluated at once, the pool evaluators submit it to their executor
+    def _submit(self, function, position):
+        future = concurrent.futures.Future()
+        future.set_result(self._evaluate(function, [position])[0])
+        return future
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Evaluate the positions concurrently on a concurrent.futures executor, one call per position
+class PoolEvaluator(SerialEvaluator):
+    def __init__(self, executor, chunksize=1):
+        self.executor = executor
+        self.chunksize = chunksize
+
+    def _evaluate(self, function, positions):
+        return list(self.executor.map(function, _as_points(positions), chunksize=self.chunksize))
+
+    def _submit(self, function, position):
+        return self.executor.submit(function, position)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+# For objectives which release the GIL or wait for external programs
+class ThreadPoolEvaluator(PoolEvaluator):
+    def __init__(self, max_workers=None):
+        super().__init__(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers))
+
+
+# For CPU-bound objectives written in python, the fitness function must be picklable
+# By default the batch is split in about four chunks per worker to limit the inter-process communication
+class ProcessPoolEvaluator(PoolEvaluator):
+    def __init__(self, max_workers=None, chunksize=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        super().__init__(concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers), chunksize)
+
+    def _evaluate(self, function, positions):
+        points = _as_points(positions)
+        chunksize = self.chunksize or max(1, len(points) // (4 * self.max_workers))
+        return list(self.executor.map(function, points, chunksize=chunksize))
+
+
+# For I/O-bound objectives: coroutine functions are awaited concurrently on a private event loop,
+# plain functions are run in the default executor of the loop
+# max_concurrency limits the number of evaluations in flight (e.g. the licences of a simulator)
+class AsyncioEvaluator(SerialEvaluator):
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency
+        self.loop = asyncio.new_event_loop()
+
+    def _evaluate(self, function, positions):
+        return self.loop.run_until_complete(self._gather(function, _as_points(positions)))
+
+    async def _gather(self, function, points):
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        async def evaluate_point(point):
+            if semaphore is None:
+                return await self._call(function, point)
+            async with semaphore:
+                return await self._call(function, point)
+
+        return list(await asyncio.gather(*[evaluate_point(p) for p in points]))
+
+    async def _call(self, function, point):
+        if asyncio.iscoroutinefunction(function):
+            return await function(point)
+        return await self.loop.run_in_executor(None, function, point)
+
+    def close(self):
+        # shutdown_default_executor is only available from python 3.9
+        if hasattr(self.loop, 'shutdown_default_executor'):
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
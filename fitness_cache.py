@@ -0,0 +1,101 @@
+"""
+MSc Project
+Memoization of fitness evaluations for the enhanced bees algorithm
+Once the patches have shrunk below the float resolution, or when recruits are
+clipped onto the boundaries, the same points are evaluated again and again.
+Wrapping the fitness function in a FitnessCache makes sure that an expensive
+objective is never evaluated twice for the same (optionally quantized) point
+Author: Heng Zhai
+"""
+
+from collections import OrderedDict
+
+class FitnessCache(object):
+    # maxsize is the maximum number of cached points (None for an unbounded cache), the least recently used point is evicted first
+    # When decimals is given, the coordinates are rounded to this number of decimals before the lookup,
+    # so that all the points of the same cell share the fitness of the first evaluated one
+    def __init__(self, function, maxsize=100000, decimals=None):
+        if maxsize != None and maxsize < 1:
+            raise ValueError("The size of the cache should be at least 1")
+        self.function = function
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, point):
+        if self.decimals == None:
+            return tuple(point)
+        return tuple(round(x, self.decimals) for x in point)
+
+    def __call__(self, point):
+        key = self.key(point)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = self.function(point)
+        self.store(key, value)
+        return value
+
+    # Evaluate a batch of points, only the points which are not cached (once for each point repeated in the batch)
+    # are passed to evaluate, which is called at most once with the list of the missing points
+    def evaluate_many(self, points, evaluate):
+        if hasattr(points, 'tolist'):
+            points = points.tolist()
+        values = [None] * len(points)
+        missing = OrderedDict()
+        for i, point in enumerate(points):
+            key = self.key(point)
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                values[i] = self.entries[key]
+            elif key in missing:
+                self.hits += 1
+                missing[key].append(i)
+            else:
+                self.misses += 1
+                missing[key] = [i]
+        if len(missing) > 0:
+            results = evaluate([points[indices[0]] for indices in missing.values()])
+            for (key, indices), value in zip(missing.items(), results):
+                self.store(key, value)
+                for i in indices:
+                    values[i] = value
+        return values
+
+    # Lookup of a single point evaluated elsewhere (see evaluators.SerialEvaluator.submit): (True, fitness) when the point
+    # is cached, (False, None) otherwise, the fitness of a missing point is then stored with add
+    def lookup(self, point):
+        key = self.key(point)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return True, self.entries[key]
+        self.misses += 1
+        return False, None
+
+    def add(self, point, value):
+        self.store(self.key(point), value)
+
+    def store(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if self.maxsize != None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def hitRatio(self):
+        if self.hits + self.misses == 0:
+            return 0.0
+        return self.hits / float(self.hits + self.misses)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return "FitnessCache{" + "hits: " + str(self.hits) + ", misses: " + str(self.misses) + ", size: " + str(len(self.entries)) + ", maxsize: " + str(self.maxsize) + "}"
@@ -0,0 +1,196 @@
+"""
+MSc Project
+Island model of the enhanced bees algorithm
+Several colonies (islands) run in separate processes, each one with its own
+current sites. Every migration_interval iterations the islands stop, report
+their best sites to the coordinator through a pipe, and the best sites of each
+island migrate to its neighbours in the topology, where they replace the worst
+current sites if they are better.
+The global best solution and the merged record (best fitness over all islands
+after each iteration) are kept by the coordinator.
+Author: Heng Zhai
+"""
+
+import os
+import traceback
+import multiprocessing
+
+import enhancedBA
+import random_streams
+
+# Topologies: the destinations of the migrants of island index among n_islands islands
+def ring(index, n_islands, rng):
+    return [(index + 1) % n_islands]
+
+def fully_connected(index, n_islands, rng):
+    return [j for j in range(n_islands) if j != index]
+
+def random_destination(index, n_islands, rng):
+    return [rng.choice([j for j in range(n_islands) if j != index])]
+
+topologies = {'ring': ring, 'fully_connected': fully_connected, 'random': random_destination}
+
+# Insert the migrants (position, fitness, patchSize) into the current sites of a colony,
+# each migrant replaces the worst current site if it is better
+def immigrate(ba, migrants):
+    sites = list(ba.currentSites)
+    for position, fitness, patchSize in sorted(migrants, key=lambda m: m[1], reverse=True):
+        if fitness > sites[-1].fitness:
+            sites[-1] = enhancedBA.Bee.fromPosition(list(position), ba.lowerBoundaries, ba.upperBoundaries, 0, list(patchSize), fitness)
+            sites.sort(reverse=True)
+    ba.currentSites = sites
+    if sites[0].fitness > ba.bestSolution.fitness:
+        best = sites[0]
+        ba.bestSolution = enhancedBA.Bee.fromPosition(list(best.position), ba.lowerBoundaries, ba.upperBoundaries, best.shrinkTimes, list(best.patchSize), best.fitness)
+
+# Main loop of an island process, driven by the commands received from the coordinator
+# stream is the random stream of the island, one of the independent child streams of the seed of IslandBA
+def _island_worker(connection, ba_class, fitnessFunction, lowerBoundaries, upperBoundaries, parameters, stream):
+    try:
+        ba = ba_class(fitnessFunction, lowerBoundaries, upperBoundaries, seed=stream, **parameters)
+        while True:
+            command, argument = connection.recv()
+            if command == 'run':
+                n_iterations, max_fitness, n_migrants = argument
+                start = len(ba.record)
+                ba.stoppingCriterion(max_iteration=n_iterations, max_fitness=max_fitness)
+                migrants = [(s.position, s.fitness, s.patchSize) for s in ba.currentSites[:n_migrants]]
+                connection.send(('ok', (ba.record[start:], migrants, (ba.bestSolution.position, ba.bestSolution.fitness), ba.n_evaluations)))
+            elif command == 'migrate':
+                immigrate(ba, argument)
+                connection.send(('ok', None))
+            elif command == 'stop':
+                break
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class IslandBA(object):
+    # n_islands defaults to the number of cores, the remaining keyword arguments (ns, nb, nr, sf, stlim, ngh) are passed to ba_class
+    # topology is one of the names in topologies or a function (index, n_islands, rng) returning the destination islands,
+    # rng is a random_streams.RandomStream
+    # seed is None, an int, a numpy SeedSequence or a RandomStream, every island and the topology get their own child stream
+    def __init__(self, fitnessFunction, lowerBoundaries, upperBoundaries, n_islands=None, migration_interval=50, n_migrants=1,
+                 topology='ring', ba_class=enhancedBA.EnhancedBA, seed=None, **parameters):
+        self.fitnessFunction = fitnessFunction
+        self.lowerBoundaries = lowerBoundaries
+        self.upperBoundaries = upperBoundaries
+        self.n_islands = n_islands or os.cpu_count() or 1
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        if callable(topology):
+            self.topology = topology
+        else:
+            self.topology = topologies[topology]
+        self.ba_class = ba_class
+        self.parameters = parameters
+        stream = seed if isinstance(seed, random_streams.RandomStream) else random_streams.RandomStream(seed)
+        self.streams = stream.spawn(self.n_islands)
+        self.rng = stream.spawn(1)[0]
+        self.bestSolution = None
+        self.record = []
+        self.n_evaluations = 0
+        self.processes = []
+        self.connections = []
+        self.checkParameters()
+
+    def checkParameters(self):
+        if self.n_islands < 1:
+            raise ValueError("The number of islands should be greater than or equal to 1")
+        if self.migration_interval < 1:
+            raise ValueError("The migration interval should be greater than or equal to 1")
+        if self.n_migrants < 0 or self.n_migrants > self.parameters.get('nb', 8):
+            raise ValueError("The number of migrants should be between 0 and the number of best sites")
+
+    # Start one process per island
+    def start(self):
+        for i in range(self.n_islands):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_island_worker, daemon=True,
+                                              args=(child, self.ba_class, self.fitnessFunction, self.lowerBoundaries, self.upperBoundaries, self.parameters, self.streams[i]))
+            process.start()
+            child.close()
+            self.processes.append(process)
+            self.connections.append(parent)
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.send(('stop', None))
+                connection.close()
+            except (OSError, EOFError):
+                pass
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        self.connections = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def receive(self, connection):
+        status, value = connection.recv()
+        if status == 'error':
+            raise RuntimeError("An island failed:\n" + value)
+        return value
+
+    # Run all the islands until the maximum number of iterations or the acceptable fitness is reached,
+    # iterations are counted per island (all the islands perform the same number of iterations)
+    def stoppingCriterion(self, max_iteration=None, max_fitness=None):
+        if max_iteration == None and max_fitness == None:
+            raise ValueError("Please provide a stop criteria")
+        if max_iteration != None and max_iteration < 0:
+            raise ValueError("The maximum number of iterations should be positive")
+        if len(self.processes) == 0:
+            self.start()
+        iteration = 0
+        while (max_iteration == None or iteration < max_iteration) and (max_fitness == None or self.bestSolution == None or self.bestSolution.fitness < max_fitness):
+            n_iterations = self.migration_interval
+            if max_iteration != None:
+                n_iterations = min(n_iterations, max_iteration - iteration)
+            for connection in self.connections:
+                connection.send(('run', (n_iterations, max_fitness, self.n_migrants)))
+            replies = [self.receive(connection) for connection in self.connections]
+            iteration += self.merge(replies, max_fitness)
+            if max_fitness != None and self.bestSolution.fitness >= max_fitness:
+                break
+            self.migrate([reply[1] for reply in replies])
+        return iteration, self.bestSolution.fitness
+
+    # Merge the records of the islands into the global record and update the global best solution,
+    # returns the number of iterations added to the record
+    def merge(self, replies, max_fitness):
+        self.n_evaluations = sum(reply[3] for reply in replies)
+        for _, _, (position, fitness), _ in replies:
+            if self.bestSolution == None or fitness > self.bestSolution.fitness:
+                self.bestSolution = enhancedBA.Bee.fromPosition(position, self.lowerBoundaries, self.upperBoundaries, 0, None, fitness)
+        records = [reply[0] for reply in replies if len(reply[0]) > 0]
+        n_iterations = max([len(r) for r in records] + [0])
+        for t in range(n_iterations):
+            best = max(r[min(t, len(r) - 1)] for r in records)
+            if len(self.record) > 0:
+                best = max(best, self.record[-1])
+            self.record.append(best)
+            # An island reached the acceptable fitness, the run stops at this iteration
+            if max_fitness != None and best >= max_fitness:
+                return t + 1
+        return n_iterations
+
+    # Send the best sites of every island to its destinations in the topology
+    def migrate(self, migrants):
+        if self.n_migrants == 0 or self.n_islands < 2:
+            return
+        incoming = [[] for _ in range(self.n_islands)]
+        for i in range(self.n_islands):
+            for j in self.topology(i, self.n_islands, self.rng):
+                if j != i:
+                    incoming[j] += migrants[i]
+        for connection, immigrants in zip(self.connections, incoming):
+            connection.send(('migrate', immigrants))
+        for connection in self.connections:
+            self.receive(connection)
@@ -0,0 +1,73 @@
+"""
+MSc Project
+Per-phase profiling of the enhanced bees algorithm
+A PhaseProfiler passed to EnhancedBA or VectorizedEnhancedBA (profiler=...)
+records the cumulative time, the number of calls and the number of bees of each
+phase of an iteration (waggle dance, scout generation, recruit generation,
+evaluation, local search, selection) and counts the site abandonments and shrink
+events. Without a profiler the engines only pay one test per phase.
+The results are exported as a summary table and as a trace in the Chrome trace
+event format, viewable in chrome://tracing, Perfetto or speedscope.
+Author: Heng Zhai
+"""
+
+import json
+import time
+
+class PhaseProfiler(object):
+    # At most max_events timed events are kept for the trace, the summary always covers all of them
+    def __init__(self, max_events=1000000):
+        self.max_events = max_events
+        self.clock = time.perf_counter
+        self.origin = self.clock()
+        self.totals = {}
+        self.calls = {}
+        self.counts = {}
+        self.events = []
+
+    def start(self):
+        return self.clock()
+
+    # End of a phase started at start, count is the number of bees (or events) it handled
+    # Returns the current time, which can be used as the start of the next phase
+    def stop(self, phase, start, count=1):
+        end = self.clock()
+        self.totals[phase] = self.totals.get(phase, 0.0) + end - start
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self.counts[phase] = self.counts.get(phase, 0) + count
+        if len(self.events) < self.max_events:
+            self.events.append((phase, start, end - start))
+        return self.clock()
+
+    # Events without a duration (site abandonment, shrink)
+    def count(self, phase, count=1):
+        self.counts[phase] = self.counts.get(phase, 0) + count
+
+    def reset(self):
+        self.__init__(self.max_events)
+
+    # One row per phase: (phase, calls, count, total seconds, milliseconds per call, share of the iteration time)
+    def summary(self):
+        iteration_time = self.totals.get('iteration', 0.0)
+        rows = []
+        for phase in sorted(self.counts, key=lambda p: -self.totals.get(p, 0.0)):
+            total = self.totals.get(phase, 0.0)
+            calls = self.calls.get(phase, 0)
+            rows.append((phase, calls, self.counts[phase], total,
+                         total / calls * 1000.0 if calls > 0 else 0.0,
+                         total / iteration_time if iteration_time > 0 and calls > 0 and phase != 'iteration' else None))
+        return rows
+
+    def summary_table(self):
+        lines = ["Phase".ljust(20) + "Calls".rjust(10) + "Count".rjust(12) + "Total (s)".rjust(12) + "ms/call".rjust(10) + "Share".rjust(8)]
+        for phase, calls, count, total, per_call, share in self.summary():
+            lines.append(phase.ljust(20) + str(calls).rjust(10) + str(count).rjust(12) + ("%.4f" % total).rjust(12) +
+                         ("%.4f" % per_call).rjust(10) + ("-" if share == None else "%.1f%%" % (share * 100.0)).rjust(8))
+        return "\n".join(lines)
+
+    # Chrome trace event format: one complete event ("ph": "X") per timed phase, times in microseconds
+    def write_trace(self, file_name):
+        events = [{'name': phase, 'ph': 'X', 'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6, 'pid': 1, 'tid': 1, 'cat': 'EnhancedBA'}
+                  for phase, start, duration in self.events]
+        with open(file_name, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
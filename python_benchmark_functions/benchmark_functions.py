@@ -5,8 +5,13 @@ This document for benchmark functions is provided by supervisor
 import math
 import numpy as np
 from . import functions_info_loader as fil
+from . import kernels
 
-functions_info = fil.FunctionsInfo()
+# functions_info.json is only read when the first optimum or bounds are requested
+functions_info = fil.FunctionsInfo(lazy=True)
+
+# Known optima (value, position) of each function configuration, the values are computed once per version of functions_info
+_optima = {}
 
 class BenchmarkFunction(object):
 	def __init__(self, name, n_dimensions=2, opposite=False):
@@ -14,14 +19,53 @@ class BenchmarkFunction(object):
 		self.opposite=opposite
 		self.n_dimensions=n_dimensions
 		self.parameters=[]
+		self.fast=None
 
-	def __call__(self, point, validate=True):
-		if validate:
+	# validate defaults to True, or to False in fast mode
+	def __call__(self, point, validate=None):
+		if validate or (validate is None and self.fast is None):
 			self._validate_point(point)
+		if self.fast is not None:
+			return self._fast_evaluate(point)
 		if self.opposite:
 			return - self._evaluate(point)
 		else:
 			return self._evaluate(point)
+
+	# Fast evaluation mode of this instance: the points are not validated (unless validate=True is passed) and
+	# the batches are evaluated by the compiled kernel of the function ('numba', see kernels.py) or by the numpy
+	# implementation ('numpy'); 'auto' selects numba when it is installed, None goes back to the default mode
+	def setFastMode(self, backend='auto'):
+		if backend not in (None, 'auto', 'numpy', 'numba'):
+			raise ValueError("Unknown fast mode backend "+str(backend)+", expected None, 'auto', 'numpy' or 'numba'")
+		if backend=='auto':
+			backend='numba' if kernels.available() and self._kernel_name is not None else 'numpy'
+		if backend=='numba' and not kernels.available():
+			raise ValueError("The numba backend requires numba to be installed")
+		if backend=='numba' and self._kernel_name is None:
+			raise ValueError("Function "+self.name+" has no compiled kernel")
+		self.fast=backend
+		return self
+
+	# name of the kernel of the function in kernels.kernels and its extra arguments
+	_kernel_name=None
+	def _kernel_arguments(self):
+		return ()
+
+	def _fast_batch(self, points):
+		if self.fast=='numba':
+			return kernels.get_kernel(self._kernel_name)(points, *self._kernel_arguments())
+		return self._evaluate_batch(points)
+
+	# single points: the python implementation is faster than a one-row array (numpy or numba) in low dimensions
+	def _fast_evaluate(self, point):
+		if self.n_dimensions<32:
+			value=self._evaluate(point)
+		else:
+			value=float(self._fast_batch(np.asarray([point], dtype=float))[0])
+		if self.opposite:
+			return - value
+		return value
 	
 	def derivative(self, point, validate=True):
 		if validate:
@@ -39,6 +83,84 @@ class BenchmarkFunction(object):
 		else:
 			return self._evaluate_second_derivative(point)
 
+	# batched versions of the calls above: points is an (n_points, n_dimensions) array, a vector of values is returned
+	def evaluate_batch(self, points, validate=None):
+		if validate is None:
+			validate=self.fast is None
+		points=self._as_points(points, validate)
+		if self.fast is not None:
+			values=self._fast_batch(points)
+		else:
+			values=self._evaluate_batch(points)
+		if self.opposite:
+			return - values
+		else:
+			return values
+
+	# separable functions are sums of the same term over the coordinates: f(x) = sum(_terms(x))
+	separable=False
+	def _terms(self, values):
+		raise NotImplementedError("Function "+self.name+" is not separable.")
+
+	# batched incremental evaluation of separable functions, for points which differ from their parents (whose values
+	# parent_values are the ones returned by evaluate_batch) only by the coordinates indices, an (n_points, k) array of
+	# distinct indices on each row whose values change from old_values to new_values: the cost is O(k) instead of O(n_dimensions)
+	# indices are not needed by the functions of this module, whose terms are the same for every coordinate
+	def evaluate_changes(self, parent_values, indices, old_values, new_values):
+		if not self.separable:
+			raise NotImplementedError("Function "+self.name+" is not separable, it can't be evaluated incrementally.")
+		delta=np.sum(self._terms(np.asarray(new_values, dtype=float)) - self._terms(np.asarray(old_values, dtype=float)), axis=-1)
+		if self.opposite:
+			return np.asarray(parent_values, dtype=float) - delta
+		else:
+			return np.asarray(parent_values, dtype=float) + delta
+
+	# the same evaluation point by point, with the contributions of the coordinates cached by the caller: terms() gives the
+	# contribution of every coordinate of a point (their sum is the value of the point, with the sign of opposite), and
+	# evaluate_delta() gives the value of a point where the coordinates indices of a parent take the values values, from the
+	# value and the cached contributions of the parent, in O(len(indices)); it returns the value and the new contributions
+	def terms(self, point):
+		return self._signed_terms(point).tolist()
+
+	def evaluate_delta(self, parent_value, parent_terms, indices, values):
+		new_terms=self._signed_terms(values).tolist()
+		return parent_value + sum(new_terms) - sum(parent_terms[i] for i in indices), new_terms
+
+	def _signed_terms(self, values):
+		if not self.separable:
+			raise NotImplementedError("Function "+self.name+" is not separable, it can't be evaluated incrementally.")
+		if self.opposite:
+			return - self._terms(np.asarray(values, dtype=float))
+		else:
+			return self._terms(np.asarray(values, dtype=float))
+
+	def derivative_batch(self, points, validate=True):
+		points=self._as_points(points, validate)
+		if self.opposite:
+			return - self._evaluate_derivative_batch(points)
+		else:
+			return self._evaluate_derivative_batch(points)
+
+	def second_derivative_batch(self, points, validate=True):
+		points=self._as_points(points, validate)
+		if self.opposite:
+			return - self._evaluate_second_derivative_batch(points)
+		else:
+			return self._evaluate_second_derivative_batch(points)
+
+	def _as_points(self, points, validate):
+		if not validate:
+			return np.asarray(points, dtype=float)
+		try:
+			points=np.asarray(points, dtype=float)
+		except (TypeError, ValueError):
+			raise ValueError("Functions can only be evaluated on float or int values, passed "+str(points))
+		if points.ndim!=2:
+			raise ValueError("Batches of points should be 2-dimensional arrays (n_points, n_dimensions), found "+str(points.ndim)+" dimensions")
+		if points.shape[1]!=self.n_dimensions:
+			raise ValueError("Function "+self.name+" declared as defined for "+str(self.n_dimensions)+" dimensions, asked to be evaluated on points of "+str(points.shape[1])+" dimensions")
+		return points
+
 	def _validate_point(self, point):
 		if type(point)!=tuple and type(point)!=list:
 			raise ValueError("Functions can be evaluated only on tuple or lists of values, found "+str(type(point)))
@@ -61,15 +183,31 @@ class BenchmarkFunction(object):
 		raise NotImplementedError("Derivative of function "+self.name+" is not defined.")
 	def _evaluate_second_derivative(self, point):
 		raise NotImplementedError("Second derivative of function "+self.name+" is not defined.")
+	# functions without a vectorized implementation are evaluated point by point
+	def _evaluate_batch(self, points):
+		return np.array([self._evaluate(p) for p in points.tolist()], dtype=float)
+	def _evaluate_derivative_batch(self, points):
+		return np.array([self._evaluate_derivative(p) for p in points.tolist()], dtype=float)
+	def _evaluate_second_derivative_batch(self, points):
+		return np.array([self._evaluate_second_derivative(p) for p in points.tolist()], dtype=float)
 	
 	def getName(self):
 		return self.name
 
+	# optima of the configuration of this instance, evaluated on the first call only
+	def _optima(self, optimum_type):
+		key=(functions_info.version, type(self), self.name, self.n_dimensions, str(self.parameters), self._kernel_arguments(), self.opposite, optimum_type)
+		if key not in _optima:
+			if len(_optima) > 0 and next(iter(_optima))[0] != functions_info.version:
+				_optima.clear()
+			_optima[key]=[(self(v), v) for v in functions_info._get_solutions(self.name, self.n_dimensions, optimum_type, self.parameters)]
+		return [(value, list(position)) for value, position in _optima[key]]
+
 	def getMinima(self):
 		if self.opposite:
-			return [(self(v), v) for v in functions_info.get_maxima(self.name, self.n_dimensions, self.parameters)]
+			return self._optima("maxima")
 		else:
-			return [(self(v), v) for v in functions_info.get_minima(self.name, self.n_dimensions, self.parameters)]
+			return self._optima("minima")
 	# return a tuple (value, position)
 	def getMinimum(self):
 		minima = self.getMinima()
@@ -83,9 +221,9 @@ class BenchmarkFunction(object):
 
 	def getMaxima(self):
 		if self.opposite:
-			return [(self(v), v) for v in functions_info.get_minima(self.name, self.n_dimensions, self.parameters)]
+			return self._optima("minima")
 		else:
-			return [(self(v), v) for v in functions_info.get_maxima(self.name, self.n_dimensions, self.parameters)]
+			return self._optima("maxima")
 	# return a tuple (value, position)
 	def getMaximum(self):
 		maxima = self.getMaxima()
@@ -106,6 +244,9 @@ Continuous, non-convex and multimodal.
 Clear global minimum at the center surrounded by many symmetrical local minima.
 '''
 class Ackley(BenchmarkFunction):
+	_kernel_name='ackley'
+	def _kernel_arguments(self):
+		return (self.a, self.b, self.c)
 	def __init__(self, n_dimensions=2,a=20,	b=.2,	c=2.0*math.pi, opposite=False):
 		super().__init__("Ackley", n_dimensions, opposite)
 		self.a=a
@@ -119,20 +260,30 @@ class Ackley(BenchmarkFunction):
 			part2+=math.cos(self.c*point[i])
 		ret = -self.a * math.exp(-self.b * math.sqrt(part1/len(point))) - math.exp(part2/len(point)) + self.a + math.exp(1.0)	
 		return ret
+	def _evaluate_batch(self,points):
+		n=points.shape[1]
+		part1=np.sum(points*points, axis=1)
+		part2=np.sum(np.cos(self.c*points), axis=1)
+		return -self.a * np.exp(-self.b * np.sqrt(part1/n)) - np.exp(part2/n) + self.a + math.exp(1.0)
 
 class Schaffer(BenchmarkFunction):
+	_kernel_name='schaffer'
 	def __init__(self, opposite=False):
 		super().__init__("Schaffer", 2, opposite)
 	def _evaluate(self,point):
 		tmp=pow(point[0],2) + pow(point[1],2)
 		ret = 0.5 + (pow(math.sin(math.sqrt(tmp)),2) - 0.5)/pow(1.0 + 0.001*tmp,2)
 		return ret
+	def _evaluate_batch(self,points):
+		tmp=points[:,0]*points[:,0] + points[:,1]*points[:,1]
+		return 0.5 + (np.sin(np.sqrt(tmp))**2 - 0.5)/(1.0 + 0.001*tmp)**2
 
 '''
 Continuous, non-convex and (highly) multimodal. 
 Location of the minima are geometrical distant.
 '''
 class Schwefel(BenchmarkFunction):
+	_kernel_name='schwefel'
 	def __init__(self, n_dimensions=2, opposite=False):
 		super().__init__("Schwefel", n_dimensions, opposite)
 	def _evaluate(self,point):
@@ -143,35 +294,58 @@ class Schwefel(BenchmarkFunction):
 			return 0.0
 		else:
 			return sum([-pow(p,2)*math.cos(math.sqrt(abs(p)))/(2.0*pow(abs(p),3.0/2.0)) - math.sin(math.sqrt(abs(p))) for p in point if p!=0.0])
+	def _evaluate_batch(self,points):
+		return np.sum(-points*np.sin(np.sqrt(np.abs(points))), axis=1)
+	separable=True
+	def _terms(self, values):
+		return -values*np.sin(np.sqrt(np.abs(values)))
+	def _evaluate_derivative_batch(self, points):
+		nonzero=points!=0.0
+		a=np.where(nonzero, np.abs(points), 1.0)
+		terms=-points*points*np.cos(np.sqrt(a))/(2.0*a**1.5) - np.sin(np.sqrt(a))
+		return np.sum(np.where(nonzero, terms, 0.0), axis=1)
 
 '''
 Continuous, unimodal, mostly a plateau with global minimum in a small central area.
 It's defined only for 2 dimensions.
 '''
 class Easom(BenchmarkFunction):
+	_kernel_name='easom'
 	def __init__(self, opposite=False):
 		super().__init__("Easom", 2, opposite)
 	def _evaluate(self,point):
 		ret = -math.cos(point[0])*math.cos(point[1])*math.exp(-pow(point[0]-math.pi,2)-pow(point[1]-math.pi,2))
 		return ret
+	def _evaluate_batch(self,points):
+		x=points[:,0]
+		y=points[:,1]
+		return -np.cos(x)*np.cos(y)*np.exp(-(x-math.pi)**2-(y-math.pi)**2)
 
 '''
 Continuous, multimodal with an asymmetrical hight slope and global minimum on a plateau.
 It's defined only for 2 dimensions.
 '''
 class GoldsteinAndPrice(BenchmarkFunction):
+	_kernel_name='goldstein_and_price'
 	def __init__(self, opposite=False):
 		super().__init__("Goldstein and Price", 2, opposite)
 	def _evaluate(self,point):
 		a = 1.0 + pow(point[0]+point[1]+1.0,2)*(19.0-14.0*point[0]+3.0*pow(point[0],2)-14.0*point[1]+6.0*point[0]*point[1]+3.0*pow(point[1],2))
 		b = 30.0 + pow(2*point[0]-3.0*point[1],2)*(18.0-32.0*point[0]+12.0*pow(point[0],2)+48.0*point[1]-36.0*point[0]*point[1]+27.0*pow(point[1],2))
 		return a*b
+	def _evaluate_batch(self,points):
+		x=points[:,0]
+		y=points[:,1]
+		a = 1.0 + (x+y+1.0)**2*(19.0-14.0*x+3.0*x**2-14.0*y+6.0*x*y+3.0*y**2)
+		b = 30.0 + (2*x-3.0*y)**2*(18.0-32.0*x+12.0*x**2+48.0*y-36.0*x*y+27.0*y**2)
+		return a*b
 
 '''
 Continuous, non-convex and (highly) multimodal. 
 Location of the minima are regularly distributed.
 '''
 class Rastrigin(BenchmarkFunction):
+	_kernel_name='rastrigin'
 	def __init__(self, n_dimensions=2, opposite=False):
 		super().__init__("Rastrigin", n_dimensions, opposite)
 	def _evaluate(self,point):
@@ -181,11 +355,21 @@ class Rastrigin(BenchmarkFunction):
 		return sum([2.0*p + 20.0*math.pi*math.sin(2.0*math.pi*p) for p in point])
 	def _evaluate_second_derivative(self, point):
 		return sum([2.0 + 40.0*pow(math.pi,2)*math.cos(2.0*math.pi*p) for p in point])
+	def _evaluate_batch(self,points):
+		return np.sum(points*points - 10.0*np.cos(2.0*math.pi*points), axis=1) + 10.0*points.shape[1]
+	separable=True
+	def _terms(self, values):
+		return values*values - 10.0*np.cos(2.0*math.pi*values) + 10.0
+	def _evaluate_derivative_batch(self, points):
+		return np.sum(2.0*points + 20.0*math.pi*np.sin(2.0*math.pi*points), axis=1)
+	def _evaluate_second_derivative_batch(self, points):
+		return np.sum(2.0 + 40.0*pow(math.pi,2)*np.cos(2.0*math.pi*points), axis=1)
 
 '''
 Continuous, convex and unimodal.
 '''
 class Hypersphere(BenchmarkFunction):
+	_kernel_name='hypersphere'
 	def __init__(self, n_dimensions=2, opposite=False):
 		super().__init__("Hypersphere", n_dimensions, opposite)
 
@@ -196,10 +380,24 @@ class Hypersphere(BenchmarkFunction):
 		return sum([2.0*x for x in point])
 	def _evaluate_second_derivative(self, point):
 		return 2.0*len(point)
+	def _evaluate_batch(self,points):
+		return np.sum(points*points, axis=1)
+	separable=True
+	def _terms(self, values):
+		return values*values
+	def _evaluate_derivative_batch(self, points):
+		return np.sum(2.0*points, axis=1)
+	def _evaluate_second_derivative_batch(self, points):
+		return np.full(points.shape[0], 2.0*points.shape[1])
 
 class MartinGaddy(BenchmarkFunction):
+	_kernel_name='martin_gaddy'
 	def __init__(self, opposite=False):
 		super().__init__("Martin and Gaddy", 2, opposite)
 	def _evaluate(self,point):
 		ret = pow(point[0] - point[1],2) + pow((point[0] + point[1] - 10.0)/3.0,2) 
-		return ret
\ No newline at end of file
+		return ret
+	def _evaluate_batch(self,points):
+		x=points[:,0]
+		y=points[:,1]
+		return (x - y)**2 + ((x + y - 10.0)/3.0)**2
@@ -16,9 +16,28 @@ class Reference(object):
 	def __str_(self):
 		return '@'+self.paper_type+str(self.data)
 
+# With lazy=True the json file is only read on the first access to the configuration
+# The optima and bounds are indexed per (function, dimensions, parameters) on their first lookup,
+# the index is cleared whenever the configuration changes, and version counts these changes so that
+# the values memoized from the index elsewhere (the optima of benchmark_functions) can be invalidated too
 class FunctionsInfo(object):
-	def __init__(self):
-		self.load()
+	def __init__(self, lazy=False):
+		self._config=None
+		self._index={}
+		self.version=0
+		if not lazy:
+			self.load()
+
+	@property
+	def config(self):
+		if self._config is None:
+			self.load()
+		return self._config
+
+	@config.setter
+	def config(self, config):
+		self._config=config
+		self._clear_index()
 
 	def load(self):
 		f=open(path_info)
@@ -33,7 +52,12 @@ class FunctionsInfo(object):
 	def _parameters2str(self,parameters):
 		return ','.join([p+'='+str(v) for p,v in parameters])
 
+	def _clear_index(self):
+		self._index={}
+		self.version+=1
+
 	def add_function(self, function_name, parameters=[]):
+		self._clear_index()
 		if function_name not in self.config:
 			if len(parameters)==0:
 				self.config[function_name]={'minima':{},'suggested bounds':{}}
@@ -63,8 +87,14 @@ class FunctionsInfo(object):
 			vals[dim]=[]
 		vals[dim]+=[position]
 
-	# auxiliary function
+	# auxiliary function, the positions are copied so that the index can't be modified by the callers
 	def _get_solutions(self,function_name,n_dimensions,optimum_type,parameters=[]):
+		key=(function_name, n_dimensions, optimum_type, self._parameters2str(parameters) if parameters else '')
+		if key not in self._index:
+			self._index[key]=self._find_solutions(function_name,n_dimensions,optimum_type,parameters)
+		return [list(position) for position in self._index[key]]
+
+	def _find_solutions(self,function_name,n_dimensions,optimum_type,parameters=[]):
 		name=function_name.upper()
 		ret=[]
 		if optimum_type not in self.config[name]:
@@ -104,6 +134,12 @@ class FunctionsInfo(object):
 		vals["upper"] = upper_bound
 	
 	def get_suggested_bounds(self, function_name, parameters=[]):
+		key=(function_name, "suggested bounds", self._parameters2str(parameters) if parameters else '')
+		if key not in self._index:
+			self._index[key]=self._find_suggested_bounds(function_name, parameters)
+		return self._index[key]
+
+	def _find_suggested_bounds(self, function_name, parameters=[]):
 		name=function_name.upper()
 		if len(parameters)==0:
 			vals=self.config[name]["suggested bounds"]
@@ -0,0 +1,111 @@
+"""
+Compiled kernels of the benchmark functions, used by the fast evaluation mode (BenchmarkFunction.setFastMode)
+Every kernel evaluates a 2-dimensional float array of points (n_points, n_dimensions) with explicit loops, and is
+compiled with numba when it is installed. Without numba the kernels stay plain python functions and the fast mode
+uses the numpy implementations (_evaluate_batch) instead.
+numba is only imported when a kernel is first requested, so that importing the benchmark functions stays cheap.
+"""
+
+import math
+import numpy as np
+
+_available = None
+
+# Whether numba is installed, it is only searched for on the first call
+def available():
+	global _available
+	if _available is None:
+		import importlib.util
+		_available = importlib.util.find_spec('numba') is not None
+	return _available
+
+def ackley(points, a, b, c):
+	n_points, n = points.shape
+	ret = np.empty(n_points)
+	for i in range(n_points):
+		part1 = 0.0
+		part2 = 0.0
+		for j in range(n):
+			x = points[i, j]
+			part1 += x*x
+			part2 += math.cos(c*x)
+		ret[i] = -a * math.exp(-b * math.sqrt(part1/n)) - math.exp(part2/n) + a + math.exp(1.0)
+	return ret
+
+def schaffer(points):
+	ret = np.empty(points.shape[0])
+	for i in range(points.shape[0]):
+		tmp = points[i, 0]*points[i, 0] + points[i, 1]*points[i, 1]
+		s = math.sin(math.sqrt(tmp))
+		ret[i] = 0.5 + (s*s - 0.5)/((1.0 + 0.001*tmp)*(1.0 + 0.001*tmp))
+	return ret
+
+def schwefel(points):
+	n_points, n = points.shape
+	ret = np.empty(n_points)
+	for i in range(n_points):
+		total = 0.0
+		for j in range(n):
+			x = points[i, j]
+			total += -x*math.sin(math.sqrt(abs(x)))
+		ret[i] = total
+	return ret
+
+def easom(points):
+	ret = np.empty(points.shape[0])
+	for i in range(points.shape[0]):
+		x = points[i, 0]
+		y = points[i, 1]
+		ret[i] = -math.cos(x)*math.cos(y)*math.exp(-(x-math.pi)*(x-math.pi)-(y-math.pi)*(y-math.pi))
+	return ret
+
+def goldstein_and_price(points):
+	ret = np.empty(points.shape[0])
+	for i in range(points.shape[0]):
+		x = points[i, 0]
+		y = points[i, 1]
+		a = 1.0 + (x+y+1.0)*(x+y+1.0)*(19.0-14.0*x+3.0*x*x-14.0*y+6.0*x*y+3.0*y*y)
+		b = 30.0 + (2*x-3.0*y)*(2*x-3.0*y)*(18.0-32.0*x+12.0*x*x+48.0*y-36.0*x*y+27.0*y*y)
+		ret[i] = a*b
+	return ret
+
+def rastrigin(points):
+	n_points, n = points.shape
+	ret = np.empty(n_points)
+	for i in range(n_points):
+		total = 10.0*n
+		for j in range(n):
+			x = points[i, j]
+			total += x*x - 10.0*math.cos(2.0*math.pi*x)
+		ret[i] = total
+	return ret
+
+def hypersphere(points):
+	n_points, n = points.shape
+	ret = np.empty(n_points)
+	for i in range(n_points):
+		total = 0.0
+		for j in range(n):
+			total += points[i, j]*points[i, j]
+		ret[i] = total
+	return ret
+
+def martin_gaddy(points):
+	ret = np.empty(points.shape[0])
+	for i in range(points.shape[0]):
+		x = points[i, 0]
+		y = points[i, 1]
+		ret[i] = (x - y)*(x - y) + ((x + y - 10.0)/3.0)*((x + y - 10.0)/3.0)
+	return ret
+
+kernels = {'ackley': ackley, 'schaffer': schaffer, 'schwefel': schwefel, 'easom': easom, 'goldstein_and_price': goldstein_and_price,
+		   'rastrigin': rastrigin, 'hypersphere': hypersphere, 'martin_gaddy': martin_gaddy}
+
+compiled = {}
+
+# Compiled kernel of a function, numba compiles it on its first call (cache=True keeps the machine code on disk for the next processes)
+def get_kernel(name):
+	if name not in compiled:
+		import numba
+		compiled[name] = numba.njit(cache=True)(kernels[name])
+	return compiled[name]
@@ -0,0 +1,123 @@
+"""
+MSc Project
+Random number streams of the enhanced bees algorithm
+Every instance of EnhancedBA (and of its variants) draws from its own
+RandomStream instead of the global random and numpy.random modules, so that a
+run is reproducible bit for bit given its seed, whatever the other runs of the
+process (or of the other workers) draw in the meantime.
+A stream holds two numpy Generators (PCG64) seeded from a SeedSequence:
+  - generator, for the batched draws (the multinomial of the waggle dance, the
+    samplers of VectorizedEnhancedBA)
+  - a second generator, jumped far ahead of the first one, for the uniform
+    draws of the samplers, which are generated in blocks by numpy and handed
+    out from a list of python floats, so a position of D coordinates costs one
+    slice of the buffer instead of D calls to random.random()
+  - reserve(n) pre-generates the n draws of an iteration at once, the buffer
+    is a numpy array sized to the draws reserved (or to small blocks of draws
+    otherwise), only the slices handed out are converted to python floats
+  - spawn(n) splits the stream into n independent child streams (islands,
+    workers), derived from the seed and the order of the calls to spawn
+The numbers drawn do not depend on the size of the blocks: the buffer is the
+only user of its generator, which produces the same sequence of doubles
+whether it is asked for them one by one or in blocks.
+Author: Heng Zhai
+"""
+
+import numpy as np
+
+class RandomStream(object):
+    # seed is None (fresh entropy from the operating system), an int or a numpy SeedSequence
+    # block is the minimum number of uniform draws generated at a time
+    def __init__(self, seed=None, block=256):
+        if block < 1:
+            raise ValueError("The size of the blocks should be greater than or equal to 1")
+        if isinstance(seed, np.random.SeedSequence):
+            self.sequence = seed
+        else:
+            self.sequence = np.random.SeedSequence(seed)
+        # The batched draws use generator, the buffer is filled from its own generator so that the blocks don't shift them
+        self.generator = np.random.Generator(np.random.PCG64(self.sequence))
+        self.uniformGenerator = np.random.Generator(self.generator.bit_generator.jumped())
+        self.block = block
+        self.buffer = np.empty(0)
+        self.position = 0
+
+    # Make sure that at least n uniform draws are buffered
+    def reserve(self, n):
+        remaining = len(self.buffer) - self.position
+        if remaining < n:
+            self.buffer = np.concatenate((self.buffer[self.position:], self.uniformGenerator.random(max(n - remaining, self.block))))
+            self.position = 0
+
+    # List of n uniform draws in [0, 1)
+    def uniforms(self, n):
+        start = self.position
+        end = start + n
+        if end > len(self.buffer):
+            self.reserve(n)
+            start, end = 0, n
+        self.position = end
+        return self.buffer[start:end].tolist()
+
+    # One uniform draw in [0, 1)
+    def random(self):
+        if self.position == len(self.buffer):
+            self.reserve(1)
+        value = float(self.buffer[self.position])
+        self.position += 1
+        return value
+
+    # k distinct integers of range(n), in the order they were drawn
+    def sample(self, n, k):
+        if k > n:
+            raise ValueError("The sample is larger than the population")
+        if 2 * k <= n:
+            # Few indices among many: draw again the indices already drawn
+            chosen = []
+            seen = set()
+            while len(chosen) < k:
+                i = int(self.random() * n)
+                if i not in seen:
+                    seen.add(i)
+                    chosen.append(i)
+            return chosen
+        # Partial Fisher-Yates shuffle of the population
+        population = list(range(n))
+        for j, u in enumerate(self.uniforms(k)):
+            i = j + int(u * (n - j))
+            population[j], population[i] = population[i], population[j]
+        return population[:k]
+
+    # One item of a non-empty sequence
+    def choice(self, items):
+        return items[int(self.random() * len(items))]
+
+    # Shuffle a list in place (Fisher-Yates)
+    def shuffle(self, items):
+        n = len(items)
+        if n < 2:
+            return
+        for j, u in zip(range(n - 1, 0, -1), self.uniforms(n - 1)):
+            i = int(u * (j + 1))
+            items[j], items[i] = items[i], items[j]
+
+    # n independent child streams
+    def spawn(self, n):
+        return [RandomStream(sequence, self.block) for sequence in self.sequence.spawn(n)]
+
+    # State of the stream: the generators, the buffered draws not used yet and the number of child streams already spawned
+    def getState(self):
+        return {'generator': self.generator.bit_generator.state,
+                'uniformGenerator': self.uniformGenerator.bit_generator.state,
+                'buffer': self.buffer[self.position:].tolist(),
+                'entropy': self.sequence.entropy,
+                'spawn_key': self.sequence.spawn_key,
+                'n_children_spawned': self.sequence.n_children_spawned}
+
+    def setState(self, state):
+        self.sequence = np.random.SeedSequence(state['entropy'], spawn_key=state['spawn_key'], pool_size=self.sequence.pool_size,
+                                               n_children_spawned=state['n_children_spawned'])
+        self.generator.bit_generator.state = state['generator']
+        self.uniformGenerator.bit_generator.state = state['uniformGenerator']
+        self.buffer = np.array(state['buffer'], dtype=float)
+        self.position = 0
@@ -0,0 +1,51 @@
+"""
+MSc Project
+Allocation of the recruits to the selected sites (the waggle dance)
+An allocation policy turns the fitness of the nb selected sites, ranked in
+descending order, into the number of recruits of each site in one batched draw.
+Every recruit chooses its site independently, so the counts follow a
+multinomial distribution over the sites and the policies only differ by the
+probability of each site. Sites which are not chosen get exactly zero recruits.
+Author: Heng Zhai
+"""
+
+import numpy as np
+
+class AllocationPolicy(object):
+    # fitness of the selected sites (ranked in descending order), number of recruits nr,
+    # rng is a numpy Generator or the numpy.random module
+    def allocate(self, fitness, nr, rng):
+        return rng.multinomial(nr, self.probabilities(np.asarray(fitness, dtype=float)))
+
+    def probabilities(self, fitness):
+        raise NotImplementedError("Allocation policy " + type(self).__name__ + " is not defined.")
+
+
+# The tournament of the enhanced bees algorithm: each recruit picks two distinct sites at random
+# and follows the better ranked one, so the site of rank j (0 is the best) is followed with
+# probability 2 * (nb - 1 - j) / (nb * (nb - 1)) and the worst site never gets a recruit
+class TournamentAllocation(AllocationPolicy):
+    def probabilities(self, fitness):
+        nb = len(fitness)
+        return 2.0 * (nb - 1 - np.arange(nb)) / (nb * (nb - 1))
+
+
+# The probability of a site decreases linearly with its rank: nb for the best site, 1 for the worst one
+class RankProportionalAllocation(AllocationPolicy):
+    def probabilities(self, fitness):
+        weights = len(fitness) - np.arange(len(fitness), dtype=float)
+        return weights / weights.sum()
+
+
+# The probability of a site is proportional to its fitness above the fitness of the worst site
+# (all the sites are equally likely when their fitness is the same)
+class FitnessProportionalAllocation(AllocationPolicy):
+    def probabilities(self, fitness):
+        weights = fitness - fitness.min()
+        total = weights.sum()
+        if not total > 0:
+            return np.full(len(fitness), 1.0 / len(fitness))
+        return weights / total
+
+
+policies = {'tournament': TournamentAllocation, 'rank': RankProportionalAllocation, 'fitness': FitnessProportionalAllocation}
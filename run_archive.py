@@ -0,0 +1,169 @@
+"""
+MSc Project
+Append-only archive of all the evaluations of a run
+Every evaluated bee is stored as one row (iteration, site index, role, position,
+fitness) in a directory holding one raw binary file per column. Rows are
+buffered in memory up to buffer_size rows and then appended to the files, so the
+memory used by the writer is bounded whatever the length of the run. The reader
+maps the files with numpy.memmap, so an archive can be sliced by iteration, role
+or site without loading it.
+The initial scouts are stored at iteration 0, the global scouts have site index
+-1 and the scouts sent by an abandoned site have the index of this site.
+Author: Heng Zhai
+"""
+
+import json
+import os
+import numpy as np
+
+SCOUT = 0
+RECRUIT = 1
+
+# Name, numpy type and number of values per row of each column (None for the number of dimensions)
+columns = [('iteration', 'int64', 1), ('site', 'int32', 1), ('role', 'int8', 1), ('position', 'float64', None), ('fitness', 'float64', 1)]
+
+def column_file(path, name):
+    return os.path.join(path, name + ".bin")
+
+
+class RunArchiveWriter(object):
+    # An existing archive at path is extended when append is True, otherwise it is replaced
+    def __init__(self, path, n_dimensions, buffer_size=100000, append=False):
+        self.path = path
+        self.n_dimensions = n_dimensions
+        self.buffer_size = buffer_size
+        self.n_rows = 0
+        self.buffer = []
+        self.n_buffered = 0
+        os.makedirs(path, exist_ok=True)
+        if append and os.path.exists(os.path.join(path, "meta.json")):
+            meta = read_meta(path)
+            if meta['n_dimensions'] != n_dimensions:
+                raise ValueError("The archive has " + str(meta['n_dimensions']) + " dimensions, not " + str(n_dimensions))
+            # Rows written after the last update of the meta data (interrupted run) are dropped
+            self.truncate(meta['n_rows'])
+        else:
+            for name, dtype, width in columns:
+                open(column_file(path, name), 'wb').close()
+        self.write_meta()
+
+    def write_meta(self):
+        meta = {'n_dimensions': self.n_dimensions, 'n_rows': self.n_rows, 'columns': [[name, dtype] for name, dtype, _ in columns]}
+        with open(os.path.join(self.path, "meta.json.tmp"), 'w') as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(self.path, "meta.json.tmp"), os.path.join(self.path, "meta.json"))
+
+    # Keep the first n_rows rows of the files
+    def truncate(self, n_rows):
+        for name, dtype, width in columns:
+            with open(column_file(self.path, name), 'ab') as f:
+                f.truncate(n_rows * np.dtype(dtype).itemsize * (width or self.n_dimensions))
+        self.n_rows = n_rows
+        self.write_meta()
+
+    # Drop the rows of the iterations after iteration, e.g. to continue an archive from a checkpoint:
+    # ba = EnhancedBA.fromCheckpoint(...); writer.truncate_after(len(ba.record)); ba.archive = writer
+    def truncate_after(self, iteration):
+        self.flush()
+        if self.n_rows > 0:
+            iterations = np.memmap(column_file(self.path, 'iteration'), dtype='int64', mode='r', shape=(self.n_rows,))
+            n_rows = int(np.searchsorted(iterations, iteration, side='right'))
+            del iterations
+            self.truncate(n_rows)
+
+    # Append a group of rows, sites and roles may be single values shared by all the rows
+    def append(self, iteration, sites, roles, positions, fitness):
+        positions = np.asarray(positions, dtype=float).reshape(-1, self.n_dimensions)
+        n = len(positions)
+        if n == 0:
+            return
+        self.buffer.append((np.full(n, iteration, dtype=np.int64),
+                            np.broadcast_to(np.asarray(sites, dtype=np.int32), (n,)),
+                            np.broadcast_to(np.asarray(roles, dtype=np.int8), (n,)),
+                            positions,
+                            np.asarray(fitness, dtype=float).reshape(n)))
+        self.n_buffered += n
+        if self.n_buffered >= self.buffer_size:
+            self.flush()
+
+    # Write the buffered rows to the column files, then update the number of rows in the meta data
+    def flush(self):
+        if self.n_buffered == 0:
+            return
+        for k, (name, dtype, _) in enumerate(columns):
+            with open(column_file(self.path, name), 'ab') as f:
+                f.write(np.ascontiguousarray(np.concatenate([rows[k] for rows in self.buffer]), dtype=dtype).tobytes())
+        self.n_rows += self.n_buffered
+        self.buffer = []
+        self.n_buffered = 0
+        self.write_meta()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_meta(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+
+# Read-only view of an archive, the columns are memory-mapped and only the sliced rows are read from the disk
+class RunArchive(object):
+    def __init__(self, path):
+        self.path = path
+        meta = read_meta(path)
+        self.n_dimensions = meta['n_dimensions']
+        self.n_rows = meta['n_rows']
+        self.columns = {}
+        for name, dtype, width in columns:
+            shape = (self.n_rows,) if width == 1 else (self.n_rows, self.n_dimensions)
+            if self.n_rows == 0:
+                self.columns[name] = np.empty(shape, dtype=dtype)
+            else:
+                self.columns[name] = np.memmap(column_file(path, name), dtype=dtype, mode='r', shape=shape)
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    # Last iteration stored in the archive
+    def n_iterations(self):
+        return int(self.columns['iteration'][-1]) if self.n_rows > 0 else 0
+
+    # Range of the rows of iterations [start, stop), found by binary search since the iterations are appended in order
+    def rows(self, start, stop=None):
+        if stop == None:
+            stop = start + 1
+        iterations = self.columns['iteration']
+        return slice(int(np.searchsorted(iterations, start, side='left')), int(np.searchsorted(iterations, stop, side='left')))
+
+    # Rows of iterations [start, stop) as a dict of arrays, optionally filtered by role and/or site index
+    def select(self, start=0, stop=None, role=None, site=None):
+        if stop == None:
+            stop = self.n_iterations() + 1
+        rows = self.rows(start, stop)
+        selected = {name: np.asarray(column[rows]) for name, column in self.columns.items()}
+        mask = np.ones(rows.stop - rows.start, dtype=bool)
+        if role != None:
+            mask &= selected['role'] == role
+        if site != None:
+            mask &= selected['site'] == site
+        if not mask.all():
+            selected = {name: column[mask] for name, column in selected.items()}
+        return selected
+
+    # Best fitness found up to the end of each iteration, computed chunk by chunk
+    def best_fitness(self, chunk_size=1000000):
+        best = np.full(self.n_iterations() + 1, -np.inf)
+        for start in range(0, self.n_rows, chunk_size):
+            iterations = np.asarray(self.columns['iteration'][start:start + chunk_size])
+            np.maximum.at(best, iterations, np.asarray(self.columns['fitness'][start:start + chunk_size]))
+        return np.maximum.accumulate(best)
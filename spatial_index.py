@@ -0,0 +1,127 @@
+"""
+MSc Project
+Spatial index of the evaluated points
+The positions sent to the fitness function are archived in a grid so that the
+global scouts landing in an already explored region (close to an archived
+point or inside the patch of a current site) can be rejected before they are
+evaluated. distinct() is used at the selection of the sites, so that a site
+lying inside the patch of a better site is merged into it instead of wasting
+recruits on the same basin.
+Author: Heng Zhai
+"""
+
+import numpy as np
+
+# Order of the candidates (ranked in descending fitness) keeping the distinct ones first: a candidate inside the
+# hyper box of half-widths halfWidths (see SpatialIndex.siteHalfWidths) of a better distinct candidate is a duplicate and goes after all the distinct
+# ones, so that it is only selected when there are not enough distinct candidates
+def distinct(positions, halfWidths):
+    positions = np.asarray(positions, dtype=float)
+    halfWidths = np.asarray(halfWidths, dtype=float)
+    # inside[i, j]: candidate i lies in the patch of candidate j
+    inside = np.all(np.abs(positions[:, None, :] - positions[None, :, :]) <= halfWidths[None, :, :], axis=2).tolist()
+    kept = []
+    duplicates = []
+    for i in range(len(positions)):
+        if any(inside[i][j] for j in kept):
+            duplicates.append(i)
+        else:
+            kept.append(i)
+    return kept + duplicates, len(duplicates)
+
+
+# Archive of the evaluated points, hashed on a grid over the first grid_dimensions coordinates
+# (a grid over all the coordinates would have 3^D neighbouring cells), the other coordinates are checked exactly
+# exploration_radius is the half-width of the explored region around a point, as a fraction of the half range of each dimension
+# The archive is a ring buffer of max_points points, the oldest points are forgotten first
+# The region of a site is its patch, capped to site_radius of the half range (the initial patches cover the whole search space)
+# A rejected scout is sampled again at most max_resamples times, then it is discarded without being evaluated
+class SpatialIndex(object):
+    def __init__(self, exploration_radius=0.01, site_radius=0.1, max_points=50000, max_resamples=3, grid_dimensions=3):
+        if exploration_radius < 0:
+            raise ValueError("The exploration radius should be positive")
+        if max_points < 1:
+            raise ValueError("The size of the archive should be greater than or equal to 1")
+        self.exploration_radius = exploration_radius
+        self.site_radius = site_radius
+        self.max_points = max_points
+        self.max_resamples = max_resamples
+        self.grid_dimensions = grid_dimensions
+        self.points = None
+        self.cellOfSlot = [None] * max_points
+        self.cells = {}
+        self.n_points = 0
+        self.halfWidths = None
+        self.middle = None
+        self.lowerBoundaries = None
+        self.cellSize = None
+        self.strides = None
+        self.offsets = None
+        # Number of sites merged into a better site, of scouts rejected and of scouts discarded after max_resamples
+        self.merged = 0
+        self.rejected = 0
+        self.discarded = 0
+
+    # The lower boundaries and the half range of each dimension fix the size of the explored region and the grid cells,
+    # a cell is identified by one integer and its neighbouring cells by precomputed offsets of this integer
+    def bind(self, lowerBoundaries, middle):
+        self.middle = np.asarray(middle, dtype=float)
+        self.halfWidths = self.middle * self.exploration_radius
+        g = min(self.grid_dimensions, len(self.halfWidths))
+        self.lowerBoundaries = np.asarray(lowerBoundaries, dtype=float)[:g]
+        self.cellSize = np.maximum(2.0 * self.halfWidths[:g], 1e-300)
+        # The bounded region spans at most 1 / exploration_radius cells in each dimension
+        width = int(1.0 / max(self.exploration_radius, 1e-6)) + 3
+        self.strides = width ** np.arange(g, dtype=np.int64)
+        self.offsets = [int(np.dot(np.array(offset) - 1, self.strides)) for offset in np.ndindex(*([3] * g))]
+
+    def keys(self, positions):
+        cells = np.floor((positions[:, :len(self.strides)] - self.lowerBoundaries) / self.cellSize).astype(np.int64) + 1
+        return (cells @ self.strides).tolist()
+
+    def insert(self, positions):
+        positions = np.asarray(positions, dtype=float)
+        if self.exploration_radius == 0 or len(positions) == 0:
+            return
+        if self.points is None:
+            self.points = np.empty((self.max_points, positions.shape[1]))
+        slots = (self.n_points + np.arange(len(positions))) % self.max_points
+        # When more points than max_points are inserted at once, only the last ones are kept
+        self.points[slots] = positions
+        for slot, key in zip(slots.tolist(), self.keys(positions)):
+            if self.cellOfSlot[slot] != None:
+                self.cells[self.cellOfSlot[slot]].discard(slot)
+            self.cells.setdefault(key, set()).add(slot)
+            self.cellOfSlot[slot] = key
+        self.n_points += len(positions)
+
+    # Half-widths of the regions of sites with the given patch sizes
+    def siteHalfWidths(self, patchSizes):
+        return np.minimum(np.asarray(patchSizes, dtype=float), self.site_radius) * self.middle
+
+    # Archived points in the cells around the cell key
+    def neighbours(self, key):
+        slots = []
+        for offset in self.offsets:
+            cell = self.cells.get(key + offset)
+            if cell:
+                slots.extend(cell)
+        return slots
+
+    # Whether each position lies close to an archived point or in the region of a current site (see siteHalfWidths)
+    def explored(self, positions, sitePositions=None, sitePatches=None):
+        positions = np.asarray(positions, dtype=float)
+        mask = np.zeros(len(positions), dtype=bool)
+        if sitePositions is not None and len(sitePositions) > 0:
+            halfWidths = self.siteHalfWidths(sitePatches)
+            mask |= np.any(np.all(np.abs(positions[:, None, :] - np.asarray(sitePositions)[None, :, :]) <= halfWidths[None, :, :], axis=2), axis=1)
+        if self.points is not None and self.exploration_radius > 0:
+            keys = self.keys(positions)
+            for i in np.flatnonzero(~mask).tolist():
+                slots = self.neighbours(keys[i])
+                if len(slots) > 0:
+                    mask[i] = np.any(np.all(np.abs(self.points[slots] - positions[i]) <= self.halfWidths, axis=1))
+        return mask
+
+    def report(self):
+        return {'archived': min(self.n_points, self.max_points), 'merged': self.merged, 'rejected': self.rejected, 'discarded': self.discarded}
@@ -0,0 +1,102 @@
+"""
+MSc Project
+Surrogate-assisted pre-screening of the recruits
+A cheap regressor is trained incrementally on every evaluated point. The
+candidate recruits of a site are scored by the surrogate first and only the
+most promising fraction is sent to the real fitness function, the others are
+discarded without being evaluated.
+Author: Heng Zhai
+"""
+
+import math
+import numpy as np
+
+# Inverse-distance weighted k-nearest-neighbours regressor
+# The distances are euclidean in the original coordinates, so the search space should have comparable ranges on all dimensions
+# Only the max_points most recent evaluations are kept
+class KNNSurrogate(object):
+    def __init__(self, k=5, max_points=5000, max_pairs=10000):
+        if k < 1:
+            raise ValueError("The number of neighbours should be greater than or equal to 1")
+        self.k = k
+        self.max_points = max_points
+        self.max_pairs = max_pairs
+        self.points = None
+        self.values = None
+        # Screening counters and (predicted, true) pairs of the evaluated points, for the accuracy report
+        self.candidates = 0
+        self.selected = 0
+        self.predictedValues = []
+        self.trueValues = []
+
+    def isTrained(self):
+        return self.points is not None and len(self.points) >= self.k
+
+    # The squared distances are expanded as |a|^2 + |b|^2 - 2 a.b, by chunks of candidates, so at most chunk_size x max_points
+    # distances are held in memory; the points and candidates are centred on the mean of the points first, so that the
+    # expansion does not cancel out far from the origin, and the distances of the k nearest points are computed again exactly
+    def predict(self, positions, chunk_size=256):
+        centre = self.points.mean(axis=0)
+        points = self.points - centre
+        positions = np.asarray(positions, dtype=float) - centre
+        pointNorms = np.einsum('ij,ij->i', points, points)
+        predicted = np.empty(len(positions))
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start:start + chunk_size]
+            squared = np.maximum(np.einsum('ij,ij->i', chunk, chunk)[:, None] + pointNorms[None, :] - 2.0 * (chunk @ points.T), 0.0)
+            nearest = np.argpartition(squared, self.k - 1, axis=1)[:, :self.k]
+            d = np.sqrt(((chunk[:, None, :] - points[nearest]) ** 2).sum(axis=2))
+            weights = 1.0 / np.maximum(d, 1e-12)
+            predicted[start:start + chunk_size] = (weights * self.values[nearest]).sum(axis=1) / weights.sum(axis=1)
+        return predicted
+
+    # Add evaluated points to the training set, the prediction made before seeing them is kept to measure the accuracy
+    def observe(self, positions, fitness):
+        positions = np.asarray(positions, dtype=float)
+        fitness = np.asarray(fitness, dtype=float)
+        if len(positions) == 0:
+            return
+        if self.isTrained():
+            self.predictedValues = (self.predictedValues + self.predict(positions).tolist())[-self.max_pairs:]
+            self.trueValues = (self.trueValues + fitness.tolist())[-self.max_pairs:]
+        if self.points is None:
+            self.points = positions.copy()
+            self.values = fitness.copy()
+        else:
+            self.points = np.concatenate((self.points, positions))[-self.max_points:]
+            self.values = np.concatenate((self.values, fitness))[-self.max_points:]
+
+    # Indices of the ceil(ratio * n) candidates with the best predicted fitness (all of them while the surrogate is not trained)
+    def screen(self, positions, ratio):
+        n_selected = self.selectedCount(len(positions), ratio)
+        self.countScreening(len(positions), n_selected)
+        if n_selected == len(positions):
+            return list(range(len(positions)))
+        predicted = self.predict(positions)
+        return sorted(np.argsort(-predicted, kind='stable')[:n_selected].tolist())
+
+    def selectedCount(self, n_candidates, ratio):
+        if not self.isTrained():
+            return n_candidates
+        return min(n_candidates, int(math.ceil(ratio * n_candidates)))
+
+    def countScreening(self, n_candidates, n_selected):
+        self.candidates += n_candidates
+        self.selected += n_selected
+
+    # Fraction of the screened candidates which were really evaluated, mean absolute error and
+    # spearman rank correlation of the predictions made before the evaluation of the points
+    def report(self):
+        ratio = self.selected / float(self.candidates) if self.candidates > 0 else 1.0
+        mae = None
+        correlation = None
+        if len(self.trueValues) > 1:
+            predicted = np.asarray(self.predictedValues)
+            true = np.asarray(self.trueValues)
+            mae = float(np.mean(np.abs(predicted - true)))
+            rp = np.argsort(np.argsort(predicted))
+            rt = np.argsort(np.argsort(true))
+            if rp.std() > 0 and rt.std() > 0:
+                correlation = float(np.corrcoef(rp, rt)[0, 1])
+        return {'candidates': self.candidates, 'evaluated': self.selected, 'evaluation_ratio': ratio,
+                'mean_absolute_error': mae, 'rank_correlation': correlation}
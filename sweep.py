@@ -0,0 +1,264 @@
+"""
+MSc Project
+Parallel sweep of the parameters of the enhanced bees algorithm
+The configurations (dicts of EnhancedBA arguments among ns, nb, nr, stlim and
+sf) come from a full grid or are drawn at random from the same space, and are
+run on one benchmark of testing.py with the same seeds (testing.run_seeds), in
+rungs of runs spread over a pool of processes:
+  - 'race': after every rung of rung_runs runs, the configurations whose cost is
+    clearly worse than the best one (the confidence intervals of the mean cost,
+    two standard errors wide, don't overlap) are stopped
+  - 'halving': successive halving, every rung keeps the best 1/eta of the
+    configurations and runs eta times more runs for them
+The cost of a run is its number of fitness evaluations (n_evaluations of the
+run, or its number of iterations), the runs which don't reach the acceptable
+fitness cost what they used in max_iteration iterations.
+Every finished run is appended to a cache file (one json line per run, keyed by
+benchmark, full parameters of the run, optimum fitness, seed, max_iteration,
+engine and version of the code), so an interrupted sweep resumes without running
+the cached runs again, and a change of the unswept parameters, of the optimum or
+of the sources of the project never serves stale runs.
+The configurations which completed all their runs are written with the columns
+of testing.write_csv.
+Author: Heng Zhai
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import enhancedBA
+import testing
+
+parameter_names = ['ns', 'nb', 'nr', 'stlim', 'sf']
+
+# Every combination of the values of space (a dict: parameter name -> list of values)
+def grid(space):
+    names = [name for name in parameter_names if name in space]
+    return [config for config in (dict(zip(names, values)) for values in itertools.product(*[space[name] for name in names])) if valid(config)]
+
+# n distinct configurations drawn from space, a parameter is drawn from its list of values
+# or uniformly from a (low, high) tuple (integers for integer bounds)
+def random_configs(space, n, seed=0):
+    rng = random.Random(seed)
+    configs = []
+    seen = set()
+    for _ in range(100 * n):
+        if len(configs) == n:
+            break
+        config = {}
+        for name in [name for name in parameter_names if name in space]:
+            values = space[name]
+            if isinstance(values, tuple):
+                low, high = values
+                config[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+            else:
+                config[name] = rng.choice(values)
+        key = config_key(config)
+        if valid(config) and key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+# The selection needs at least 2 best sites and more scouts than best sites
+def valid(config):
+    return config.get('nb', 8) >= 2 and config.get('ns', 35) > config.get('nb', 8) and 0 <= config.get('sf', .2) <= 1
+
+def config_key(config):
+    return json.dumps(sorted(config.items()))
+
+# Cost of every (iterations, fitness, evaluations) run of a configuration
+def run_costs(results, metric):
+    if metric == 'iterations':
+        return [float(iteration) for iteration, fitness, n_evaluations in results]
+    return [float(n_evaluations) for iteration, fitness, n_evaluations in results]
+
+def mean_and_error(costs):
+    mean = sum(costs) / len(costs)
+    if len(costs) < 2:
+        return mean, 0.0
+    variance = sum((c - mean) ** 2 for c in costs) / (len(costs) - 1)
+    return mean, math.sqrt(variance / len(costs))
+
+
+# Version of the code of the runs: a checksum of the python sources of the project (the algorithms and the benchmark
+# functions), so that the runs cached before a change of the code are run again
+def code_version():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    checksum = 0
+    for folder in [directory, os.path.join(directory, 'python_benchmark_functions')]:
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.py'):
+                with open(os.path.join(folder, name), 'rb') as f:
+                    checksum = zlib.crc32(f.read(), checksum)
+    return checksum
+
+
+# Append-only json lines cache of the finished runs, as (iterations, fitness, evaluations)
+# parameters are all the keyword arguments of the run (the swept configuration merged into the parameters of the benchmark)
+# and optimum_fitness the optimum of the benchmark, which sets the acceptable fitness of the run
+# The runs of another version of the code (code_version by default) are ignored
+class RunCache(object):
+    def __init__(self, file_name=None, version=None):
+        self.file_name = file_name
+        self.version = code_version() if version == None else version
+        self.results = {}
+        if file_name != None and os.path.exists(file_name):
+            with open(file_name) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        if entry['version'] != self.version:
+                            continue
+                        key = self.key(entry['function'], entry['parameters'], entry['optimum_fitness'], entry['seed'], entry['max_iteration'], entry['engine'])
+                        self.results[key] = (entry['iteration'], entry['fitness'], entry['evaluations'])
+                    except (ValueError, KeyError):
+                        # Last line of an interrupted sweep, or a run cached without its full parameters, its evaluations or the version of its code
+                        continue
+
+    def key(self, function_name, parameters, optimum_fitness, seed, max_iteration, engine):
+        return (function_name, config_key(parameters), optimum_fitness, seed, max_iteration, engine, self.version)
+
+    def get(self, function_name, parameters, optimum_fitness, seed, max_iteration, engine):
+        return self.results.get(self.key(function_name, parameters, optimum_fitness, seed, max_iteration, engine))
+
+    def put(self, function_name, parameters, optimum_fitness, seed, max_iteration, engine, result):
+        self.results[self.key(function_name, parameters, optimum_fitness, seed, max_iteration, engine)] = result
+        if self.file_name != None:
+            with open(self.file_name, 'a') as f:
+                f.write(json.dumps({'function': function_name, 'parameters': parameters, 'optimum_fitness': optimum_fitness, 'seed': seed,
+                                    'max_iteration': max_iteration, 'engine': engine, 'version': self.version,
+                                    'iteration': result[0], 'fitness': result[1], 'evaluations': result[2]}) + "\n")
+
+    def __len__(self):
+        return len(self.results)
+
+
+class Sweep(object):
+    # benchmark is a (function_name, test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness) tuple of testing.benchmark_list,
+    # its bees_parameters provide the values of the parameters which are not swept
+    def __init__(self, benchmark, n_runs=testing.n_runs, max_iteration=5000, metric='evaluations', strategy='race', rung_runs=10, eta=3,
+                 cache_file=None, n_workers=None, seed=0, ba_class=enhancedBA.EnhancedBA):
+        if strategy not in ('race', 'halving'):
+            raise ValueError("The strategy should be 'race' or 'halving'")
+        if metric not in ('evaluations', 'iterations'):
+            raise ValueError("The metric should be 'evaluations' or 'iterations'")
+        if rung_runs < 2 or rung_runs > n_runs:
+            raise ValueError("The number of runs per rung should be between 2 and the number of runs")
+        if eta < 2:
+            raise ValueError("eta should be greater than or equal to 2")
+        self.function_name, self.test_function, self.lower_bound, self.upper_bound, self.bees_parameters, self.optimum_fitness = benchmark
+        self.n_runs = n_runs
+        self.max_iteration = max_iteration
+        self.metric = metric
+        self.strategy = strategy
+        self.rung_runs = rung_runs
+        self.eta = eta
+        self.cache = RunCache(cache_file)
+        self.n_workers = n_workers
+        self.ba_class = ba_class
+        self.seeds = testing.run_seeds(seed, self.function_name, n_runs)
+        # Runs executed (not found in the cache) and configurations stopped early
+        self.n_executed = 0
+        self.stopped = []
+
+    def parameters(self, config):
+        parameters = dict(self.bees_parameters)
+        parameters.update(config)
+        return parameters
+
+    # Results of the first n runs of every configuration, the runs missing from the cache are executed in parallel
+    def run(self, configs, n, executor):
+        engine = self.ba_class.__name__
+        futures = {}
+        for index, config in enumerate(configs):
+            parameters = self.parameters(config)
+            for seed in self.seeds[:n]:
+                if self.cache.get(self.function_name, parameters, self.optimum_fitness, seed, self.max_iteration, engine) == None:
+                    future = executor.submit(testing.single_run, self.test_function, self.lower_bound, self.upper_bound, parameters,
+                                             self.optimum_fitness, seed, self.ba_class, self.max_iteration, True)
+                    futures[future] = (parameters, seed)
+        for future in as_completed(futures):
+            parameters, seed = futures[future]
+            self.cache.put(self.function_name, parameters, self.optimum_fitness, seed, self.max_iteration, engine, tuple(future.result()))
+            self.n_executed += 1
+        return [[self.cache.get(self.function_name, self.parameters(config), self.optimum_fitness, seed, self.max_iteration, engine) for seed in self.seeds[:n]]
+                for config in configs]
+
+    # Configurations whose cost is clearly worse than the cost of the best configuration
+    def losing(self, configs, results):
+        statistics = [mean_and_error(run_costs(r, self.metric)) for r in results]
+        bestMean, bestError = min(statistics)
+        return [mean - 2 * error > bestMean + 2 * bestError for mean, error in statistics]
+
+    # Run the sweep, returns one row per configuration which completed all its runs (the columns of testing.write_csv),
+    # sorted by increasing mean cost
+    def search(self, configs):
+        configs = [config for config in configs if valid(self.parameters(config))]
+        if len(configs) == 0:
+            raise ValueError("No valid configuration to run")
+        self.stopped = []
+        n = self.rung_runs
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            while True:
+                results = self.run(configs, n, executor)
+                if n >= self.n_runs or len(configs) == 1:
+                    break
+                if self.strategy == 'race':
+                    keep = [not lose for lose in self.losing(configs, results)]
+                    n = min(n + self.rung_runs, self.n_runs)
+                else:
+                    means = [mean_and_error(run_costs(r, self.metric))[0] for r in results]
+                    ranks = sorted(range(len(configs)), key=lambda i: means[i])
+                    kept = set(ranks[:max(1, len(configs) // self.eta)])
+                    keep = [i in kept for i in range(len(configs))]
+                    n = min(n * self.eta, self.n_runs)
+                self.stopped += [(config, len(r)) for config, r, k in zip(configs, results, keep) if not k]
+                configs = [config for config, k in zip(configs, keep) if k]
+            # The last survivor of the successive halving still runs all the runs
+            if n < self.n_runs:
+                results = self.run(configs, self.n_runs, executor)
+        rows = []
+        for config, r in sorted(zip(configs, results), key=lambda item: mean_and_error(run_costs(item[1], self.metric))[0]):
+            rows.append(testing.summarise_runs(self.label(config), self.parameters(config), r, verbose=False))
+        return rows
+
+    # The csv has no column for sf, so a swept sf is part of the benchmark name
+    def label(self, config):
+        if 'sf' in config:
+            return self.function_name + " sf=" + str(config['sf'])
+        return self.function_name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel sweep of the parameters of the enhanced bees algorithm on a benchmark of testing.py")
+    parser.add_argument("--function", default="Ackley(10D)", help="name of the benchmark in testing.benchmark_list()")
+    parser.add_argument("--search", choices=['grid', 'random'], default='random')
+    parser.add_argument("--configs", type=int, default=30, help="number of random configurations")
+    parser.add_argument("--strategy", choices=['race', 'halving'], default='halving')
+    parser.add_argument("--metric", choices=['evaluations', 'iterations'], default='evaluations')
+    parser.add_argument("--runs", type=int, default=testing.n_runs)
+    parser.add_argument("--rung-runs", type=int, default=10)
+    parser.add_argument("--max-iteration", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default="sweep_cache.jsonl")
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+
+    benchmarks = {benchmark[0]: benchmark for benchmark in testing.benchmark_list()}
+    if args.function not in benchmarks:
+        raise ValueError("Unknown benchmark " + args.function + ", choose among " + ", ".join(benchmarks))
+    space = {'ns': [20, 30, 40], 'nb': [4, 6, 8, 10], 'nr': [20, 40, 80, 120], 'stlim': [5, 10, 15], 'sf': [0.1, 0.2, 0.3]}
+    configs = grid(space) if args.search == 'grid' else random_configs(space, args.configs)
+    s = Sweep(benchmarks[args.function], n_runs=args.runs, max_iteration=args.max_iteration, metric=args.metric, strategy=args.strategy,
+              rung_runs=args.rung_runs, cache_file=args.cache, n_workers=args.workers)
+    rows = s.search(configs)
+    print(str(len(configs)) + " configurations, " + str(len(s.stopped)) + " stopped early, " + str(s.n_executed) + " runs executed, " +
+          str(len(s.cache)) + " runs in the cache")
+    for row in rows:
+        print(row)
+    testing.write_csv(args.output, rows)
@@ -18,14 +18,21 @@ List of selected benchmark functions:
 af means average ﬁtness, sdf means means standard deviation of ﬁtness
 ai means average iterations, sdi means standard deviation of iterations
 
+The independent runs of all benchmarks can be spread over every core with
+test_on_functions_parallel. Each run is seeded from (seed, benchmark, run index),
+so the results are reproducible whatever the number of workers.
+
 Requirements:
+  - numpy
   - pandas
 Python:
   - 3.7.7
 """
 
 import math
-import pandas as pd
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import enhancedBA
 
 Ackley_bees_parameters = {'ns':30, 'nb':8, 'nr':80, 'stlim':5}
@@ -39,29 +46,88 @@ MartinGaddy_bees_parameters = {'ns':30, 'nb':8, 'nr':100, 'stlim':10}
 
 robustness_test =  {'ns':35, 'nb':8, 'nr':80, 'stlim':10}
 
-def test_on_function(function_name, test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness, ba_class=enhancedBA.EnhancedBA):
-    n_runs = 50
+n_runs = 50
+
+# Seeds of the independent runs of one benchmark, derived only from the base seed, the benchmark name and the run index
+def run_seeds(seed, function_name, n_runs):
+    sequence = np.random.SeedSequence([seed, zlib.crc32(function_name.encode())])
+    return [int(child.generate_state(1)[0]) for child in sequence.spawn(n_runs)]
+
+# Perform one independent run, with the random stream of the instance seeded from seed (fresh entropy when None)
+# bees_parameters holds the keyword arguments of the constructor (ns, nb, nr, stlim and optionally sf)
+# With count_evaluations, the number of fitness evaluations of the run (n_evaluations) is returned after the iterations and the fitness
+def single_run(test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness, seed=None, ba_class=enhancedBA.EnhancedBA, max_iteration=5000,
+               count_evaluations=False):
+    a = ba_class(test_function, lower_bound, upper_bound, seed=seed, **bees_parameters)
+    iteration, fitness = a.stoppingCriterion(max_iteration=max_iteration, max_fitness=optimum_fitness - 0.001)
+    if count_evaluations:
+        return iteration, fitness, a.n_evaluations
+    return iteration, fitness
+
+def _single_run_task(task):
+    return single_run(*task)
+
+def test_on_function(function_name, test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness, ba_class=enhancedBA.EnhancedBA, seed=None):
     results=[]
+    seeds = run_seeds(seed, function_name, n_runs) if seed is not None else [None] * n_runs
     print("Run\tIteration\tFitness")
     print("="*30)
     
     for i in range(n_runs):
-        a = ba_class(test_function, lower_bound, upper_bound, ns=bees_parameters['ns'], nb=bees_parameters['nb'], nr=bees_parameters['nr'], stlim=bees_parameters['stlim'])
-        iteration, fitness = a.stoppingCriterion(max_iteration=5000, max_fitness=optimum_fitness - 0.001)
+        iteration, fitness = single_run(test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness, seeds[i], ba_class)
         results += [(iteration, fitness)]
         if i % 5 == 0:
             print(str(i) + '\t' + str(iteration) + '\t' + str(fitness))
 
+    return summarise_runs(function_name, bees_parameters, results)
+
+# The n_runs independent runs of one benchmark as colonies of a single batchedBA.BatchedEnhancedBA, stepped in lockstep
+# The result is the row of test_on_function; the runs are seeded from seed, but they don't reproduce the runs of test_on_function
+def test_on_function_batched(function_name, test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness, seed=None):
+    import batchedBA
+    if seed is not None:
+        seed = run_seeds(seed, function_name, 1)[0]
+    a = batchedBA.BatchedEnhancedBA(test_function, lower_bound, upper_bound, n_colonies=n_runs, seed=seed, **bees_parameters)
+    results = a.stoppingCriterion(max_iteration=5000, max_fitness=optimum_fitness - 0.001)
+    print("Run\tIteration\tFitness")
+    print("="*30)
+    for i in range(0, n_runs, 5):
+        print(str(i) + '\t' + str(results[i][0]) + '\t' + str(results[i][1]))
+    return summarise_runs(function_name, bees_parameters, results)
+
+# Run the independent runs of several benchmarks on a pool of processes
+# benchmarks is a list of (function_name, test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness)
+# and one result row (as returned by test_on_function) is returned for each of them
+def test_on_functions_parallel(benchmarks, ba_class=enhancedBA.EnhancedBA, seed=0, n_workers=None):
+    tasks = []
+    for function_name, test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness in benchmarks:
+        tasks += [(test_function, lower_bound, upper_bound, bees_parameters, optimum_fitness, s, ba_class) for s in run_seeds(seed, function_name, n_runs)]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(_single_run_task, tasks))
+
+    test_results = []
+    for i, benchmark in enumerate(benchmarks):
+        print('')
+        print("Function " + benchmark[0])
+        test_results.append(summarise_runs(benchmark[0], benchmark[4], results[i * n_runs:(i + 1) * n_runs]))
+    return test_results
+
+# Aggregate the (iteration, fitness) results of the runs into a row of the csv file
+def summarise_runs(function_name, bees_parameters, results, verbose=True):
+    n_runs = len(results)
     iteration_avg = sum([float(r[0]) for r in results]) / n_runs
     sd_iteration = math.sqrt(sum([pow(r[0] - iteration_avg, 2) for r in results]) / n_runs)
     fitness_avg = sum([r[1] for r in results]) / n_runs
     sd_fitness = math.sqrt(sum([pow(r[1] - fitness_avg, 2) for r in results]) / n_runs)
-    print('')
-    print("ai: " + str(iteration_avg) + " sdi: " + str(sd_iteration))
-    print("af: " + str(fitness_avg) + " sdf: " + str(sd_fitness))
+    if verbose:
+        print('')
+        print("ai: " + str(iteration_avg) + " sdi: " + str(sd_iteration))
+        print("af: " + str(fitness_avg) + " sdf: " + str(sd_fitness))
     return [function_name, bees_parameters['stlim'], bees_parameters['ns'], bees_parameters['nb'], bees_parameters['nr'], fitness_avg, sd_fitness, iteration_avg, sd_iteration]
     
+# pandas is only imported here, so that the worker processes (which only run single_run) start faster
 def write_csv(file_name, data):
+    import pandas as pd
     df = pd.DataFrame({'Benchmark': [data[i][0] for i in range(len(data))],
                         'stlim': [data[i][1] for i in range(len(data))],
                         'ns': [data[i][2] for i in range(len(data))],
@@ -73,64 +139,25 @@ def write_csv(file_name, data):
                         'sdi': [data[i][8] for i in range(len(data))]})
     df.to_csv(file_name, index=False)
 
-if __name__ == "__main__":
+# The eight benchmarks of the testing, as accepted by test_on_functions_parallel
+def benchmark_list():
     import python_benchmark_functions.benchmark_functions as bf
-    test_results = []
+    benchmarks = []
+    for function_name, b_func, bees_parameters in [("Ackley(10D)", bf.Ackley(n_dimensions=10, opposite=True), Ackley_bees_parameters),
+                                                    ("Schaffer(2D)", bf.Schaffer(opposite=True), Schaffer_bees_parameters),
+                                                    ("Schwefel(2D)", bf.Schwefel(n_dimensions=2, opposite=True), Schwefel_bees_parameters),
+                                                    ("Easom(2D)", bf.Easom(opposite=True), Easom_bees_parameters),
+                                                    ("Goldstein And Price(2D)", bf.GoldsteinAndPrice(opposite=True), GoldsteinAndPrice_bees_parameters),
+                                                    ("Rastrigin(10D)", bf.Rastrigin(n_dimensions=10, opposite=True), Rastrigin_bees_parameters),
+                                                    ("Hypersphere(10D)", bf.Hypersphere(n_dimensions=10, opposite=True), Hypersphere_bees_parameters),
+                                                    ("Martin and Gaddy(2D)", bf.MartinGaddy(opposite=True), MartinGaddy_bees_parameters)]:
+        lb, ub = b_func.getSuggestedBounds()
+        benchmarks.append((function_name, b_func, lb, ub, bees_parameters, b_func.getMaximum()[0]))
+    return benchmarks
 
-    print("Function Ackley")
-    b_func = bf.Ackley(n_dimensions=10,opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_ackley = test_on_function("Ackley(10D)", b_func, lb, ub, Ackley_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_ackley)
-
-    print('')
-    print("Function Schaffer")
-    b_func = bf.Schaffer(opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_schaffer = test_on_function("Schaffer(2D)", b_func, lb, ub, Schaffer_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_schaffer)
-
-    print('')
-    print("Function Schwefel")
-    b_func = bf.Schwefel(n_dimensions=2,opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_schwefel = test_on_function("Schwefel(2D)", b_func, lb, ub, Schwefel_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_schwefel)
-
-    print('')
-    print("Function Easom")
-    b_func = bf.Easom(opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_easom = test_on_function("Easom(2D)", b_func, lb, ub, Easom_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_easom)
-    
-    print('')
-    print("Function Goldstein and Price")
-    b_func = bf.GoldsteinAndPrice(opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_goldsteinandprice = test_on_function("Goldstein And Price(2D)", b_func, lb, ub, GoldsteinAndPrice_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_goldsteinandprice)
-
-    print('')
-    print("Function Rastrigin")
-    b_func = bf.Rastrigin(n_dimensions=10, opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_rastrigin = test_on_function("Rastrigin(10D)", b_func, lb, ub, Rastrigin_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_rastrigin)
-
-    print('')
-    print("Function Hypersphere")
-    b_func = bf.Hypersphere(n_dimensions=10, opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_hypersphere = test_on_function("Hypersphere(10D)", b_func, lb, ub, Hypersphere_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_hypersphere)
-
-    print('')
-    print("Function Martin and Gaddy")
-    b_func = bf.MartinGaddy(opposite=True)
-    lb, ub = b_func.getSuggestedBounds()
-    result_of_martingaddy = test_on_function("Martin and Gaddy(2D)", b_func, lb, ub, MartinGaddy_bees_parameters, b_func.getMaximum()[0])
-    test_results.append(result_of_martingaddy)
+if __name__ == "__main__":
+    # To run the benchmarks one after another in this process, use test_on_function on each of them instead
+    test_results = test_on_functions_parallel(benchmark_list())
 
     write_csv("test.csv", test_results)
 
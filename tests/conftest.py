@@ -0,0 +1,12 @@
+"""
+MSc Project
+Regression tests of the enhanced bees algorithm
+The modules of the project are imported from the root of the repository, as in
+the benchmarks: python -m pytest tests
+Author: Heng Zhai
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+"""
+MSc Project
+Regression tests of the benchmark functions: the batched and incremental
+evaluations give the values of the point-wise calls, and the memoized optima
+follow the changes of functions_info
+Author: Heng Zhai
+"""
+
+import copy
+import numpy as np
+import pytest
+import python_benchmark_functions.benchmark_functions as bf
+
+functions = [bf.Ackley(n_dimensions=10), bf.Schaffer(), bf.Schwefel(n_dimensions=10), bf.Easom(), bf.GoldsteinAndPrice(),
+             bf.Rastrigin(n_dimensions=10), bf.Hypersphere(n_dimensions=10), bf.MartinGaddy(),
+             bf.Ackley(n_dimensions=3, opposite=True), bf.Rastrigin(n_dimensions=3, opposite=True)]
+
+def name(function):
+    return function.name + str(function.n_dimensions) + ("-" if function.opposite else "")
+
+def random_points(function, n, seed=0):
+    lb, ub = function.getSuggestedBounds()
+    return np.random.default_rng(seed).uniform(lb, ub, size=(n, function.n_dimensions))
+
+@pytest.mark.parametrize('function', functions, ids=name)
+def test_evaluate_batch_matches_call(function):
+    points = random_points(function, 50)
+    expected = [function(p) for p in points.tolist()]
+    np.testing.assert_allclose(function.evaluate_batch(points), expected, rtol=1e-12, atol=1e-12)
+
+def test_optima_follow_functions_info():
+    function = bf.Hypersphere(n_dimensions=3)
+    minima = function.getMinima()
+    config = copy.deepcopy(bf.functions_info.config)
+    try:
+        bf.functions_info.add_optimum('Hypersphere', 3.0, [1.0, 1.0, 1.0])
+        assert [1.0, 1.0, 1.0] in [position for value, position in function.getMinima()]
+        assert len(function.getMinima()) == len(minima) + 1
+    finally:
+        bf.functions_info.config = config
+    assert function.getMinima() == minima
+
+separable = [bf.Hypersphere(n_dimensions=50), bf.Rastrigin(n_dimensions=50), bf.Schwefel(n_dimensions=50),
+             bf.Hypersphere(n_dimensions=50, opposite=True), bf.Rastrigin(n_dimensions=50, opposite=True), bf.Schwefel(n_dimensions=50, opposite=True)]
+
+# Children of random parents where k coordinates of each row are moved
+def changed_points(function, n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    lb, ub = function.getSuggestedBounds()
+    parents = random_points(function, n, seed)
+    indices = np.argsort(rng.random((n, function.n_dimensions)), axis=1)[:, :k]
+    new = rng.uniform(lb[0], ub[0], size=(n, k))
+    children = parents.copy()
+    np.put_along_axis(children, indices, new, axis=1)
+    return parents, children, indices, new
+
+@pytest.mark.parametrize('function', separable, ids=name)
+def test_evaluate_changes_matches_full_evaluation(function):
+    parents, children, indices, new = changed_points(function, 100, 3)
+    old = np.take_along_axis(parents, indices, axis=1)
+    values = function.evaluate_changes(function.evaluate_batch(parents), indices, old, new)
+    np.testing.assert_allclose(values, function.evaluate_batch(children), rtol=1e-9, atol=1e-9)
+
+@pytest.mark.parametrize('function', separable, ids=name)
+def test_evaluate_delta_matches_full_evaluation(function):
+    parents, children, indices, new = changed_points(function, 20, 3)
+    for parent, child, changed, values in zip(parents.tolist(), children.tolist(), indices.tolist(), new.tolist()):
+        terms = function.terms(parent)
+        assert sum(terms) == pytest.approx(function(parent), rel=1e-12, abs=1e-9)
+        value, newTerms = function.evaluate_delta(function(parent), terms, changed, values)
+        assert value == pytest.approx(function(child), rel=1e-9, abs=1e-9)
+        np.testing.assert_allclose(newTerms, [function.terms(child)[i] for i in changed], rtol=1e-12, atol=1e-12)
@@ -0,0 +1,53 @@
+"""
+MSc Project
+Regression tests of the checkpoints: a run resumed from a checkpoint is
+bit-identical to the uninterrupted run (whatever its seed), with the options
+restored from the checkpoint (allocation policy, n_perturbed) and the
+stagnation count
+Author: Heng Zhai
+"""
+
+import pytest
+import enhancedBA
+import recruitment
+import vectorizedBA
+import python_benchmark_functions.benchmark_functions as bf
+
+engines = [enhancedBA.EnhancedBA, vectorizedBA.VectorizedEnhancedBA]
+
+options = [{}, {'allocation': recruitment.RankProportionalAllocation()}, {'n_perturbed': 3}]
+
+def state(a):
+    return (a.record, a.bestSolution.position, a.bestSolution.fitness, [(s.position, s.fitness, s.shrinkTimes, s.patchSize) for s in a.currentSites],
+            a.n_evaluations, a.stagnation, a.lastBestFitness)
+
+@pytest.mark.parametrize('ba_class', engines, ids=lambda c: c.__name__)
+@pytest.mark.parametrize('option', options, ids=lambda o: ','.join(o) or 'default')
+def test_resume_is_bit_identical(tmp_path, ba_class, option):
+    file_name = str(tmp_path / "checkpoint")
+    function = bf.Rastrigin(n_dimensions=10, opposite=True)
+    lb, ub = function.getSuggestedBounds()
+    a = ba_class(function, lb, ub, ns=10, nb=4, nr=20, stlim=3, **option)
+    a.stoppingCriterion(max_iteration=15, checkpoint_file=file_name)
+    a.stoppingCriterion(max_iteration=15)
+    # Only the fitness function is passed again, the options come from the checkpoint
+    b = ba_class.fromCheckpoint(file_name, function)
+    assert type(b.allocation) == type(a.allocation)
+    assert b.n_perturbed == a.n_perturbed
+    b.stoppingCriterion(max_iteration=15)
+    assert state(b) == state(a)
+
+# A flat function never improves, so the stagnation count is the number of iterations
+def flat(point):
+    return 0.0
+
+@pytest.mark.parametrize('ba_class', engines, ids=lambda c: c.__name__)
+def test_stagnation_continues_after_resume(tmp_path, ba_class):
+    file_name = str(tmp_path / "checkpoint")
+    a = ba_class(flat, [-1.0] * 2, [1.0] * 2, ns=10, nb=4, nr=20, stlim=3)
+    a.stoppingCriterion(max_iteration=10, checkpoint_file=file_name)
+    assert a.stoppingCriterion(max_stagnation=15)[0] == 5
+    b = ba_class.fromCheckpoint(file_name, flat)
+    assert b.stagnation == 10
+    assert b.stoppingCriterion(max_stagnation=15)[0] == 5
+    assert b.stoppingReason == a.stoppingReason == 'max_stagnation'
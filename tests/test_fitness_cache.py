@@ -0,0 +1,66 @@
+"""
+MSc Project
+Regression tests of the fitness cache: bounded least recently used eviction
+and batches evaluating every missing point once
+Author: Heng Zhai
+"""
+
+import evaluators
+import fitness_cache
+
+# Fitness function recording the points it is called on
+class Recorder(object):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, point):
+        self.calls.append(tuple(point))
+        return sum(point)
+
+def test_least_recently_used_point_is_evicted():
+    function = Recorder()
+    cache = fitness_cache.FitnessCache(function, maxsize=2)
+    cache([1.0])
+    cache([2.0])
+    # [1.0] becomes the most recently used point, so [2.0] is evicted by [3.0]
+    assert cache([1.0]) == 1.0
+    cache([3.0])
+    assert list(cache.entries) == [(1.0,), (3.0,)]
+    cache([2.0])
+    assert function.calls == [(1.0,), (2.0,), (3.0,), (2.0,)]
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert len(cache.entries) == 2
+
+def test_evaluate_many_evaluates_missing_points_once():
+    function = Recorder()
+    cache = fitness_cache.FitnessCache(function, maxsize=3)
+    cache([1.0])
+    batches = []
+    def evaluate(points):
+        batches.append(points)
+        return [function(p) for p in points]
+    values = cache.evaluate_many([[1.0], [2.0], [2.0], [3.0], [4.0]], evaluate)
+    assert values == [1.0, 2.0, 2.0, 3.0, 4.0]
+    assert batches == [[[2.0], [3.0], [4.0]]]
+    assert list(cache.entries) == [(2.0,), (3.0,), (4.0,)]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+def test_quantized_points_share_their_fitness():
+    function = Recorder()
+    cache = fitness_cache.FitnessCache(function, decimals=1)
+    assert cache([1.01, 2.0]) == cache([0.99, 2.02])
+    assert len(function.calls) == 1
+
+def test_submitted_points_use_the_cache():
+    function = Recorder()
+    cache = fitness_cache.FitnessCache(function)
+    cache([1.0])
+    with evaluators.ThreadPoolEvaluator(max_workers=2) as evaluator:
+        future = evaluator.submit(cache, [1.0])
+        assert future.done()
+        assert evaluator.result(cache, [1.0], future) == 1.0
+        future = evaluator.submit(cache, [2.0])
+        assert evaluator.result(cache, [2.0], future) == 2.0
+    assert (2.0,) in cache.entries
+    assert function.calls == [(1.0,), (2.0,)]
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,40 @@
+"""
+MSc Project
+Regression tests of the allocation policies of the waggle dance: the counts
+of recruits follow the multinomial distribution of the probabilities of each
+policy, and the tournament policy reproduces the two-site tournament
+Author: Heng Zhai
+"""
+
+import numpy as np
+import pytest
+import recruitment
+
+fitness = np.array([10.0, 8.0, 5.0, 4.0, 4.0, 1.0])
+
+@pytest.mark.parametrize('name', sorted(recruitment.policies))
+def test_counts_follow_the_probabilities(name):
+    policy = recruitment.policies[name]()
+    probabilities = policy.probabilities(fitness)
+    assert probabilities.sum() == pytest.approx(1.0)
+    rng = np.random.default_rng(0)
+    nr = 50
+    n_draws = 20000
+    counts = np.array([policy.allocate(fitness, nr, rng) for _ in range(n_draws)])
+    assert (counts.sum(axis=1) == nr).all()
+    # Mean and variance of the multinomial counts, within five standard errors
+    error = np.sqrt(nr * probabilities * (1 - probabilities) / n_draws)
+    assert np.all(np.abs(counts.mean(axis=0) - nr * probabilities) <= 5 * error + 1e-12)
+    np.testing.assert_allclose(counts.var(axis=0), nr * probabilities * (1 - probabilities), rtol=0.1, atol=1e-12)
+
+def test_tournament_probabilities():
+    nb = len(fitness)
+    rng = np.random.default_rng(1)
+    n_recruits = 200000
+    # Every recruit picks two distinct sites and follows the better ranked one
+    first = rng.integers(nb, size=n_recruits)
+    second = (first + rng.integers(1, nb, size=n_recruits)) % nb
+    frequencies = np.bincount(np.minimum(first, second), minlength=nb) / n_recruits
+    probabilities = recruitment.TournamentAllocation().probabilities(fitness)
+    assert probabilities[-1] == 0
+    np.testing.assert_allclose(frequencies, probabilities, atol=5 * np.sqrt(0.25 / n_recruits))
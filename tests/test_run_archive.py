@@ -0,0 +1,56 @@
+"""
+MSc Project
+Regression tests of the run archive: the rows written (through several
+flushes) are read back unchanged, and the archive of a run holds its evaluations
+Author: Heng Zhai
+"""
+
+import os
+import numpy as np
+import enhancedBA
+import run_archive
+import python_benchmark_functions.benchmark_functions as bf
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "archive")
+    rng = np.random.default_rng(0)
+    rows = []
+    with run_archive.RunArchiveWriter(path, 3, buffer_size=7) as writer:
+        for iteration in range(5):
+            positions = rng.normal(size=(4, 3))
+            fitness = rng.normal(size=4)
+            writer.append(iteration, [0, 1, 1, -1], [run_archive.RECRUIT] * 3 + [run_archive.SCOUT], positions, fitness)
+            rows.append((positions, fitness))
+    archive = run_archive.RunArchive(path)
+    assert len(archive) == 20
+    assert archive.n_iterations() == 4
+    np.testing.assert_array_equal(archive['position'], np.concatenate([positions for positions, fitness in rows]))
+    np.testing.assert_array_equal(archive['fitness'], np.concatenate([fitness for positions, fitness in rows]))
+    selected = archive.select(2, 4, role=run_archive.RECRUIT, site=1)
+    np.testing.assert_array_equal(selected['iteration'], [2, 2, 3, 3])
+    np.testing.assert_array_equal(selected['position'], np.concatenate([rows[2][0][1:3], rows[3][0][1:3]]))
+
+def test_append_after_truncation(tmp_path):
+    path = str(tmp_path / "archive")
+    with run_archive.RunArchiveWriter(path, 2) as writer:
+        for iteration in range(4):
+            writer.append(iteration, -1, run_archive.SCOUT, np.full((3, 2), iteration), np.full(3, iteration))
+    writer = run_archive.RunArchiveWriter(path, 2, append=True)
+    writer.truncate_after(1)
+    writer.append(2, -1, run_archive.SCOUT, np.full((1, 2), 9.0), [9.0])
+    writer.close()
+    archive = run_archive.RunArchive(path)
+    np.testing.assert_array_equal(archive['iteration'], [0, 0, 0, 1, 1, 1, 2])
+    np.testing.assert_array_equal(archive['fitness'], [0, 0, 0, 1, 1, 1, 9])
+
+def test_archive_of_a_run(tmp_path):
+    path = str(tmp_path / "archive")
+    function = bf.Rastrigin(n_dimensions=3, opposite=True)
+    lb, ub = function.getSuggestedBounds()
+    with run_archive.RunArchiveWriter(path, 3) as writer:
+        a = enhancedBA.EnhancedBA(function, lb, ub, ns=10, nb=4, nr=20, stlim=5, archive=writer)
+        a.stoppingCriterion(max_iteration=10)
+    archive = run_archive.RunArchive(path)
+    assert len(archive) == a.n_evaluations
+    np.testing.assert_array_equal(archive.best_fitness()[1:], a.record)
+    assert os.path.exists(os.path.join(path, "meta.json"))
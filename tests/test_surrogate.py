@@ -0,0 +1,36 @@
+"""
+MSc Project
+Regression tests of the surrogate: the chunked predictions of the KNN
+surrogate are the ones of the exact pairwise distances, also far from the origin
+Author: Heng Zhai
+"""
+
+import numpy as np
+import pytest
+import surrogate
+
+# Prediction from the full matrix of the exact distances (the first implementation of predict)
+def exact_predict(model, positions):
+    positions = np.asarray(positions, dtype=float)
+    distances = np.sqrt(((positions[:, None, :] - model.points[None, :, :]) ** 2).sum(axis=2))
+    nearest = np.argpartition(distances, model.k - 1, axis=1)[:, :model.k]
+    d = np.take_along_axis(distances, nearest, axis=1)
+    weights = 1.0 / np.maximum(d, 1e-12)
+    return (weights * model.values[nearest]).sum(axis=1) / weights.sum(axis=1)
+
+@pytest.mark.parametrize('offset', [0.0, 1e4, 1e6])
+def test_predict_matches_exact_distances(offset):
+    rng = np.random.default_rng(0)
+    model = surrogate.KNNSurrogate(k=5, max_points=1000)
+    model.observe(offset + rng.uniform(-1, 1, size=(1000, 10)), rng.normal(size=1000))
+    candidates = offset + rng.uniform(-1, 1, size=(600, 10))
+    np.testing.assert_allclose(model.predict(candidates, chunk_size=128), exact_predict(model, candidates), rtol=1e-12, atol=1e-12)
+
+def test_predict_on_training_points():
+    rng = np.random.default_rng(1)
+    model = surrogate.KNNSurrogate(k=3)
+    points = rng.uniform(-5, 5, size=(50, 4))
+    values = rng.normal(size=50)
+    model.observe(points, values)
+    # A candidate on a training point gets (almost) its value
+    np.testing.assert_allclose(model.predict(points), values, atol=1e-9)
@@ -0,0 +1,28 @@
+"""
+MSc Project
+Regression tests of the sweep: the cost of a run is the number of evaluations
+it used, and the cached runs are only served to the same version of the code
+Author: Heng Zhai
+"""
+
+import sweep
+import testing
+import python_benchmark_functions.benchmark_functions as bf
+
+def test_runs_cost_their_evaluations():
+    function = bf.Easom(opposite=True)
+    lb, ub = function.getSuggestedBounds()
+    parameters = {'ns': 10, 'nb': 4, 'nr': 20, 'stlim': 5}
+    iteration, fitness, n_evaluations = testing.single_run(function, lb, ub, parameters, 1.0, 3, max_iteration=20, count_evaluations=True)
+    assert (iteration, fitness) == testing.single_run(function, lb, ub, parameters, 1.0, 3, max_iteration=20)
+    assert sweep.run_costs([(iteration, fitness, n_evaluations)], 'evaluations') == [float(n_evaluations)]
+    assert sweep.run_costs([(iteration, fitness, n_evaluations)], 'iterations') == [float(iteration)]
+
+def test_cache_is_keyed_on_the_code_version(tmp_path):
+    file_name = str(tmp_path / "cache.jsonl")
+    parameters = {'ns': 10, 'nb': 4, 'nr': 20, 'stlim': 5}
+    cache = sweep.RunCache(file_name, version=1)
+    cache.put("Easom(2D)", parameters, 1.0, 3, 20, 'EnhancedBA', (12, 0.99, 274))
+    assert sweep.RunCache(file_name, version=1).get("Easom(2D)", parameters, 1.0, 3, 20, 'EnhancedBA') == (12, 0.99, 274)
+    assert sweep.RunCache(file_name, version=2).get("Easom(2D)", parameters, 1.0, 3, 20, 'EnhancedBA') == None
+    assert sweep.RunCache(file_name).version == sweep.code_version()
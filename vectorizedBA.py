@@ -0,0 +1,313 @@
+"""
+MSc Project
+Vectorized enhanced bees algorithm
+The whole population (current sites, patch sizes, shrink counters and the
+recruits of an iteration) is stored in contiguous numpy arrays, so that sampling,
+boundary clipping and selection are done in batched operations instead of one
+Bee object per scout or recruit
+Author: Heng Zhai
+"""
+
+import numpy as np
+import enhancedBA
+import spatial_index as spatial
+import run_archive
+
+class Site(object):
+    __slots__ = ('position', 'fitness', 'shrinkTimes', 'patchSize')
+
+    def __init__(self, position, fitness, shrinkTimes=0, patchSize=None):
+        self.position = position
+        self.fitness = fitness
+        self.shrinkTimes = shrinkTimes
+        self.patchSize = patchSize
+
+    # Use this method to complete the comparison between Site objects
+    def __lt__(self, other):
+        return self.fitness < other.fitness
+
+    def __str__(self):
+        return "Site{" + "fitness: " + str(self.fitness)+", position: "+str(self.position) + "}"
+
+
+class VectorizedEnhancedBA(enhancedBA.EnhancedBA):
+    def __init__(self, fitnessFunction, lowerBoundaries, upperBoundaries, ngh=None, ns=35, nb=8, nr=80, sf=.2, stlim=10, evaluator=None, initialise=True, allocation=None,
+                 surrogate=None, screening_ratio=0.25, spatial_index=None, archive=None, profiler=None, controller=None, n_perturbed=None, seed=None):
+        self.lowerArray = np.asarray(lowerBoundaries, dtype=float)
+        self.upperArray = np.asarray(upperBoundaries, dtype=float)
+        self.centreArray = (self.upperArray + self.lowerArray) / 2.0
+        self.middleArray = (self.upperArray - self.lowerArray) / 2.0
+        self.nghArray = np.ones(len(lowerBoundaries)) if ngh is None else np.asarray(ngh, dtype=float)
+        super().__init__(fitnessFunction, lowerBoundaries, upperBoundaries, ngh=ngh, ns=ns, nb=nb, nr=nr, sf=sf, stlim=stlim, evaluator=evaluator, initialise=initialise, allocation=allocation,
+                         surrogate=surrogate, screening_ratio=screening_ratio, spatial_index=spatial_index, archive=archive, profiler=profiler, controller=controller, n_perturbed=n_perturbed, seed=seed)
+
+    # The numpy generator of the random stream of the instance (see random_streams.py), saved with the rest of the state
+    @property
+    def rng(self):
+        return self.stream.generator
+
+    # The current sites are kept as arrays, this view builds Site objects on demand
+    @property
+    def currentSites(self):
+        if not hasattr(self, 'sitePositions'):
+            return []
+        return [self.getSite(i) for i in range(len(self.siteFitness))]
+
+    @currentSites.setter
+    def currentSites(self, sites):
+        n_dimensions = len(self.lowerBoundaries)
+        self.sitePositions = np.array([s.position for s in sites], dtype=float).reshape(len(sites), n_dimensions)
+        self.siteFitness = np.array([s.fitness for s in sites], dtype=float)
+        self.sitePatches = np.array([s.patchSize for s in sites], dtype=float).reshape(len(sites), n_dimensions)
+        self.siteShrinks = np.array([s.shrinkTimes for s in sites], dtype=int)
+
+    def getSite(self, index):
+        return Site(self.sitePositions[index].tolist(), float(self.siteFitness[index]), int(self.siteShrinks[index]), self.sitePatches[index].tolist())
+
+    def initialise_solution(self):
+        positions = self.sample(np.broadcast_to(self.centreArray, (self.ns, len(self.centreArray))), 1.0)
+        fitness = self.evaluate(positions)
+        if self.archive != None:
+            self.archive.append(0, -1, run_archive.SCOUT, positions, fitness)
+        patches = np.tile(self.nghArray, (self.ns, 1))
+        shrinks = np.zeros(self.ns, dtype=int)
+        self.selectSites(positions, fitness, patches, shrinks)
+        self.bestSolution = self.getSite(0)
+
+    # Sample one bee per row in the hyper box around centres, scaled by the patch sizes, and clip it to the boundaries
+    def sample(self, centres, patchSizes):
+        positions = self.rng.uniform(-1.0, 1.0, size=centres.shape)
+        positions *= self.middleArray
+        positions *= patchSizes
+        positions += centres
+        return np.clip(positions, self.lowerArray, self.upperArray, out=positions)
+
+    # High-dimensional mode: the recruits of the sites which are not abandoned copy their site and sample n_perturbed distinct
+    # coordinates in its patch, the recruits of abandoned sites and the global scouts are sampled over the whole search space
+    # Returns the positions (recruits first) and the changes (rows, fitness of their sites, indices, old and new values) of the moved coordinates
+    def sampleSubsets(self, counts, abandoned, n_scouts):
+        n_dimensions = len(self.centreArray)
+        siteIds = np.repeat(np.arange(len(counts)), counts)
+        positions = self.sitePositions[siteIds]
+        rows = np.flatnonzero(~abandoned[siteIds])
+        scoutRows = np.flatnonzero(abandoned[siteIds])
+        positions[scoutRows] = self.sample(np.broadcast_to(self.centreArray, (len(scoutRows), n_dimensions)), 1.0)
+        sites = siteIds[rows][:, None]
+        indices = self.distinctIndices(len(rows), self.n_perturbed, n_dimensions)
+        old = self.sitePositions[sites, indices]
+        new = self.rng.uniform(-1.0, 1.0, size=old.shape)
+        new *= self.middleArray[indices]
+        new *= self.sitePatches[sites, indices]
+        new += old
+        np.clip(new, self.lowerArray[indices], self.upperArray[indices], out=new)
+        positions[rows[:, None], indices] = new
+        positions = np.concatenate((positions, self.sample(np.broadcast_to(self.centreArray, (n_scouts, n_dimensions)), 1.0)))
+        return positions, (rows, self.siteFitness[siteIds[rows]], indices, old, new)
+
+    # n rows of k distinct coordinate indices: drawn with repetition and drawn again for the (rare) rows with a repeated index,
+    # or taken from random permutations when k is a large fraction of the dimensions
+    def distinctIndices(self, n, k, n_dimensions):
+        if 4 * k > n_dimensions:
+            return np.argsort(self.rng.random((n, n_dimensions)), axis=1)[:, :k]
+        indices = self.rng.integers(0, n_dimensions, size=(n, k))
+        while k > 1:
+            ordered = np.sort(indices, axis=1)
+            repeated = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+            if len(repeated) == 0:
+                break
+            indices[repeated] = self.rng.integers(0, n_dimensions, size=(len(repeated), k))
+        return indices
+
+    # Evaluate every row of positions as one batch with the evaluator
+    # With changes (see sampleSubsets) and a separable fitness function, the rows of the changes are evaluated incrementally
+    # from the fitness of their site and the few coordinates they changed (see BenchmarkFunction.evaluate_changes)
+    def evaluate(self, positions, changes=None):
+        profiler = self.profiler
+        if profiler != None:
+            start = profiler.start()
+        self.n_evaluations += len(positions)
+        if changes == None or not self.incremental:
+            fitness = np.asarray(self.evaluatePositions(positions), dtype=float)
+        else:
+            rows, parentFitness, indices, old, new = changes
+            fitness = np.empty(len(positions))
+            fitness[rows] = self.fitnessFunction.evaluate_changes(parentFitness, indices, old, new)
+            full = np.ones(len(positions), dtype=bool)
+            full[rows] = False
+            self.n_delta_evaluations += len(rows)
+            if full.any():
+                fitness[full] = self.evaluatePositions(positions[full])
+        if profiler != None:
+            start = profiler.stop('evaluation', start, len(positions))
+        if self.surrogate != None:
+            self.surrogate.observe(positions, fitness)
+            if profiler != None:
+                start = profiler.stop('surrogate update', start, len(positions))
+        if self.spatial_index != None:
+            self.spatial_index.insert(positions)
+            if profiler != None:
+                profiler.stop('spatial index', start, len(positions))
+        return fitness
+
+    def clipShrinkTimes(self):
+        if hasattr(self, 'siteShrinks'):
+            np.minimum(self.siteShrinks, self.stlim, out=self.siteShrinks)
+
+    # Rank the candidates in descending order (stable, like list.sort) and keep the first nb as current sites
+    # Returns the indices of the kept candidates
+    # With a spatial index, the candidates inside the region of a better candidate are only kept when there are not enough distinct ones
+    def selectSites(self, positions, fitness, patches, shrinks):
+        order = np.argsort(-fitness, kind='stable')
+        if self.spatial_index != None:
+            distinctOrder, n_duplicates = spatial.distinct(positions[order], self.spatial_index.siteHalfWidths(patches[order]))
+            order = order[distinctOrder]
+            self.spatial_index.merged += max(0, n_duplicates - max(0, self.nb - (len(order) - n_duplicates)))
+        order = order[:self.nb]
+        self.sitePositions = positions[order]
+        self.siteFitness = fitness[order]
+        self.sitePatches = patches[order]
+        self.siteShrinks = shrinks[order]
+        return order
+
+    # Number of recruits of each site, drawn at once by the allocation policy with the generator of the instance
+    def waggle_dance(self):
+        return self.allocation.allocate(self.siteFitness, self.nr, self.rng)
+
+    # Local search for all current sites at once, positions and fitness are the evaluated bees of the sites,
+    # grouped by site according to counts; the sites without recruits are left unchanged
+    def localSearch(self, counts, abandoned, positions, fitness):
+        active = counts > 0
+        bounds = np.cumsum(counts)
+        if self.keep_bees_trace:
+            self.to_save_recruits = [[Site(p, f) for p, f in zip(positions[start:end].tolist(), fitness[start:end].tolist())]
+                                     for start, end, isAbandoned in zip(bounds - counts, bounds, abandoned) if end > start and not isAbandoned]
+        if len(fitness) == 0:
+            return
+        # Best bee of every site: order by site, then by descending fitness, and take the first of each segment
+        siteIds = np.repeat(np.arange(len(counts)), counts)
+        order = np.lexsort((-fitness, siteIds))
+        best = order[np.minimum(bounds - counts, len(order) - 1)]
+        bestFitness = fitness[best]
+        abandoned = abandoned & active
+        improved = active & ~abandoned & (bestFitness > self.siteFitness)
+        replaced = abandoned | improved
+        previousShrinks = self.siteShrinks.copy()
+        self.sitePositions[replaced] = positions[best[replaced]]
+        self.siteFitness[replaced] = bestFitness[replaced]
+        self.sitePatches[abandoned] = self.nghArray
+        self.siteShrinks[replaced] = 0
+        shrunk = active & ~replaced
+        self.siteShrinks[shrunk] += 1
+        self.sitePatches[shrunk] *= (1 - self.sf)
+        if self.profiler != None:
+            self.profiler.count('abandonment', int(abandoned.sum()))
+            self.profiler.count('shrink', int(shrunk.sum()))
+        if self.controller != None:
+            for shrinkTimes in previousShrinks[improved].tolist():
+                self.controller.improved(shrinkTimes)
+            self.controller.shrunk(int(shrunk.sum()))
+            self.controller.abandoned(int(abandoned.sum()))
+
+    # Keep the ceil(screening_ratio * count) recruits of each site with the best predicted fitness,
+    # the scouts of the abandoned sites are all kept; returns the new counts and positions (still grouped by site)
+    def screenRecruits(self, counts, abandoned, positions):
+        if self.surrogate == None or not self.surrogate.isTrained() or len(positions) == 0:
+            return counts, positions
+        screened = ~abandoned & (counts > 0)
+        keptCounts = np.where(screened, np.minimum(counts, np.ceil(self.screening_ratio * counts).astype(int)), counts)
+        siteIds = np.repeat(np.arange(len(counts)), counts)
+        candidates = screened[siteIds]
+        predicted = np.zeros(len(positions))
+        predicted[candidates] = self.surrogate.predict(positions[candidates])
+        # Rank of every bee inside its site by descending predicted fitness
+        order = np.lexsort((-predicted, siteIds))
+        rank = np.empty(len(order), dtype=int)
+        rank[order] = np.arange(len(order)) - np.repeat(np.cumsum(counts) - counts, counts)
+        self.surrogate.countScreening(int(counts[screened].sum()), int(keptCounts[screened].sum()))
+        return keptCounts, positions[rank < keptCounts[siteIds]]
+
+    # Global scouts landing in an explored region are sampled again, and discarded after max_resamples tries
+    def screenScouts(self, scouts):
+        if self.spatial_index == None or len(scouts) == 0:
+            return scouts
+        for attempt in range(self.spatial_index.max_resamples + 1):
+            explored = self.spatial_index.explored(scouts, self.sitePositions, self.sitePatches)
+            n_explored = int(explored.sum())
+            if n_explored == 0:
+                break
+            self.spatial_index.rejected += n_explored
+            if attempt == self.spatial_index.max_resamples:
+                self.spatial_index.discarded += n_explored
+                return scouts[~explored]
+            scouts[explored] = self.sample(np.broadcast_to(self.centreArray, (n_explored, len(self.centreArray))), 1.0)
+        return scouts
+
+    def singleIteration(self):
+        if self.keep_bees_trace:
+            self.to_save_best_sites = self.currentSites
+            self.to_save_recruits = []
+        # Without a profiler, every phase only costs a test of self.profiler
+        profiler = self.profiler
+        if profiler != None:
+            iterationStart = start = profiler.start()
+        counts = self.waggle_dance()
+        if profiler != None:
+            start = profiler.stop('waggle dance', start)
+        abandoned = self.siteShrinks == self.stlim
+        n_local = int(counts.sum())
+        n_scouts = self.ns - self.nb
+        # The bees of all sites and the (ns - nb) global scouts are sampled and evaluated together in one batch
+        changes = None
+        if self.n_perturbed == None:
+            # Abandoned sites send their recruits as scouts over the whole search space
+            centres = np.where(abandoned[:, None], self.centreArray, self.sitePositions)
+            patchSizes = np.where(abandoned[:, None], 1.0, self.sitePatches)
+            positions = self.sample(np.concatenate((np.repeat(centres, counts, axis=0), np.broadcast_to(self.centreArray, (n_scouts, len(self.centreArray))))),
+                                    np.concatenate((np.repeat(patchSizes, counts, axis=0), np.ones((n_scouts, len(self.centreArray))))))
+        else:
+            positions, changes = self.sampleSubsets(counts, abandoned, n_scouts)
+        # The recruits and scouts are sampled in one call, profiled as a single 'bee generation' phase
+        if profiler != None:
+            start = profiler.stop('bee generation', start, n_local + n_scouts)
+        if self.surrogate != None:
+            # The screened recruits are evaluated in full
+            changes = None
+            counts, local = self.screenRecruits(counts, abandoned, positions[:n_local])
+            positions = np.concatenate((local, positions[n_local:]))
+            if profiler != None:
+                start = profiler.stop('surrogate screening', start, n_local)
+            n_local = int(counts.sum())
+        if self.spatial_index != None:
+            positions = np.concatenate((positions[:n_local], self.screenScouts(positions[n_local:])))
+            if profiler != None:
+                start = profiler.stop('scout screening', start, n_scouts)
+            n_scouts = len(positions) - n_local
+        fitness = self.evaluate(positions, changes)
+        if profiler != None:
+            start = profiler.start()
+        if self.archive != None:
+            self.archive.append(len(self.record) + 1, np.concatenate((np.repeat(np.arange(len(counts)), counts), np.full(n_scouts, -1))),
+                                np.concatenate((np.where(abandoned, run_archive.SCOUT, run_archive.RECRUIT).repeat(counts), np.full(n_scouts, run_archive.SCOUT))),
+                                positions, fitness)
+            if profiler != None:
+                start = profiler.stop('archive', start, len(positions))
+        n_sites = len(counts)
+        self.localSearch(counts, abandoned, positions[:n_local], fitness[:n_local])
+        if profiler != None:
+            start = profiler.stop('local search', start, n_sites)
+        scouts = positions[n_local:]
+        scoutsFitness = fitness[n_local:]
+        # Add (ns - nb) scouts to the search space
+        order = self.selectSites(np.concatenate((self.sitePositions, scouts)),
+                         np.concatenate((self.siteFitness, scoutsFitness)),
+                         np.concatenate((self.sitePatches, np.tile(self.nghArray, (n_scouts, 1)))),
+                         np.concatenate((self.siteShrinks, np.zeros(n_scouts, dtype=int))))
+        # Update best solution if the fitness of the first site in current sites is better
+        if self.siteFitness[0] > self.bestSolution.fitness:
+            self.bestSolution = self.getSite(0)
+        self.record.append(self.bestSolution.fitness)
+        if profiler != None:
+            profiler.stop('selection', start, n_scouts + n_sites)
+            profiler.stop('iteration', iterationStart)
+        if self.controller != None:
+            self.controller.endIteration(self, n_scouts, int((order >= n_sites).sum()))
@@ -18,6 +18,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits import mplot3d
 import enhancedBA
+import run_archive
 
 Ackley_bees_parameters = {'ns':30, 'nb':8, 'nr':80, 'stlim':5}
 Schaffer_bees_parameters = {'ns':40, 'nb':5, 'nr':100, 'stlim':10}
@@ -31,8 +32,6 @@ MartinGaddy_bees_parameters = {'ns':30, 'nb':8, 'nr':100, 'stlim':10}
 def visualization(function_name, test_function, search_boundaries, bees_parameters, ba_class=enhancedBA.EnhancedBA):
     a = ba_class(test_function, search_boundaries[0], search_boundaries[1], ns=bees_parameters['ns'], nb=bees_parameters['nb'], nr=bees_parameters['nr'], stlim=bees_parameters['stlim'])
 
-    a.keep_bees_trace=True
-
     x = np.linspace(search_boundaries[0][0], search_boundaries[1][0], 50)
     y = np.linspace(search_boundaries[0][1], search_boundaries[1][1], 50)
 
@@ -40,7 +39,6 @@ def visualization(function_name, test_function, search_boundaries, bees_paramete
     Z = np.asarray([[-test_function((X[i][j],Y[i][j])) for j in range(len(X[i]))] for i in range(len(X))])
     p_size=(search_boundaries[1][0] - search_boundaries[0][0])*.01
     fig = plt.figure()
-    iteration=0
     points=[]
     ax = plt.axes(projection='3d')
     ax.plot_surface(X, Y, Z, rstride=1, cstride=1, cmap='viridis', edgecolor='none',alpha=.3)
@@ -48,25 +46,24 @@ def visualization(function_name, test_function, search_boundaries, bees_paramete
     ax.set_ylabel('y')
     ax.set_zlabel('z')
     ax.view_init(30, 35)
-    while True:
-        iteration+=1
-        a.singleIteration()
+    # The run is consumed as a stream of snapshots, which only hold the positions of the current sites and recruits of each iteration
+    for snapshot in a.iterate(include_sites=True, include_recruits=True):
         fig.canvas.set_window_title("Benchmark Function " + function_name)
-        fig.suptitle("Iteration " + str(iteration) + "," + " Best Solution " + str(a.bestSolution.fitness))
+        fig.suptitle("Iteration " + str(snapshot.iteration) + "," + " Best Solution " + str(snapshot.fitness))
         points_x=[]
         points_y=[]
         points_z=[]
         colors=[]
         sizes=[]
-        for bs in a.to_save_best_sites:
-            points_x+=[bs.position[0]]
-            points_y+=[bs.position[1]]
+        for bs in snapshot.sites:
+            points_x+=[bs[0]]
+            points_y+=[bs[1]]
             colors+=['blue']
             sizes+=[p_size*2.0]
-        for rs in a.to_save_recruits:
+        for rs in snapshot.recruits:
             for r in rs:
-                points_x+=[r.position[0]]
-                points_y+=[r.position[1]]
+                points_x+=[r[0]]
+                points_y+=[r[1]]
                 colors+=['purple']
                 sizes+=[p_size]
         points_z=[-test_function([points_x[i],points_y[i]]) for i in range(len(points_x))]
@@ -76,6 +73,36 @@ def visualization(function_name, test_function, search_boundaries, bees_paramete
         # To manually control the iteration process, please uncomment the following line of code
         # input("Press any key to start next iteration...")
         points.remove()
+
+# Replay a run stored by run_archive.RunArchiveWriter (e.g. EnhancedBA(..., archive=RunArchiveWriter(path, 2))),
+# only the rows of the displayed iteration are read from the archive
+def replay(function_name, test_function, search_boundaries, archive_path):
+    archive = run_archive.RunArchive(archive_path)
+
+    x = np.linspace(search_boundaries[0][0], search_boundaries[1][0], 50)
+    y = np.linspace(search_boundaries[0][1], search_boundaries[1][1], 50)
+
+    X, Y = np.meshgrid(x, y)
+    Z = np.asarray([[-test_function((X[i][j],Y[i][j])) for j in range(len(X[i]))] for i in range(len(X))])
+    p_size=(search_boundaries[1][0] - search_boundaries[0][0])*.01
+    fig = plt.figure()
+    ax = plt.axes(projection='3d')
+    ax.plot_surface(X, Y, Z, rstride=1, cstride=1, cmap='viridis', edgecolor='none',alpha=.3)
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.set_zlabel('z')
+    ax.view_init(30, 35)
+    best_fitness = archive.best_fitness()
+    for iteration in range(archive.n_iterations() + 1):
+        rows = archive.select(iteration, iteration + 1)
+        fig.canvas.set_window_title("Benchmark Function " + function_name)
+        fig.suptitle("Iteration " + str(iteration) + "," + " Best Solution " + str(best_fitness[iteration]))
+        # Recruits in purple, scouts in red
+        colors = np.where(rows['role'] == run_archive.RECRUIT, 'purple', 'red')
+        points=ax.scatter(rows['position'][:, 0], rows['position'][:, 1], -rows['fitness'], c=colors, s=p_size)
+        fig.show()
+        plt.pause(1)
+        points.remove()
         
 if __name__ == "__main__":
     import python_benchmark_functions.benchmark_functions as bf